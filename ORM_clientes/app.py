@@ -1,18 +1,22 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from functools import reduce
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 # --- Importaciones de la lógica de negocio ---
-from database import get_db
+from database import unidad_de_trabajo
+from instrumentacion import medir
+from latencias import medir_accion
 from crud import cliente_crud as ccrud
 from crud import ingrediente_crud as icrud
 from crud import menu_crud as mcrud
 from crud import pedido_crud as pcrud
+from crud.cola_pedidos import ColaPedidos
+from ejecutor_gui import EjecutorTk
+from tabla_gui import TablaSincronizada
 import graficos as gcrud
 
 
@@ -20,6 +24,29 @@ import graficos as gcrud
 ctk.set_appearance_mode("System")  
 ctk.set_default_color_theme("blue") 
 
+# Escritura diferida de pedidos (opcional): RESTAURANTE_ESCRITURA_DIFERIDA=1
+# Los pedidos se guardan en un hilo escritor con commit agrupado y la ventana no espera
+ESCRITURA_DIFERIDA = os.environ.get("RESTAURANTE_ESCRITURA_DIFERIDA", "").strip().lower() in ("1", "true", "si", "yes", "on")
+
+# Búsqueda mientras se escribe (índices FTS5 de la migración 5): la lista y los
+# combos de clientes y menús ya no cargan la tabla entera, muestran a lo sumo
+# estas filas y el resto se encuentra escribiendo
+RETARDO_BUSQUEDA_MS = 250
+LIMITE_LISTA_CLIENTES = 500
+LIMITE_COMBO = 50
+
+
+def opciones_clientes(db, texto: str = ""):
+    """{"Nombre (ID: n)": id} de los clientes que calzan con texto (sin texto, los primeros)."""
+    clientes = ccrud.buscar_clientes(db, texto, LIMITE_COMBO) if texto else ccrud.listar_clientes(db, LIMITE_COMBO)
+    return {f"{c.nombre} (ID: {c.id})": c.id for c in clientes}
+
+
+def opciones_menus(db, texto: str = ""):
+    """{"Nombre ($precio) (ID: n)": Menu} de los menús que calzan con texto (sin texto, los primeros)."""
+    menus = mcrud.buscar_menus(db, texto, LIMITE_COMBO) if texto else mcrud.leer_todos_los_menus(db, LIMITE_COMBO)
+    return {f"{m.nombre} (${m.precio:,.0f}) (ID: {m.id})": m for m in menus}
+
 
 class RestauranteApp(ctk.CTk):
     def __init__(self):
@@ -37,6 +64,13 @@ class RestauranteApp(ctk.CTk):
         self.menu_map = {} 
         self.cliente_map = {} 
 
+        # Cola de escritura diferida (solo si está activada)
+        self.cola_pedidos = ColaPedidos().iniciar() if ESCRITURA_DIFERIDA else None
+        self.protocol("WM_DELETE_WINDOW", self.al_cerrar)
+
+        # Las consultas y commits corren en hilos; los resultados vuelven con after()
+        self.ejecutor = EjecutorTk(self, al_cambiar_ocupado=self.mostrar_ocupado)
+
         # --- Barra de Navegación (Tabs) ---
         self.tabview = ctk.CTkTabview(self, width=950, height=600)
         self.tabview.grid(row=0, column=0, padx=20, pady=(20, 0), sticky="nsew")
@@ -54,6 +88,11 @@ class RestauranteApp(ctk.CTk):
         self.status_label = ctk.CTkLabel(self, text="Listo.", text_color="white")
         self.status_label.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="ew")
 
+        # Barra de "trabajando" (visible mientras haya consultas en curso)
+        self.barra_ocupado = ctk.CTkProgressBar(self, mode="indeterminate", height=4)
+        self.barra_ocupado.grid(row=2, column=0, padx=20, pady=(0, 5), sticky="ew")
+        self.barra_ocupado.grid_remove()
+
         # Inicializar pestañas
         self.setup_clientes_tab()
         self.setup_ingredientes_tab()
@@ -72,6 +111,7 @@ class RestauranteApp(ctk.CTk):
     # LÓGICA ESPECÍFICA PARA MODIFICAR MENÚ (CON TABLA Y ELIMINAR)
     # ===================================================================
 
+    @medir_accion()
     def abrir_ventana_modificar_menu(self):
         """Abre ventana para modificar menú usando una Tabla para los ingredientes."""
         selected_item = self.tree_menus.focus()
@@ -82,92 +122,98 @@ class RestauranteApp(ctk.CTk):
         values = self.tree_menus.item(selected_item, 'values')
         menu_id = int(values[0])
 
-        db = self.get_db_session()
-        if not db: return
-        
-        try:
-            menu_actual = mcrud.leer_menu_por_id(db, menu_id)
-            if not menu_actual:
-                return
-
-            # 1. Configurar Ventana
-            self.ventana_mod = ctk.CTkToplevel(self)
-            self.ventana_mod.title(f"Modificar: {menu_actual.nombre}")
-            self.ventana_mod.geometry("600x700")
-            self.ventana_mod.grab_set()
-
-            self.menu_id_en_edicion = menu_id
-            self.temp_receta_mod = []      # Lista temporal para la receta
-            self.mapa_ingredientes_mod = {} # Mapa para el combobox
-
-            # 2. Campos de Texto (Nombre, Desc, Precio)
-            ctk.CTkLabel(self.ventana_mod, text="Nombre:").pack(pady=(10, 0))
-            self.entry_mod_nombre = ctk.CTkEntry(self.ventana_mod)
-            self.entry_mod_nombre.insert(0, menu_actual.nombre)
-            self.entry_mod_nombre.pack(pady=5)
-
-            ctk.CTkLabel(self.ventana_mod, text="Descripción:").pack(pady=(5, 0))
-            self.entry_mod_desc = ctk.CTkEntry(self.ventana_mod)
-            self.entry_mod_desc.insert(0, menu_actual.descripcion or "")
-            self.entry_mod_desc.pack(pady=5)
-
-            ctk.CTkLabel(self.ventana_mod, text="Precio:").pack(pady=(5, 0))
-            self.entry_mod_precio = ctk.CTkEntry(self.ventana_mod)
-            self.entry_mod_precio.insert(0, str(menu_actual.precio))
-            self.entry_mod_precio.pack(pady=5)
-
-            # 3. Sección de Agregar Ingrediente
-            ctk.CTkLabel(self.ventana_mod, text="--- Editar Receta ---", font=("Arial", 12, "bold")).pack(pady=10)
-            
-            frame_add = ctk.CTkFrame(self.ventana_mod)
-            frame_add.pack(pady=5, padx=10, fill="x")
-
-            self.combo_ing_mod = ctk.CTkComboBox(frame_add, state="readonly")
-            self.combo_ing_mod.pack(side="left", padx=5, expand=True, fill="x")
-            
-            # Cargar ingredientes al combo (Manteniendo la sesión abierta)
-            ingredientes = icrud.listar_ingredientes(db)
-            self.mapa_ingredientes_mod = {i.nombre: i.id for i in ingredientes}
-            self.combo_ing_mod.configure(values=list(self.mapa_ingredientes_mod.keys()))
-            if ingredientes: self.combo_ing_mod.set(ingredientes[0].nombre)
-
-            self.entry_cant_mod = ctk.CTkEntry(frame_add, placeholder_text="Cant.", width=60)
-            self.entry_cant_mod.pack(side="left", padx=5)
-
-            ctk.CTkButton(frame_add, text="Añadir", width=60, command=self.agregar_ingrediente_mod).pack(side="left", padx=5)
-
-            # 4. TABLA DE RECETA
-            frame_tabla = ctk.CTkFrame(self.ventana_mod)
-            frame_tabla.pack(pady=10, padx=10, fill="both", expand=True)
-
-            self.tree_receta_mod = ttk.Treeview(frame_tabla, columns=("ID", "Nombre", "Cantidad"), show="headings", height=8)
-            self.tree_receta_mod.heading("ID", text="ID")
-            self.tree_receta_mod.heading("Nombre", text="Ingrediente")
-            self.tree_receta_mod.heading("Cantidad", text="Cantidad")
-            self.tree_receta_mod.column("ID", width=40)
-            self.tree_receta_mod.column("Nombre", width=250)
-            self.tree_receta_mod.column("Cantidad", width=80)
-            self.tree_receta_mod.pack(side="left", fill="both", expand=True)
-
-            # 5. Botón ELIMINAR
-            ctk.CTkButton(self.ventana_mod, text="Eliminar Ingrediente Seleccionado", fg_color="red", command=self.eliminar_ingrediente_mod).pack(pady=5)
-
-            # 6. Cargar la receta actual en la lista temporal (AHORA SÍ FUNCIONARÁ)
-            for item in menu_actual.items_receta:
-                self.temp_receta_mod.append({
+        def leer():
+            with unidad_de_trabajo() as db:
+                menu_actual = mcrud.leer_menu_por_id(db, menu_id)
+                if not menu_actual:
+                    return None
+                receta = [{
                     "ingrediente_id": item.ingrediente.id,
                     "nombre": item.ingrediente.nombre,
                     "cantidad": item.cantidad
-                })
-            
-            self.refrescar_tabla_mod() # Mostrar en la tabla
+                } for item in menu_actual.items_receta]
+                ingredientes = [(i.id, i.nombre) for i in icrud.listar_ingredientes(db)]
+                return menu_actual, receta, ingredientes
+
+        self.ejecutor.enviar(leer, clave="modificar_menu", al_terminar=lambda datos: self.construir_ventana_modificar_menu(menu_id, datos),
+                             al_fallar=self.fallo("No se pudo leer el menú"))
+
+    def construir_ventana_modificar_menu(self, menu_id: int, datos):
+        """Arma la ventana de edición con los datos ya leídos de la BD."""
+        if not datos:
+            self.mostrar_mensaje(f"El menú ID {menu_id} ya no existe.", tipo="error")
+            return
+        menu_actual, receta, ingredientes = datos
+
+        # 1. Configurar Ventana
+        self.ventana_mod = ctk.CTkToplevel(self)
+        self.ventana_mod.title(f"Modificar: {menu_actual.nombre}")
+        self.ventana_mod.geometry("600x700")
+        self.ventana_mod.grab_set()
+
+        self.menu_id_en_edicion = menu_id
+        self.temp_receta_mod = []      # Lista temporal para la receta
+        self.mapa_ingredientes_mod = {} # Mapa para el combobox
+
+        # 2. Campos de Texto (Nombre, Desc, Precio)
+        ctk.CTkLabel(self.ventana_mod, text="Nombre:").pack(pady=(10, 0))
+        self.entry_mod_nombre = ctk.CTkEntry(self.ventana_mod)
+        self.entry_mod_nombre.insert(0, menu_actual.nombre)
+        self.entry_mod_nombre.pack(pady=5)
+
+        ctk.CTkLabel(self.ventana_mod, text="Descripción:").pack(pady=(5, 0))
+        self.entry_mod_desc = ctk.CTkEntry(self.ventana_mod)
+        self.entry_mod_desc.insert(0, menu_actual.descripcion or "")
+        self.entry_mod_desc.pack(pady=5)
+
+        ctk.CTkLabel(self.ventana_mod, text="Precio:").pack(pady=(5, 0))
+        self.entry_mod_precio = ctk.CTkEntry(self.ventana_mod)
+        self.entry_mod_precio.insert(0, str(menu_actual.precio))
+        self.entry_mod_precio.pack(pady=5)
+
+        # 3. Sección de Agregar Ingrediente
+        ctk.CTkLabel(self.ventana_mod, text="--- Editar Receta ---", font=("Arial", 12, "bold")).pack(pady=10)
+        
+        frame_add = ctk.CTkFrame(self.ventana_mod)
+        frame_add.pack(pady=5, padx=10, fill="x")
+
+        self.combo_ing_mod = ctk.CTkComboBox(frame_add, state="readonly")
+        self.combo_ing_mod.pack(side="left", padx=5, expand=True, fill="x")
+        
+        # Cargar ingredientes al combo (leídos en el hilo junto con el menú)
+        self.mapa_ingredientes_mod = {nombre: ing_id for ing_id, nombre in ingredientes}
+        self.combo_ing_mod.configure(values=list(self.mapa_ingredientes_mod.keys()))
+        if ingredientes: self.combo_ing_mod.set(ingredientes[0][1])
+
+        self.entry_cant_mod = ctk.CTkEntry(frame_add, placeholder_text="Cant.", width=60)
+        self.entry_cant_mod.pack(side="left", padx=5)
+
+        ctk.CTkButton(frame_add, text="Añadir", width=60, command=self.agregar_ingrediente_mod).pack(side="left", padx=5)
+
+        # 4. TABLA DE RECETA
+        frame_tabla = ctk.CTkFrame(self.ventana_mod)
+        frame_tabla.pack(pady=10, padx=10, fill="both", expand=True)
+
+        self.tree_receta_mod = ttk.Treeview(frame_tabla, columns=("ID", "Nombre", "Cantidad"), show="headings", height=8)
+        self.tree_receta_mod.heading("ID", text="ID")
+        self.tree_receta_mod.heading("Nombre", text="Ingrediente")
+        self.tree_receta_mod.heading("Cantidad", text="Cantidad")
+        self.tree_receta_mod.column("ID", width=40)
+        self.tree_receta_mod.column("Nombre", width=250)
+        self.tree_receta_mod.column("Cantidad", width=80)
+        self.tree_receta_mod.pack(side="left", fill="both", expand=True)
 
-            # 7. Botón Guardar Final
-            ctk.CTkButton(self.ventana_mod, text="Guardar Cambios", fg_color="orange", height=40, font=("Arial", 14, "bold"), command=self.guardar_cambios_mod).pack(pady=20, padx=20, fill="x")
+        # 5. Botón ELIMINAR
+        ctk.CTkButton(self.ventana_mod, text="Eliminar Ingrediente Seleccionado", fg_color="red", command=self.eliminar_ingrediente_mod).pack(pady=5)
+
+        # 6. Cargar la receta actual en la lista temporal
+        self.temp_receta_mod = receta
+        
+        self.refrescar_tabla_mod() # Mostrar en la tabla
+
+        # 7. Botón Guardar Final
+        ctk.CTkButton(self.ventana_mod, text="Guardar Cambios", fg_color="orange", height=40, font=("Arial", 14, "bold"), command=self.guardar_cambios_mod).pack(pady=20, padx=20, fill="x")
 
-        finally:
-            # Cerramos la conexión AL FINAL de todo
-            db.close()
 
     def refrescar_tabla_mod(self):
         """Actualiza la tabla visual basada en la lista temporal."""
@@ -177,6 +223,7 @@ class RestauranteApp(ctk.CTk):
         for item in self.temp_receta_mod:
             self.tree_receta_mod.insert("", "end", values=(item['ingrediente_id'], item['nombre'], item['cantidad']))
 
+    @medir_accion()
     def agregar_ingrediente_mod(self):
         """Agrega o suma cantidad a la lista temporal."""
         nombre = self.combo_ing_mod.get()
@@ -203,6 +250,7 @@ class RestauranteApp(ctk.CTk):
         self.temp_receta_mod.append({"ingrediente_id": ing_id, "nombre": nombre, "cantidad": cant})
         self.refrescar_tabla_mod()
 
+    @medir_accion()
     def eliminar_ingrediente_mod(self):
         """Elimina el ingrediente seleccionado de la tabla."""
         selected = self.tree_receta_mod.focus()
@@ -217,6 +265,7 @@ class RestauranteApp(ctk.CTk):
         self.temp_receta_mod = [i for i in self.temp_receta_mod if i['ingrediente_id'] != id_borrar]
         self.refrescar_tabla_mod()
 
+    @medir_accion()
     def guardar_cambios_mod(self):
         """Guarda el menú actualizado en la BD."""
         nombre = self.entry_mod_nombre.get().strip()
@@ -231,27 +280,24 @@ class RestauranteApp(ctk.CTk):
             tk.messagebox.showerror("Error", "Falta nombre o ingredientes.")
             return
 
-        db = self.get_db_session()
-        if not db: return
+        menu_id, receta = self.menu_id_en_edicion, list(self.temp_receta_mod)
 
-        try:
-            # Llamamos a la función de CRUD (asegurate de tener menu_crud actualizado)
-            res = mcrud.actualizar_menu_completo(
-                db, self.menu_id_en_edicion, nombre, desc, precio, self.temp_receta_mod
-            )
-            
+        def guardar():
+            with unidad_de_trabajo() as db:
+                # Llamamos a la función de CRUD (asegurate de tener menu_crud actualizado)
+                return mcrud.actualizar_menu_completo(db, menu_id, nombre, desc, precio, receta)
+
+        def listo(res):
             if isinstance(res, str) and "Error" in res:
                 tk.messagebox.showerror("Error BD", res)
             elif res:
-                tk.messagebox.showinfo("Éxito", "Menú modificado correctamente.")
+                tk.messagebox.showinfo("Éxito", f"Menú modificado correctamente.\n{self.resumen_cambios_receta(res)}")
                 self.ventana_mod.destroy()
                 self.load_menus()
             else:
                 tk.messagebox.showerror("Error", "No se pudo actualizar.")
-        except Exception as e:
-            tk.messagebox.showerror("Error", str(e))
-        finally:
-            db.close()
+
+        self.ejecutor.enviar(guardar, nombre="guardar_cambios_mod", al_terminar=listo, al_fallar=lambda e: tk.messagebox.showerror("Error", str(e)))
 
     def limpiar_receta_temporal(self):
         """Borra la receta actual en la ventana de edición."""
@@ -261,6 +307,7 @@ class RestauranteApp(ctk.CTk):
         self.lista_ingredientes_label.insert("0.0", "Receta vaciada.\n")
         self.lista_ingredientes_label.configure(state="disabled")
 
+    @medir_accion()
     def guardar_edicion_menu_bd(self):
         """Llama al CRUD para actualizar el menú."""
         nombre = self.entry_nuevo_menu_nombre.get().strip()
@@ -281,43 +328,40 @@ class RestauranteApp(ctk.CTk):
             tk.messagebox.showerror("Error", "Precio inválido")
             return
 
-        db = self.get_db_session()
-        if not db: return
-
-        try:
-            # Llamamos a la función NUEVA de menu_crud
-            resultado = mcrud.actualizar_menu_completo(
-                db, 
-                self.menu_id_en_edicion, 
-                nombre, 
-                desc, 
-                precio, 
-                self.temp_receta
-            )
-            
+        menu_id, receta = self.menu_id_en_edicion, list(self.temp_receta)
+
+        def guardar():
+            with unidad_de_trabajo() as db:
+                # Llamamos a la función NUEVA de menu_crud
+                return mcrud.actualizar_menu_completo(
+                    db, 
+                    menu_id, 
+                    nombre, 
+                    desc, 
+                    precio, 
+                    receta
+                )
+
+        def listo(resultado):
             if isinstance(resultado, str) and "Error" in resultado:
                 tk.messagebox.showerror("Error BD", resultado)
             elif resultado:
-                tk.messagebox.showinfo("Éxito", "Menú actualizado correctamente.")
+                tk.messagebox.showinfo("Éxito", f"Menú actualizado correctamente.\n{self.resumen_cambios_receta(resultado)}")
                 self.ventana_menu.destroy()
                 self.load_menus()
             else:
                 tk.messagebox.showerror("Error", "No se pudo actualizar.")
-        except Exception as e:
-             tk.messagebox.showerror("Error Crítico", str(e))
-        finally:
-            db.close()
+
+        self.ejecutor.enviar(guardar, nombre="guardar_edicion_menu_bd", al_terminar=listo, al_fallar=lambda e: tk.messagebox.showerror("Error Crítico", str(e)))
 
 
     # --- Funciones Auxiliares ---
 
-    def get_db_session(self) -> Session | None:
-        try:
-            db_session = next(get_db())
-            return db_session
-        except Exception as e:
-            self.mostrar_mensaje(f"Error de Conexión a la BD: {e}", tipo="error")
-            return None
+    def resumen_cambios_receta(self, cambios: dict):
+        """Texto corto con lo que cambió en la receta (resultado de actualizar_menu_completo)."""
+        return (f"Receta: {len(cambios['agregados'])} agregados, "
+                f"{len(cambios['modificados'])} modificados, "
+                f"{len(cambios['eliminados'])} eliminados.")
 
     def mostrar_mensaje(self, mensaje: str, tipo: str = "info"):
         if tipo == "error":
@@ -327,7 +371,56 @@ class RestauranteApp(ctk.CTk):
         else:
             self.status_label.configure(text=mensaje, text_color="white")
         print(f"[{tipo.upper()}] {mensaje}")
+
+    def mostrar_ocupado(self, ocupado: bool):
+        """Cursor de espera y barra animada mientras haya trabajos de BD en curso."""
+        if ocupado:
+            self.barra_ocupado.grid()
+            self.barra_ocupado.start()
+            self.configure(cursor="watch")
+        else:
+            self.barra_ocupado.stop()
+            self.barra_ocupado.grid_remove()
+            self.configure(cursor="")
+
+    def fallo(self, contexto: str):
+        """Callback de error para el ejecutor: muestra la excepción del hilo en la barra de estado."""
+        return lambda e: self.mostrar_mensaje(f"{contexto}: {e}", tipo="error")
         
+    def conectar_busqueda_combo(self, combo, clave: str, buscar, al_encontrar, fijas=()):
+        """
+        Combo editable con búsqueda: RETARDO_BUSQUEDA_MS después de la última tecla
+        corre buscar(db, texto) -> {etiqueta: valor} en el ejecutor, pasa el dict a
+        al_encontrar y deja sus etiquetas (después de las `fijas`) como opciones.
+        """
+        def al_teclear(event):
+            texto = combo.get().strip()
+            if texto in combo.cget("values"):
+                return  # es una opción ya elegida, no un texto a buscar
+
+            def leer():
+                with medir(clave), unidad_de_trabajo() as db:
+                    return buscar(db, texto)
+
+            def pintar(opciones):
+                al_encontrar(opciones)
+                combo.configure(values=list(fijas) + list(opciones))
+
+            self.ejecutor.enviar_diferido(RETARDO_BUSQUEDA_MS, leer, clave=clave, al_terminar=pintar,
+                                          al_fallar=self.fallo("Error en la búsqueda"))
+
+        combo.bind("<KeyRelease>", al_teclear)
+
+    def llenar_combo(self, combo, variable, anterior: dict, opciones: dict):
+        """Pone `opciones` en el combo sin perder la elección actual (aunque venga de una búsqueda). Devuelve el mapa nuevo."""
+        elegida = variable.get()
+        if elegida in anterior and elegida not in opciones:
+            opciones = {elegida: anterior[elegida], **opciones}
+        combo.configure(values=list(opciones))
+        if elegida not in opciones and opciones:
+            variable.set(next(iter(opciones)))
+        return opciones
+
     def obtener_recetas_predefinidas(self):
         """Define la lista de menús predefinidos y sus recetas (ingrediente, cantidad)."""
         # Lista de menús y sus recetas
@@ -382,7 +475,15 @@ class RestauranteApp(ctk.CTk):
 
 
         # --- Área de Visualización (Treeview para selección) ---
-        ctk.CTkLabel(tab, text="Lista de Clientes (Selecciona para actualizar/eliminar)", font=ctk.CTkFont(size=14)).grid(row=1, column=0, padx=20, pady=(10, 5), sticky="w")
+        lista_header = ctk.CTkFrame(tab, fg_color="transparent")
+        lista_header.grid(row=1, column=0, padx=20, pady=(10, 5), sticky="ew")
+        ctk.CTkLabel(lista_header, text="Lista de Clientes (Selecciona para actualizar/eliminar)", font=ctk.CTkFont(size=14)).pack(side="left")
+
+        # Búsqueda por nombre o email (prefijos de palabras, p. ej. "ana per")
+        self.buscar_cliente_entry = ctk.CTkEntry(lista_header, placeholder_text="Buscar nombre o email", width=250)
+        self.buscar_cliente_entry.pack(side="right")
+        ctk.CTkLabel(lista_header, text="Buscar:").pack(side="right", padx=10)
+        self.buscar_cliente_entry.bind("<KeyRelease>", self.filtrar_lista_clientes)
         
         list_frame = ctk.CTkFrame(tab) 
         list_frame.grid(row=2, column=0, padx=20, pady=(0, 20), sticky="nsew")
@@ -397,6 +498,7 @@ class RestauranteApp(ctk.CTk):
         self.tree_clientes.column("Nombre", width=200, stretch=tk.YES)
         self.tree_clientes.column("Email", width=300, stretch=tk.YES)
         self.tree_clientes.grid(row=0, column=0, sticky="nsew")
+        self.tabla_clientes = TablaSincronizada(self.tree_clientes)
 
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree_clientes.yview)
         self.tree_clientes.configure(yscrollcommand=scrollbar.set)
@@ -404,28 +506,44 @@ class RestauranteApp(ctk.CTk):
         
         self.tree_clientes.bind("<<TreeviewSelect>>", self.cargar_cliente_seleccionado)
     
+    @medir_accion()
     def cargar_lista_clientes(self):
-        db = self.get_db_session()
-        if not db: return
+        self.filtrar_lista_clientes()
+        self.load_pedidos_init_data() # Recarga datos de compra
 
-        try:
-            clientes = ccrud.listar_clientes(db)
-            
-            for item in self.tree_clientes.get_children():
-                self.tree_clientes.delete(item)
+    def filtrar_lista_clientes(self, event=None):
+        """
+        Llena la tabla con los clientes que calzan con "Buscar" (o los primeros
+        LIMITE_LISTA_CLIENTES si está vacío). Al teclear espera RETARDO_BUSQUEDA_MS.
+        """
+        texto = self.buscar_cliente_entry.get().strip()
+
+        def leer():
+            with medir("cargar_lista_clientes"), unidad_de_trabajo() as db:
+                if texto:
+                    clientes = ccrud.buscar_clientes(db, texto, LIMITE_LISTA_CLIENTES)
+                else:
+                    clientes = ccrud.listar_clientes(db, LIMITE_LISTA_CLIENTES)
+                return [(c.id, c.nombre, c.email) for c in clientes]
+
+        def pintar(clientes):
+            # Solo se tocan las filas que cambiaron (se mantienen selección y scroll)
+            self.tabla_clientes.sincronizar(clientes)
             
             if not clientes:
-                self.mostrar_mensaje("No hay clientes registrados.", tipo="info")
+                self.mostrar_mensaje(f"Ningún cliente coincide con '{texto}'." if texto else "No hay clientes registrados.", tipo="info")
                 return
-
-            for c in clientes:
-                self.tree_clientes.insert("", tk.END, values=(c.id, c.nombre, c.email))
             
-            self.mostrar_mensaje(f"Lista de clientes actualizada. Total: {len(clientes)}", tipo="info")
-        finally:
-            db.close()
-            self.load_pedidos_init_data() # Recarga datos de compra
+            if len(clientes) == LIMITE_LISTA_CLIENTES:
+                self.mostrar_mensaje(f"Mostrando los primeros {len(clientes)} clientes. Usa 'Buscar' para encontrar otros.", tipo="info")
+            else:
+                self.mostrar_mensaje(f"Lista de clientes actualizada. Total: {len(clientes)}", tipo="info")
+
+        retardo = RETARDO_BUSQUEDA_MS if event is not None else 0
+        self.ejecutor.enviar_diferido(retardo, leer, clave="lista_clientes", al_terminar=pintar,
+                                      al_fallar=self.fallo("Error al cargar clientes"))
 
+    @medir_accion()
     def cargar_cliente_seleccionado(self, event):
         """Carga los datos del cliente seleccionado a los campos de entrada."""
         selected_item = self.tree_clientes.focus()
@@ -454,6 +572,7 @@ class RestauranteApp(ctk.CTk):
         self.mostrar_mensaje(f"Cliente ID {cliente_id} cargado para edición.", tipo="info")
 
 
+    @medir_accion()
     def crear_cliente(self):
         nombre = self.cliente_nombre_entry.get().strip()
         email_user = self.email_user_entry.get().strip()
@@ -464,11 +583,11 @@ class RestauranteApp(ctk.CTk):
             self.mostrar_mensaje("Debe ingresar Nombre y Usuario de Email.", tipo="error")
             return
 
-        db = self.get_db_session()
-        if not db: return
+        def crear():
+            with unidad_de_trabajo() as db:
+                return ccrud.crear_cliente(db, nombre, email)
 
-        try:
-            resultado = ccrud.crear_cliente(db, nombre, email)
+        def listo(resultado):
             if isinstance(resultado, str):
                 self.mostrar_mensaje(resultado, tipo="error")
             else:
@@ -476,9 +595,10 @@ class RestauranteApp(ctk.CTk):
                 self.cliente_nombre_entry.delete(0, "end")
                 self.email_user_entry.delete(0, "end")
                 self.cargar_lista_clientes()
-        finally:
-            db.close()
 
+        self.ejecutor.enviar(crear, nombre="crear_cliente", al_terminar=listo, al_fallar=self.fallo("Error al crear cliente"))
+
+    @medir_accion()
     def actualizar_cliente_seleccionado(self):
         selected_item = self.tree_clientes.focus()
         if not selected_item:
@@ -497,12 +617,11 @@ class RestauranteApp(ctk.CTk):
             self.mostrar_mensaje("El nombre y el email no pueden estar vacíos.", tipo="error")
             return
 
-        db = self.get_db_session()
-        if not db: return
+        def actualizar():
+            with unidad_de_trabajo() as db:
+                return ccrud.actualizar_cliente(db, cliente_id, nuevo_nombre, nuevo_email)
 
-        try:
-            cliente_actualizado = ccrud.actualizar_cliente(db, cliente_id, nuevo_nombre, nuevo_email)
-            
+        def listo(cliente_actualizado):
             if isinstance(cliente_actualizado, str) and "Error" in cliente_actualizado:
                  self.mostrar_mensaje(cliente_actualizado, tipo="error")
             elif cliente_actualizado:
@@ -510,9 +629,10 @@ class RestauranteApp(ctk.CTk):
                 self.cargar_lista_clientes()
             else:
                 self.mostrar_mensaje(f"Fallo al actualizar cliente ID {cliente_id}. El email podría estar en uso.", tipo="error")
-        finally:
-            db.close()
 
+        self.ejecutor.enviar(actualizar, nombre="actualizar_cliente_seleccionado", al_terminar=listo, al_fallar=self.fallo("Error al actualizar cliente"))
+
+    @medir_accion()
     def eliminar_cliente_seleccionado(self):
         selected_item = self.tree_clientes.focus()
         if not selected_item:
@@ -524,18 +644,18 @@ class RestauranteApp(ctk.CTk):
         cliente_nombre = values[1]
         
         if messagebox.askyesno("Confirmar Eliminación", f"¿Estás seguro de eliminar a '{cliente_nombre}' (ID: {cliente_id})?"):
-            db = self.get_db_session()
-            if not db: return
-            
-            try:
-                eliminado = ccrud.eliminar_cliente(db, cliente_id)
+            def eliminar():
+                with unidad_de_trabajo() as db:
+                    return ccrud.eliminar_cliente(db, cliente_id)
+
+            def listo(eliminado):
                 if eliminado:
                     self.mostrar_mensaje(f"Cliente ID {cliente_id} eliminado con éxito.", tipo="success")
                     self.cargar_lista_clientes()
                 else:
                     self.mostrar_mensaje(f"Fallo al eliminar cliente ID {cliente_id}. Tiene pedidos asociados.", tipo="error")
-            finally:
-                db.close()
+
+            self.ejecutor.enviar(eliminar, nombre="eliminar_cliente_seleccionado", al_terminar=listo, al_fallar=self.fallo("Error al eliminar cliente"))
 
 
     # ====================================================
@@ -584,6 +704,7 @@ class RestauranteApp(ctk.CTk):
         self.tree_ingredientes.column("Nombre", width=250, stretch=tk.YES)
         self.tree_ingredientes.column("Stock", width=150, anchor=tk.E, stretch=tk.NO)
         self.tree_ingredientes.grid(row=0, column=0, sticky="nsew")
+        self.tabla_ingredientes = TablaSincronizada(self.tree_ingredientes)
 
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree_ingredientes.yview)
         self.tree_ingredientes.configure(yscrollcommand=scrollbar.set)
@@ -594,6 +715,7 @@ class RestauranteApp(ctk.CTk):
 
 
 
+    @medir_accion()
     def cargar_ingrediente_seleccionado(self, event):
         selected_item = self.tree_ingredientes.focus()
         if not selected_item: return
@@ -610,6 +732,7 @@ class RestauranteApp(ctk.CTk):
         self.mostrar_mensaje(f"Ingrediente ID {ing_id} ('{nombre}') cargado para edición.", tipo="info")
 
 
+    @medir_accion()
     def crear_ingrediente_manual(self):
         nombre = self.ing_nombre_entry.get().strip()
         stock_str = self.ing_stock_entry.get().strip()
@@ -627,12 +750,11 @@ class RestauranteApp(ctk.CTk):
             self.mostrar_mensaje("La Cantidad debe ser un número válido.", tipo="error")
             return
 
-        db = self.get_db_session()
-        if not db: return
-
-        try:
-            resultado = icrud.crear_ingrediente(db, nombre, stock_a_agregar) 
+        def crear():
+            with unidad_de_trabajo() as db:
+                return icrud.crear_ingrediente(db, nombre, stock_a_agregar) 
 
+        def listo(resultado):
             if isinstance(resultado, str):
                 self.mostrar_mensaje(resultado, tipo="error") 
             else:
@@ -641,8 +763,8 @@ class RestauranteApp(ctk.CTk):
                 self.ing_nombre_entry.delete(0, "end")
                 self.ing_stock_entry.delete(0, "end")
                 self.cargar_lista_ingredientes()
-        finally:
-            db.close()
+
+        self.ejecutor.enviar(crear, nombre="crear_ingrediente_manual", al_terminar=listo, al_fallar=self.fallo("Error al guardar el ingrediente"))
 
     
     def actualizar_ingrediente_stock_seleccionado(self):
@@ -670,21 +792,21 @@ class RestauranteApp(ctk.CTk):
             self.mostrar_mensaje("El stock debe ser un número válido y positivo.", tipo="error")
             return
         
-        db = self.get_db_session()
-        if not db: return
-        
-        try:
-            ing_actualizado = icrud.actualizar_stock_ingrediente(db, ing_id, nuevo_stock)
-            
+        def actualizar():
+            with unidad_de_trabajo() as db:
+                return icrud.actualizar_stock_ingrediente(db, ing_id, nuevo_stock)
+
+        def listo(ing_actualizado):
             if ing_actualizado:
                 self.mostrar_mensaje(f"Stock de '{ing_actualizado.nombre}' (ID {ing_id}) fijado a {ing_actualizado.stock:,.2f}.", tipo="success")
                 self.ing_stock_entry.delete(0, "end")
                 self.cargar_lista_ingredientes()
             else:
                 self.mostrar_mensaje(f"Fallo al fijar stock ID {ing_id}.", tipo="error")
-        finally:
-            db.close()
 
+        self.ejecutor.enviar(actualizar, nombre="actualizar_ingrediente_stock_seleccionado", al_terminar=listo, al_fallar=self.fallo("Error al fijar stock"))
+
+    @medir_accion()
     def eliminar_ingrediente_seleccionado(self):
         """Elimina el ingrediente seleccionado en el Treeview."""
         selected_item = self.tree_ingredientes.focus()
@@ -697,20 +819,21 @@ class RestauranteApp(ctk.CTk):
         ing_nombre = values[1]
         
         if messagebox.askyesno("Confirmar Eliminación", f"¿Estás seguro de eliminar el ingrediente '{ing_nombre}' (ID: {ing_id})?\nAdvertencia: Esto puede afectar a los menús que lo utilizan."):
-            db = self.get_db_session()
-            if not db: return
-            
-            try:
-                eliminado = icrud.eliminar_ingrediente(db, ing_id)
+            def eliminar():
+                with unidad_de_trabajo() as db:
+                    return icrud.eliminar_ingrediente(db, ing_id)
+
+            def listo(eliminado):
                 if eliminado:
                     self.mostrar_mensaje(f"Ingrediente ID {ing_id} eliminado con éxito.", tipo="success")
                     self.cargar_lista_ingredientes()
                 else:
                     self.mostrar_mensaje(f"Fallo al eliminar ID {ing_id}.", tipo="error") 
-            finally:
-                db.close()
+
+            self.ejecutor.enviar(eliminar, nombre="eliminar_ingrediente_seleccionado", al_terminar=listo, al_fallar=self.fallo("Error al eliminar ingrediente"))
    # app.py (Dentro de la clase RestauranteApp)
 
+    @medir_accion()
     def cargar_stock_csv_gui(self):
         """Abre el diálogo para seleccionar CSV y llama a la función CRUD."""
         filepath = filedialog.askopenfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
@@ -719,50 +842,51 @@ class RestauranteApp(ctk.CTk):
             self.mostrar_mensaje("Selección de archivo CSV cancelada.", tipo="info")
             return
 
-        db = self.get_db_session()
-        if not db: return
+        def cargar():
+            with unidad_de_trabajo() as db:
+                # 1. ESTO GUARDA EN LA BD (una sola transacción, upsert por lotes)
+                return icrud.cargar_ingredientes_csv_masivo(db, filepath)
 
-        try:
-            # 1. ESTO GUARDA EN LA BD
-            success = icrud.cargar_ingredientes_csv(db, filepath)
-            
-            if success:
-                 self.mostrar_mensaje("Carga CSV de stock completada con éxito.", tipo="success")
+        def listo(reporte):
+            for linea, fila, motivo in reporte["errores"]:
+                print(f"CSV linea {linea} ignorada ({motivo}): {fila}")
+
+            if reporte["exito"] and not reporte["errores"]:
+                 self.mostrar_mensaje(f"Carga CSV de stock completada con éxito. {reporte['lineas_cargadas']} líneas.", tipo="success")
+            elif reporte["exito"]:
+                 self.mostrar_mensaje(f"Carga CSV completada: {reporte['lineas_cargadas']} líneas cargadas, {len(reporte['errores'])} con error (ver consola).", tipo="info")
             else:
                  self.mostrar_mensaje("Fallo la carga CSV. Revise la Consola.", tipo="error")
-                 
-        except Exception as e:
-            self.mostrar_mensaje(f"Error inesperado en la carga CSV: {e}", tipo="error")
-        finally:
-            db.close()
-            
+
             # 2. ESTA LÍNEA MUESTRA LOS DATOS EN PANTALLA
             self.cargar_lista_ingredientes() 
 
+        def fallo(e):
+            self.mostrar_mensaje(f"Error inesperado en la carga CSV: {e}", tipo="error")
+            self.cargar_lista_ingredientes()
+
+        self.mostrar_mensaje("Cargando CSV de stock...", tipo="info")
+        self.ejecutor.enviar(cargar, nombre="cargar_stock_csv_gui", al_terminar=listo, al_fallar=fallo)
 
+
+    @medir_accion()
     def cargar_lista_ingredientes(self):
         """Refresca el Treeview con los datos actuales de la BD."""
-        db = self.get_db_session()
-        if not db: return
+        def leer():
+            with medir("cargar_lista_ingredientes"), unidad_de_trabajo() as db:
+                return [(i.id, i.nombre, f"{i.stock:,.2f}") for i in icrud.listar_ingredientes(db)]
 
-        try:
-            ingredientes = icrud.listar_ingredientes(db)
-            
-            # Limpia la tabla antes de recargar
-            for item in self.tree_ingredientes.get_children():
-                self.tree_ingredientes.delete(item)
+        def pintar(ingredientes):
+            # MUESTRA LOS DATOS EN LA TABLA (después de un pedido solo cambian las filas con stock descontado)
+            self.tabla_ingredientes.sincronizar(ingredientes)
             
             if not ingredientes:
                 self.mostrar_mensaje("No hay ingredientes registrados. Carga desde CSV o cree uno.", tipo="info")
                 return
-
-            # MUESTRA LOS DATOS EN LA TABLA
-            for i in ingredientes:
-                self.tree_ingredientes.insert("", tk.END, values=(i.id, i.nombre, f"{i.stock:,.2f}"))
             
             self.mostrar_mensaje(f"Inventario actualizado. Total de ítems: {len(ingredientes)}", tipo="info")
-        finally:
-            db.close()
+
+        self.ejecutor.enviar(leer, clave="lista_ingredientes", al_terminar=pintar, al_fallar=self.fallo("Error al cargar ingredientes"))
             
    
 
@@ -812,6 +936,7 @@ class RestauranteApp(ctk.CTk):
         self.tree_menus.column("Descripción", width=300, stretch=tk.YES)
         
         self.tree_menus.grid(row=0, column=0, sticky="nsew")
+        self.tabla_menus = TablaSincronizada(self.tree_menus)
 
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree_menus.yview)
         self.tree_menus.configure(yscrollcommand=scrollbar.set)
@@ -820,6 +945,7 @@ class RestauranteApp(ctk.CTk):
 
     # --- LÓGICA PARA CREAR MENÚ MANUALMENTE (VENTANA EMERGENTE) ---
 
+    @medir_accion()
     def abrir_ventana_crear_menu(self):
         """Abre una ventana emergente (Toplevel) para crear un menú complejo."""
         
@@ -873,17 +999,21 @@ class RestauranteApp(ctk.CTk):
 
     def cargar_combo_ingredientes_ventana(self):
         """Carga los ingredientes en el combobox de la ventana emergente."""
-        db = self.get_db_session()
-        if not db: return
-        try:
-            ingredientes = icrud.listar_ingredientes(db)
-            self.mapa_ingredientes_temp = {i.nombre: i.id for i in ingredientes}
+        def leer():
+            with unidad_de_trabajo() as db:
+                return [(i.id, i.nombre) for i in icrud.listar_ingredientes(db)]
+
+        def pintar(ingredientes):
+            if not self.combo_ingredientes_menu.winfo_exists():
+                return  # la ventana se cerró antes de que llegaran los datos
+            self.mapa_ingredientes_temp = {nombre: ing_id for ing_id, nombre in ingredientes}
             self.combo_ingredientes_menu.configure(values=list(self.mapa_ingredientes_temp.keys()))
             if ingredientes:
-                self.combo_ingredientes_menu.set(ingredientes[0].nombre)
-        finally:
-            db.close()
+                self.combo_ingredientes_menu.set(ingredientes[0][1])
+
+        self.ejecutor.enviar(leer, clave="combo_ingredientes_menu", al_terminar=pintar, al_fallar=self.fallo("Error al cargar ingredientes"))
 
+    @medir_accion()
     def agregar_ingrediente_a_lista_temporal(self):
         """Añade un ingrediente a la lista temporal de la receta."""
         nombre_ing = self.combo_ingredientes_menu.get()
@@ -912,6 +1042,7 @@ class RestauranteApp(ctk.CTk):
         # Limpiar entrada
         self.entry_cant_ing_menu.delete(0, "end")
 
+    @medir_accion()
     def guardar_nuevo_menu_bd(self):
         """Llama al CRUD para guardar el menú completo."""
         nombre = self.entry_nuevo_menu_nombre.get().strip()
@@ -932,12 +1063,13 @@ class RestauranteApp(ctk.CTk):
             tk.messagebox.showerror("Error", "El precio debe ser un número.")
             return
 
-        db = self.get_db_session()
-        if not db: return
+        receta = list(self.temp_receta)
 
-        try:
-            resultado = mcrud.crear_menu(db, nombre, desc, precio, self.temp_receta)
-            
+        def guardar():
+            with unidad_de_trabajo() as db:
+                return mcrud.crear_menu(db, nombre, desc, precio, receta)
+
+        def listo(resultado):
             if isinstance(resultado, str) and "Error" in resultado:
                 tk.messagebox.showerror("Error BD", resultado)
             elif resultado:
@@ -946,105 +1078,74 @@ class RestauranteApp(ctk.CTk):
                 self.load_menus() # Recargar lista principal
             else:
                 tk.messagebox.showerror("Error", "No se pudo crear el menú.")
-        except Exception as e:
-             tk.messagebox.showerror("Error Crítico", str(e))
-        finally:
-            db.close()
 
+        self.ejecutor.enviar(guardar, nombre="guardar_nuevo_menu_bd", al_terminar=listo, al_fallar=lambda e: tk.messagebox.showerror("Error Crítico", str(e)))
 
 
 
+
+    @medir_accion()
     def load_menus(self):
         """Carga los menús existentes en el Treeview."""
-        db = self.get_db_session()
-        if not db: return
+        def leer():
+            with medir("load_menus"), unidad_de_trabajo() as db:
+                return [(m.id, m.nombre, f"${m.precio:,.0f}", m.descripcion) for m in mcrud.leer_todos_los_menus(db)]
 
-        try:
-            menus = mcrud.leer_todos_los_menus(db)
-            
-            # Limpiar Treeview
-            for item in self.tree_menus.get_children():
-                self.tree_menus.delete(item)
+        def pintar(menus):
+            self.tabla_menus.sincronizar(menus)
             
             if not menus:
                 self.mostrar_mensaje("No hay menús registrados. Carga el CSV de ingredientes y luego 'Crear Recetas Prefijadas'.", tipo="info")
                 return
-
-            for m in menus:
-                self.tree_menus.insert("", tk.END, values=(m.id, m.nombre, f"${m.precio:,.0f}", m.descripcion))
             
             self.mostrar_mensaje(f"Lista de menús actualizada. Total: {len(menus)}", tipo="info")
-        finally:
-            db.close()
-            self.load_pedidos_init_data() # Recarga el combobox de Panel de Compra
 
+        self.ejecutor.enviar(leer, clave="lista_menus", al_terminar=pintar, al_fallar=self.fallo("Error al cargar menús"))
+        self.load_pedidos_init_data() # Recarga el combobox de Panel de Compra
+
+    @medir_accion()
     def crear_recetas_masivas(self):
         """
         Intenta crear todos los menús y sus recetas predefinidas.
         SOLO funciona si los ingredientes (del CSV) ya están en la BD.
         """
-        db = self.get_db_session()
-        if not db: return
-
         # 1. Obtener la lista de recetas predefinidas
         recetas_predefinidas = self.obtener_recetas_predefinidas()
-        exitos = 0
-        fallos = 0
-        
-        try:
-            # 2. Obtener TODOS los ingredientes que existen actualmente en la BD
-            ingredientes_existentes = {ing.nombre: ing.id for ing in icrud.listar_ingredientes(db)}
-            
-            if not ingredientes_existentes:
+
+        def crear():
+            with unidad_de_trabajo() as db:
+                # 2. Verificar que haya inventario cargado
+                if not icrud.listar_ingredientes(db):
+                    return None
+
+                # 3. Crear todos los menús y recetas en una sola transacción
+                #    (los que ya existen se saltan; los que tienen ingredientes faltantes fallan)
+                return mcrud.crear_menus_masivo(db, recetas_predefinidas)
+
+        def listo(reporte):
+            if reporte is None:
                 self.mostrar_mensaje("ERROR: El inventario de ingredientes está vacío. ¡Cargue el CSV primero!", tipo="error")
-                db.close()
                 return
 
-            for nombre_menu, precio, receta_data in recetas_predefinidas:
-                
-                # 3. Verificar si el menú ya existe (para no duplicarlo)
-                if mcrud.leer_menu_por_nombre(db, nombre_menu):
-                    continue
+            if isinstance(reporte, str):
+                print(reporte)
+                exitos, fallos = 0, len(recetas_predefinidas)
+            else:
+                exitos = len(reporte["creados"])
+                fallos = len(reporte["fallidos"])
+                for nombre_menu, motivo in reporte["fallidos"]:
+                    print(f"FALLO RECETA: {nombre_menu} - {motivo}")
 
-                receta_orm = []
-                ingredientes_faltantes = False
-                
-                # 4. Convertir nombres de ingredientes en IDs
-                for ing_nombre, cantidad in receta_data:
-                    ing_nombre_title = ing_nombre.strip().title()
-
-                    if ing_nombre_title not in ingredientes_existentes:
-                        ingredientes_faltantes = True
-                        break # Falla la receta si falta un ingrediente
-                    
-                    ing_id = ingredientes_existentes[ing_nombre_title]
-                    receta_orm.append({"ingrediente_id": ing_id, "cantidad": cantidad})
-
-                if ingredientes_faltantes:
-                    print(f"FALLO RECETA: {nombre_menu} - Faltan ingredientes en el inventario.")
-                    fallos += 1
-                    continue
-                
-                # 5. Si todo está bien, crear el menú y la receta
-                if receta_orm:
-                    # Llama a la función de CRUD que crea el Menú y la Receta juntos
-                    resultado = mcrud.crear_menu(db, nombre_menu, f"Receta de {nombre_menu}", precio, receta_orm)
-                    
-                    if isinstance(resultado, str) and "Error" in resultado:
-                        print(f"Error al crear menú {nombre_menu}: {resultado}")
-                        fallos += 1
-                    else:
-                        exitos += 1
+            self.load_menus() # Recargar la lista de menús
+            self.mostrar_mensaje(f"Carga de recetas: {exitos} creadas. {fallos} fallaron (ingrediente no cargado).", tipo="info")
 
-        except Exception as e:
+        def fallo(e):
+            self.load_menus()
             self.mostrar_mensaje(f"Error crítico en la carga masiva de recetas: {e}", tipo="error")
-            fallos += 1
-        finally:
-            db.close()
-            self.load_menus() # Recargar la lista de menús
-            
-        self.mostrar_mensaje(f"Carga de recetas: {exitos} creadas. {fallos} fallaron (ingrediente no cargado).", tipo="info")
 
+        self.ejecutor.enviar(crear, nombre="crear_recetas_masivas", al_terminar=listo, al_fallar=fallo)
+
+    @medir_accion()
     def eliminar_menu_seleccionado(self):
         """Elimina el menú seleccionado en el Treeview."""
         selected_item = self.tree_menus.focus()
@@ -1057,18 +1158,18 @@ class RestauranteApp(ctk.CTk):
         menu_nombre = values[1]
         
         if messagebox.askyesno("Confirmar Eliminación", f"¿Estás seguro de eliminar el menú '{menu_nombre}' (ID: {menu_id})?"):
-            db = self.get_db_session()
-            if not db: return
-            
-            try:
-                eliminado = mcrud.eliminar_menu(db, menu_id)
+            def eliminar():
+                with unidad_de_trabajo() as db:
+                    return mcrud.eliminar_menu(db, menu_id)
+
+            def listo(eliminado):
                 if eliminado:
                     self.mostrar_mensaje(f"Menú ID {menu_id} eliminado con éxito.", tipo="success")
                     self.load_menus()
                 else:
                     self.mostrar_mensaje(f"Fallo al eliminar menú ID {menu_id}. ¿Está asociado a un pedido?", tipo="error")
-            finally:
-                db.close()
+
+            self.ejecutor.enviar(eliminar, nombre="eliminar_menu_seleccionado", al_terminar=listo, al_fallar=self.fallo("Error al eliminar menú"))
 
     # ====================================================
     # PESTAÑA 4: PANEL DE COMPRA (PEDIDOS) - LÓGICA COMPLETA
@@ -1085,13 +1186,17 @@ class RestauranteApp(ctk.CTk):
 
         ctk.CTkLabel(control_frame, text="Cliente:").grid(row=0, column=0, padx=10, pady=(5,0), sticky="w")
         self.cliente_var_compra = ctk.StringVar(control_frame)
-        self.cliente_combo_compra = ctk.CTkComboBox(control_frame, variable=self.cliente_var_compra, values=[], state="readonly")
+        self.cliente_combo_compra = ctk.CTkComboBox(control_frame, variable=self.cliente_var_compra, values=[])
         self.cliente_combo_compra.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
+        self.conectar_busqueda_combo(self.cliente_combo_compra, "buscar_cliente_compra", opciones_clientes,
+                                     lambda opciones: setattr(self, "cliente_map", opciones))
 
         ctk.CTkLabel(control_frame, text="Menú:").grid(row=0, column=1, padx=10, pady=(5,0), sticky="w")
         self.menu_var_compra = ctk.StringVar(control_frame)
-        self.menu_combo_compra = ctk.CTkComboBox(control_frame, variable=self.menu_var_compra, values=[], state="readonly")
+        self.menu_combo_compra = ctk.CTkComboBox(control_frame, variable=self.menu_var_compra, values=[])
         self.menu_combo_compra.grid(row=1, column=1, padx=10, pady=(0, 10), sticky="ew")
+        self.conectar_busqueda_combo(self.menu_combo_compra, "buscar_menu_compra", opciones_menus,
+                                     lambda opciones: setattr(self, "menu_map", opciones))
         
         ctk.CTkLabel(control_frame, text="Cantidad:").grid(row=0, column=2, padx=10, pady=(5,0), sticky="w")
         self.cantidad_entry_compra = ctk.CTkEntry(control_frame, width=50)
@@ -1114,6 +1219,7 @@ class RestauranteApp(ctk.CTk):
         self.tree_order.column("Subtotal", width=120, anchor=tk.E, stretch=tk.NO)
         
         self.tree_order.grid(row=1, column=0, padx=20, pady=(10, 5), sticky="nsew") 
+        self.tabla_order = TablaSincronizada(self.tree_order)
 
         footer_frame = ctk.CTkFrame(tab)
         footer_frame.grid(row=2, column=0, padx=20, pady=(0, 20), sticky="ew")
@@ -1126,42 +1232,31 @@ class RestauranteApp(ctk.CTk):
         ctk.CTkButton(footer_frame, text="Limpiar Pedido", command=self.clear_order).grid(row=0, column=2, padx=10, pady=10, sticky="ew")
         ctk.CTkButton(footer_frame, text="Finalizar Compra", command=self.finalize_order, fg_color="green").grid(row=0, column=3, padx=10, pady=10, sticky="ew")
 
+    @medir_accion()
     def load_pedidos_init_data(self):
-        """Carga los datos de Clientes y Menús para los comboboxes."""
-        db = self.get_db_session()
-        if not db: return
+        """Carga los primeros Clientes y Menús en los comboboxes (los demás se encuentran escribiendo)."""
+        def leer():
+            with medir("load_pedidos_init_data"), unidad_de_trabajo() as db:
+                return opciones_clientes(db), opciones_menus(db)
 
-        try:
-            clientes = ccrud.listar_clientes(db)
-            self.cliente_map = {f"{c.nombre} (ID: {c.id})": c.id for c in clientes}
-            cliente_keys = list(self.cliente_map.keys())
-            self.cliente_combo_compra.configure(values=cliente_keys)
-            if cliente_keys:
-                self.cliente_var_compra.set(cliente_keys[0])
-
-            menus = mcrud.leer_todos_los_menus(db)
-            self.menu_map = {f"{m.nombre} (${m.precio:,.0f}) (ID: {m.id})": m for m in menus}
-            menu_keys = list(self.menu_map.keys())
-            self.menu_combo_compra.configure(values=menu_keys)
-            if menu_keys:
-                self.menu_var_compra.set(menu_keys[0])
-
-        finally:
-            db.close()
-        self.update_order_display() 
+        def pintar(datos):
+            clientes, menus = datos
+            self.cliente_map = self.llenar_combo(self.cliente_combo_compra, self.cliente_var_compra, self.cliente_map, clientes)
+            self.menu_map = self.llenar_combo(self.menu_combo_compra, self.menu_var_compra, self.menu_map, menus)
+
+            self.update_order_display() 
+
+        self.ejecutor.enviar(leer, clave="datos_compra", al_terminar=pintar, al_fallar=self.fallo("Error al cargar clientes y menús"))
 
     def update_order_display(self):
         """Actualiza el Treeview (lista de pedido) y el total."""
-        
-        for item in self.tree_order.get_children():
-            self.tree_order.delete(item)
-            
+        filas = []
         total = 0
         for item in self.current_order_items:
             subtotal = item['precio'] * item['cantidad']
             total += subtotal
             
-            self.tree_order.insert("", tk.END, values=(
+            filas.append((
                 item['id'], 
                 item['nombre'], 
                 f"${item['precio']:,.0f}", 
@@ -1169,8 +1264,10 @@ class RestauranteApp(ctk.CTk):
                 f"${subtotal:,.0f}"
             ))
             
+        self.tabla_order.sincronizar(filas)
         self.total_var.set(f"Total: ${total:,.0f}")
 
+    @medir_accion()
     def add_menu_to_order(self):
         """Añade el menú seleccionado con la cantidad especificada al pedido."""
         selected_menu_str = self.menu_var_compra.get()
@@ -1197,26 +1294,43 @@ class RestauranteApp(ctk.CTk):
         menu_nombre = selected_menu_obj.nombre
         menu_precio = selected_menu_obj.precio
 
-        found = False
-        for item in self.current_order_items:
-            if item['id'] == menu_id:
-                item['cantidad'] += cantidad
-                found = True
-                break
-        
-        if not found:
-            self.current_order_items.append({
-                'id': menu_id,
-                'nombre': menu_nombre,
-                'precio': menu_precio,
-                'cantidad': cantidad
-            })
+        # Revisar stock para el pedido completo (recetas desde el cache)
+        lineas = [{"id": item['id'], "cantidad": item['cantidad']} for item in self.current_order_items]
+        lineas.append({"id": menu_id, "cantidad": cantidad})
 
-        self.update_order_display()
-        self.mostrar_mensaje(f"Se añadieron {cantidad} x '{menu_nombre}' al pedido.", tipo="success")
-        self.cantidad_entry_compra.delete(0, "end")
-        self.cantidad_entry_compra.insert(0, "1")
+        def verificar():
+            with unidad_de_trabajo() as db:
+                return pcrud.verificar_disponibilidad(db, lineas)
+
+        def listo(faltantes):
+            if faltantes:
+                nombre_ing, stock, necesario = faltantes[0]
+                self.mostrar_mensaje(f"Stock insuficiente para añadir '{menu_nombre}': falta '{nombre_ing}' (Tienes {stock:,.2f}, necesitas {necesario:,.2f}).", tipo="error")
+                return
+
+            found = False
+            for item in self.current_order_items:
+                if item['id'] == menu_id:
+                    item['cantidad'] += cantidad
+                    found = True
+                    break
+            
+            if not found:
+                self.current_order_items.append({
+                    'id': menu_id,
+                    'nombre': menu_nombre,
+                    'precio': menu_precio,
+                    'cantidad': cantidad
+                })
 
+            self.update_order_display()
+            self.mostrar_mensaje(f"Se añadieron {cantidad} x '{menu_nombre}' al pedido.", tipo="success")
+            self.cantidad_entry_compra.delete(0, "end")
+            self.cantidad_entry_compra.insert(0, "1")
+
+        self.ejecutor.enviar(verificar, nombre="add_menu_to_order", al_terminar=listo, al_fallar=self.fallo("No se pudo verificar el stock"))
+
+    @medir_accion()
     def remove_menu_from_order(self):
         """Elimina el menú seleccionado del Treeview y de la lista interna."""
         
@@ -1233,12 +1347,14 @@ class RestauranteApp(ctk.CTk):
         self.update_order_display()
         self.mostrar_mensaje("Ítem eliminado del pedido.", tipo="info")
 
+    @medir_accion()
     def clear_order(self):
         """Limpia el pedido actual."""
         self.current_order_items = []
         self.update_order_display()
         self.mostrar_mensaje("Pedido limpiado.", tipo="info")
 
+    @medir_accion()
     def finalize_order(self):
         """Procesa la compra y descuenta el stock (Llamada CRÍTICA al CRUD)."""
         if not self.current_order_items:
@@ -1260,22 +1376,67 @@ class RestauranteApp(ctk.CTk):
             for item in self.current_order_items
         ]
 
-        db = self.get_db_session()
-        if not db: return
+        if self.cola_pedidos:
+            # Modo diferido: se encola y el resultado se revisa con after()
+            items_pedido = list(self.current_order_items)
+            futuro = self.cola_pedidos.encolar(cliente_id, menus_pedido_for_crud)
+            self.current_order_items = []
+            self.update_order_display()
+            self.mostrar_mensaje("Pedido enviado. Guardando...", tipo="info")
+            self.esperar_pedido_en_cola(futuro, items_pedido)
+            return
 
-        try:
-            nuevo_pedido = pcrud.crear_pedido(db, cliente_id, menus_pedido_for_crud)
-            
+        # Se guarda en un hilo; el pedido sale de la pantalla ya (y vuelve si falla)
+        items_pedido = list(self.current_order_items)
+
+        def guardar():
+            with medir("finalizar_pedido"), unidad_de_trabajo() as db:
+                return pcrud.crear_pedido(db, cliente_id, menus_pedido_for_crud)
+
+        def devolver_pedido():
+            if not self.current_order_items:
+                self.current_order_items = items_pedido
+                self.update_order_display()
+
+        def listo(nuevo_pedido):
             if nuevo_pedido:
                 self.mostrar_mensaje(f"Pedido #{nuevo_pedido.id} finalizado con éxito. Total: ${nuevo_pedido.total:,.0f}.", tipo="success")
-                self.clear_order() 
                 self.cargar_lista_ingredientes() 
             else:
+                devolver_pedido()
                 self.mostrar_mensaje("Fallo al finalizar el pedido. (Stock insuficiente o error de BD)", tipo="error")
-        except Exception as e:
+
+        def fallo(e):
+            devolver_pedido()
             self.mostrar_mensaje(f"Error inesperado al procesar el pedido: {e}", tipo="error")
-        finally:
-            db.close()
+
+        self.current_order_items = []
+        self.update_order_display()
+        self.mostrar_mensaje("Procesando pedido...", tipo="info")
+        self.ejecutor.enviar(guardar, nombre="finalize_order", al_terminar=listo, al_fallar=fallo)
+
+    def esperar_pedido_en_cola(self, futuro, items_pedido: list):
+        """Revisa (desde el hilo de Tk) si la cola ya guardó el pedido."""
+        if not futuro.done():
+            self.after(20, self.esperar_pedido_en_cola, futuro, items_pedido)
+            return
+        try:
+            resultado = futuro.result()
+            self.mostrar_mensaje(f"Pedido #{resultado['id']} finalizado con éxito. Total: ${resultado['total']:,.0f}.", tipo="success")
+            self.cargar_lista_ingredientes()
+        except Exception as e:
+            # Se devuelve el pedido a la pantalla para corregirlo (si no se empezó otro)
+            if not self.current_order_items:
+                self.current_order_items = items_pedido
+                self.update_order_display()
+            self.mostrar_mensaje(f"Error al procesar el pedido: {e}", tipo="error")
+
+    def al_cerrar(self):
+        """Termina las escrituras en curso y guarda los pedidos que queden en la cola antes de cerrar la ventana."""
+        self.ejecutor.cerrar()
+        if self.cola_pedidos:
+            self.cola_pedidos.detener()
+        self.destroy()
 
     # ====================================================
     # PESTAÑA 5: GRÁFICOS ESTADÍSTICOS (CORREGIDO)
@@ -1296,7 +1457,7 @@ class RestauranteApp(ctk.CTk):
         ctk.CTkLabel(control_frame, text="Tipo de Reporte:").pack(side="left", padx=10, pady=10)
         
         self.grafico_var = ctk.StringVar(control_frame)
-        opciones_graficos = ["Ventas Diarias", "Ventas Mensuales", "Ventas Anuales", "Menús Más Comprados", "Uso Total de Ingredientes"]
+        opciones_graficos = ["Ventas Diarias", "Ventas Mensuales", "Ventas Anuales", "Menús Más Comprados", "Ingresos por Menú", "Uso Total de Ingredientes"]
         self.grafico_var.set(opciones_graficos[0]) 
         
         grafico_menu = ctk.CTkComboBox(control_frame, variable=self.grafico_var, values=opciones_graficos, state="readonly", width=200)
@@ -1309,32 +1470,35 @@ class RestauranteApp(ctk.CTk):
         self.chart_frame = ctk.CTkFrame(tab)
         self.chart_frame.grid(row=2, column=0, padx=20, pady=(0, 20), sticky="nsew")
     
+    @medir_accion()
     def generate_report(self):
         """Genera el reporte llamando a graficos.py y lo incrusta en la GUI."""
         seleccion = self.grafico_var.get()
-        
-        db = self.get_db_session()
-        if not db: return
 
-        fig = None
-        try:
+        def generar():
+            # La consulta y la figura (matplotlib.figure.Figure, sin pyplot) se arman en el hilo
+            with medir(f"generate_report: {seleccion}"), unidad_de_trabajo() as db:
+                # Llamar a la función correspondiente en graficos.py según lo que elegiste en el menú
+                if seleccion == "Ventas Diarias":
+                    return gcrud.generar_grafico_ventas(db, "day")
+                elif seleccion == "Ventas Mensuales":
+                    return gcrud.generar_grafico_ventas(db, "month")
+                elif seleccion == "Ventas Anuales":
+                    return gcrud.generar_grafico_ventas(db, "year")
+                elif seleccion == "Menús Más Comprados":
+                    return gcrud.generar_grafico_menus(db)
+                elif seleccion == "Ingresos por Menú":
+                    return gcrud.generar_grafico_ingresos_menus(db)
+                elif seleccion == "Uso Total de Ingredientes":
+                    return gcrud.generar_grafico_ingredientes(db)
+                return None
+
+        def dibujar(fig):
             # 1. Limpiar gráfico anterior si existe (para que no se monten uno encima de otro)
             for widget in self.chart_frame.winfo_children():
                 widget.destroy()
 
-            # 2. Llamar a la función correspondiente en graficos.py según lo que elegiste en el menú
-            if seleccion == "Ventas Diarias":
-                fig = gcrud.generar_grafico_ventas(db, "day")
-            elif seleccion == "Ventas Mensuales":
-                fig = gcrud.generar_grafico_ventas(db, "month")
-            elif seleccion == "Ventas Anuales":
-                fig = gcrud.generar_grafico_ventas(db, "year")
-            elif seleccion == "Menús Más Comprados":
-                fig = gcrud.generar_grafico_menus(db)
-            elif seleccion == "Uso Total de Ingredientes":
-                fig = gcrud.generar_grafico_ingredientes(db)
-
-            # 3. Dibujar el gráfico en la ventana
+            # 2. Dibujar el gráfico en la ventana
             if fig:
                 # Esto es lo que "pega" el gráfico de Matplotlib dentro de la ventana de Tkinter
                 canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
@@ -1345,10 +1509,8 @@ class RestauranteApp(ctk.CTk):
                 label = ctk.CTkLabel(self.chart_frame, text="No hay datos suficientes para generar este gráfico.\n(Realiza algunos pedidos primero)", font=("Arial", 16))
                 label.pack(pady=50)
 
-        except Exception as e:
-            self.mostrar_mensaje(f"Error al generar gráfico: {e}", tipo="error")
-        finally:
-            db.close()
+        # Si se pide otro gráfico antes de que termine este, solo se dibuja el último
+        self.ejecutor.enviar(generar, clave="grafico", al_terminar=dibujar, al_fallar=self.fallo("Error al generar gráfico"))
 
 
     #====================================================
@@ -1369,8 +1531,18 @@ class RestauranteApp(ctk.CTk):
         
         # Reusamos la lógica de clientes para llenar este combo
         self.filtro_cliente_var = ctk.StringVar(value="Todos")
-        self.combo_filtro_cliente = ctk.CTkComboBox(filter_frame, variable=self.filtro_cliente_var, state="readonly", width=250)
+        self.combo_filtro_cliente = ctk.CTkComboBox(filter_frame, variable=self.filtro_cliente_var, width=250)
         self.combo_filtro_cliente.pack(side="left", padx=10)
+        self.conectar_busqueda_combo(self.combo_filtro_cliente, "buscar_filtro_cliente", opciones_clientes,
+                                     lambda opciones: None, fijas=("Todos",))
+        
+        # Filtros opcionales: rango de fechas (AAAA-MM-DD) y total mínimo
+        self.filtro_desde_entry = ctk.CTkEntry(filter_frame, placeholder_text="Desde AAAA-MM-DD", width=130)
+        self.filtro_desde_entry.pack(side="left", padx=5)
+        self.filtro_hasta_entry = ctk.CTkEntry(filter_frame, placeholder_text="Hasta AAAA-MM-DD", width=130)
+        self.filtro_hasta_entry.pack(side="left", padx=5)
+        self.filtro_total_entry = ctk.CTkEntry(filter_frame, placeholder_text="Total mín.", width=90)
+        self.filtro_total_entry.pack(side="left", padx=5)
         
         ctk.CTkButton(filter_frame, text="Filtrar / Actualizar", command=self.cargar_historial_pedidos).pack(side="left", padx=10)
         ctk.CTkButton(filter_frame, text="Eliminar Pedido Seleccionado", fg_color="red", command=self.eliminar_pedido_gui).pack(side="right", padx=10)
@@ -1393,10 +1565,16 @@ class RestauranteApp(ctk.CTk):
         
         self.tree_pedidos.pack(side="left", fill="both", expand=True)
         
-        # Scrollbar para pedidos
-        sb_ped = ttk.Scrollbar(frame_lista, orient="vertical", command=self.tree_pedidos.yview)
-        sb_ped.pack(side="right", fill="y")
-        self.tree_pedidos.configure(yscrollcommand=sb_ped.set)
+        # Scrollbar para pedidos (al acercarse al final se carga la página siguiente)
+        self.sb_pedidos = ttk.Scrollbar(frame_lista, orient="vertical", command=self.tree_pedidos.yview)
+        self.sb_pedidos.pack(side="right", fill="y")
+        self.tree_pedidos.configure(yscrollcommand=self.scroll_historial_pedidos)
+
+        # Estado de la paginación del historial
+        self.historial_filtros = {}
+        self.historial_cursor = None      # (fecha, id) de la última fila cargada
+        self.historial_hay_mas = False
+        self.historial_cargando = False
 
         # Evento: Al hacer click en un pedido, mostrar detalle
         self.tree_pedidos.bind("<<TreeviewSelect>>", self.mostrar_detalle_pedido)
@@ -1420,52 +1598,117 @@ class RestauranteApp(ctk.CTk):
         
         self.tree_detalle.pack(side="left", fill="both", expand=True)
 
+    TAMANO_PAGINA_HISTORIAL = 100
+
+    def leer_filtros_historial(self):
+        """Lee los filtros del historial. Devuelve un dict para leer_historial_pedidos o None si hay un error."""
+        filtros = {}
+
+        # Extraer ID del string "Nombre (ID: 5)"
+        seleccion = self.filtro_cliente_var.get()
+        if seleccion != "Todos":
+            try:
+                filtros["cliente_id"] = int(seleccion.split("ID: ")[1].replace(")", ""))
+            except (IndexError, ValueError):
+                self.mostrar_mensaje("Error al interpretar filtro de cliente (elige uno de la lista o 'Todos').", tipo="error")
+                return None
+
+        try:
+            desde_str = self.filtro_desde_entry.get().strip()
+            hasta_str = self.filtro_hasta_entry.get().strip()
+            if desde_str:
+                filtros["desde"] = datetime.strptime(desde_str, "%Y-%m-%d")
+            if hasta_str:
+                # "Hasta" incluye el día completo
+                filtros["hasta"] = datetime.strptime(hasta_str, "%Y-%m-%d") + timedelta(days=1)
+        except ValueError:
+            self.mostrar_mensaje("Las fechas del filtro deben tener formato AAAA-MM-DD.", tipo="error")
+            return None
+
+        total_str = self.filtro_total_entry.get().strip()
+        if total_str:
+            try:
+                filtros["total_minimo"] = float(total_str)
+            except ValueError:
+                self.mostrar_mensaje("El total mínimo debe ser un número.", tipo="error")
+                return None
+
+        return filtros
+
+    @medir_accion()
     def cargar_historial_pedidos(self):
-        """Carga los pedidos en la tabla superior, aplicando filtro si es necesario."""
+        """Recarga el historial desde la primera página, aplicando los filtros."""
         # 1. Actualizar Combo de Clientes (por si hay nuevos)
-        db = self.get_db_session()
-        if not db: return
-        
-        try:
-            # Llenar combo
-            clientes = ccrud.listar_clientes(db)
-            opciones = ["Todos"] + [f"{c.nombre} (ID: {c.id})" for c in clientes]
-            self.combo_filtro_cliente.configure(values=opciones)
-            
-            # Determinar filtro
-            seleccion = self.filtro_cliente_var.get()
-            pedidos = []
-            
-            if seleccion == "Todos":
-                pedidos = pcrud.leer_todos_los_pedidos(db)
-            else:
-                # Extraer ID del string "Nombre (ID: 5)"
-                try:
-                    cliente_id = int(seleccion.split("ID: ")[1].replace(")", ""))
-                    pedidos = pcrud.leer_pedidos_por_cliente(db, cliente_id)
-                except:
-                    self.mostrar_mensaje("Error al interpretar filtro de cliente.", tipo="error")
-                    pedidos = []
-
-            # Limpiar tabla
-            for item in self.tree_pedidos.get_children():
-                self.tree_pedidos.delete(item)
-            
-            # Llenar tabla
-            for p in pedidos:
+        def leer_clientes():
+            with medir("cargar_historial_pedidos"), unidad_de_trabajo() as db:
+                return ["Todos"] + list(opciones_clientes(db))
+
+        self.ejecutor.enviar(leer_clientes, clave="filtro_clientes",
+                             al_terminar=lambda opciones: self.combo_filtro_cliente.configure(values=opciones),
+                             al_fallar=self.fallo("Error al cargar clientes"))
+
+        # 2. Determinar filtros
+        filtros = self.leer_filtros_historial()
+        if filtros is None:
+            return
+
+        # 3. Reiniciar paginación y limpiar tablas (una página en curso con los filtros viejos se descarta)
+        self.historial_filtros = filtros
+        self.historial_cursor = None
+        self.historial_hay_mas = True
+        self.historial_cargando = False
+
+        for item in self.tree_pedidos.get_children():
+            self.tree_pedidos.delete(item)
+        for item in self.tree_detalle.get_children():
+            self.tree_detalle.delete(item)
+
+        self.cargar_pagina_historial()
+
+    @medir_accion()
+    def cargar_pagina_historial(self):
+        """Agrega al final de la tabla la siguiente página del historial (keyset por fecha, id)."""
+        if self.historial_cargando or not self.historial_hay_mas:
+            return
+
+        self.historial_cargando = True
+        cursor, filtros = self.historial_cursor, dict(self.historial_filtros)
+
+        def leer():
+            with medir("cargar_pagina_historial"), unidad_de_trabajo() as db:
+                return pcrud.leer_historial_pedidos(
+                    db,
+                    limite=self.TAMANO_PAGINA_HISTORIAL,
+                    despues_de=cursor,
+                    **filtros
+                )
+
+        def pintar(filas):
+            self.historial_cargando = False
+            for pedido_id, fecha, nombre_cliente, total in filas:
                 # Formato fecha seguro
-                fecha_str = p.fecha.strftime("%Y-%m-%d %H:%M") if p.fecha else "---"
-                nombre_cliente = p.cliente.nombre if p.cliente else "Cliente Eliminado"
-                
-                self.tree_pedidos.insert("", "end", values=(p.id, fecha_str, nombre_cliente, f"${p.total:,.0f}"))
-                
-            # Limpiar detalle
-            for item in self.tree_detalle.get_children():
-                self.tree_detalle.delete(item)
-                
-        finally:
-            db.close()
+                fecha_str = fecha.strftime("%Y-%m-%d %H:%M") if fecha else "---"
+                self.tree_pedidos.insert("", "end", values=(pedido_id, fecha_str, nombre_cliente or "Cliente Eliminado", f"${total:,.0f}"))
+
+            if filas:
+                self.historial_cursor = (filas[-1][1], filas[-1][0])
+            self.historial_hay_mas = len(filas) == self.TAMANO_PAGINA_HISTORIAL
+
+            self.mostrar_mensaje(f"Historial: {len(self.tree_pedidos.get_children())} pedidos cargados{' (desplázate para ver más)' if self.historial_hay_mas else ''}.", tipo="info")
+
+        def fallo(e):
+            self.historial_cargando = False
+            self.mostrar_mensaje(f"Error al cargar el historial: {e}", tipo="error")
 
+        self.ejecutor.enviar(leer, clave="historial", al_terminar=pintar, al_fallar=fallo)
+
+    def scroll_historial_pedidos(self, primero, ultimo):
+        """yscrollcommand del historial: mueve la scrollbar y pide otra página cerca del final."""
+        self.sb_pedidos.set(primero, ultimo)
+        if float(ultimo) >= 0.9 and self.historial_hay_mas and not self.historial_cargando:
+            self.after_idle(self.cargar_pagina_historial)
+
+    @medir_accion()
     def mostrar_detalle_pedido(self, event):
         """Muestra los ítems del pedido seleccionado en la tabla inferior."""
         selected = self.tree_pedidos.focus()
@@ -1474,33 +1717,31 @@ class RestauranteApp(ctk.CTk):
         values = self.tree_pedidos.item(selected, "values")
         pedido_id = int(values[0])
         
-        db = self.get_db_session()
-        if not db: return
-        
-        try:
-            pedido = pcrud.leer_pedido_por_id(db, pedido_id)
-            
+        # Pedido, cliente y líneas (con su precio de venta) en un número fijo de consultas
+        def leer():
+            with medir("mostrar_detalle_pedido"), unidad_de_trabajo() as db:
+                return pcrud.leer_detalle_pedido(db, pedido_id)
+
+        def pintar(detalle):
             # Limpiar tabla detalle
             for item in self.tree_detalle.get_children():
                 self.tree_detalle.delete(item)
                 
-            if not pedido: return
+            if not detalle: return
             
-            # Llenar con los items (relación items_comprados)
-            for item in pedido.items_comprados:
-                menu_nombre = item.menu.nombre if item.menu else "Menú borrado"
-                precio_unit = item.menu.precio if item.menu else 0
-                subtotal = precio_unit * item.cantidad
-                
+            # Llenar con las líneas del pedido
+            for linea in detalle["lineas"]:
                 self.tree_detalle.insert("", "end", values=(
-                    menu_nombre, 
-                    item.cantidad, 
-                    f"${precio_unit:,.0f}", 
-                    f"${subtotal:,.0f}"
+                    linea["nombre"], 
+                    linea["cantidad"], 
+                    f"${linea['precio_unitario']:,.0f}", 
+                    f"${linea['subtotal']:,.0f}"
                 ))
-        finally:
-            db.close()
 
+        # Al recorrer la lista con el teclado solo se pinta el detalle del último pedido seleccionado
+        self.ejecutor.enviar(leer, clave="detalle_pedido", al_terminar=pintar, al_fallar=self.fallo("Error al leer el pedido"))
+
+    @medir_accion()
     def eliminar_pedido_gui(self):
         """Llama al CRUD para eliminar el pedido."""
         selected = self.tree_pedidos.focus()
@@ -1512,14 +1753,15 @@ class RestauranteApp(ctk.CTk):
         pedido_id = int(values[0])
         
         if messagebox.askyesno("Confirmar", f"¿Eliminar el Pedido #{pedido_id}? Esta acción es irreversible."):
-            db = self.get_db_session()
-            if not db: return
-            
-            try:
-                if pcrud.eliminar_pedido(db, pedido_id):
+            def eliminar():
+                with unidad_de_trabajo() as db:
+                    return pcrud.eliminar_pedido(db, pedido_id)
+
+            def listo(eliminado):
+                if eliminado:
                     self.mostrar_mensaje(f"Pedido #{pedido_id} eliminado.", tipo="success")
                     self.cargar_historial_pedidos() # Recargar tabla
                 else:
                     self.mostrar_mensaje("Error al eliminar el pedido.", tipo="error")
-            finally:
-                db.close()
\ No newline at end of file
+
+            self.ejecutor.enviar(eliminar, nombre="eliminar_pedido_gui", al_terminar=listo, al_fallar=self.fallo("Error al eliminar el pedido"))
\ No newline at end of file
@@ -0,0 +1,108 @@
+# Archivo: benchmarks/bench_async_pedidos.py
+#
+# Pedidos/segundo con muchas cajas (terminales) concurrentes:
+#   - sync, un hilo por caja (crud/ + unidad_de_trabajo)
+#   - async, una tarea por caja en un solo event loop (crud_async/ + aiosqlite)
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/bench_async_pedidos.py --pedidos 2000 --cajas 1 8 32
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from comun import nueva_sesion, sembrar_catalogo
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import crear_motor_async, crear_fabrica_async, unidad_de_trabajo, unidad_de_trabajo_async
+from crud import cache_recetas
+from crud import pedido_crud as pcrud
+from crud_async import pedido_crud as apcrud
+
+
+def lineas_de_pedido(numero: int, menu_ids: list):
+    rnd = random.Random(numero)
+    return [{"id": menu_id, "cantidad": rnd.randint(1, 3)} for menu_id in rnd.sample(menu_ids, 3)]
+
+
+def preparar(ruta_db: str):
+    cache_recetas.invalidar()
+    engine, db = nueva_sesion(ruta_db)
+    cliente_id, menu_ids = sembrar_catalogo(db, menus=30)
+    db.close()
+    return engine, cliente_id, menu_ids
+
+
+def contar_pedidos(engine):
+    with unidad_de_trabajo(sessionmaker(bind=engine)) as db:
+        return db.query(func.count(models.Pedido.id)).scalar()
+
+
+def medir_sync(ruta_db: str, pedidos: int, cajas: int):
+    engine, cliente_id, menu_ids = preparar(ruta_db)
+    fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def tarea(numero: int):
+        with unidad_de_trabajo(fabrica) as db:
+            pcrud.crear_pedido(db, cliente_id, lineas_de_pedido(numero, menu_ids))
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=cajas) as pool:
+        list(pool.map(tarea, range(pedidos)))
+    duracion = time.perf_counter() - inicio
+
+    guardados = contar_pedidos(engine)
+    engine.dispose()
+    return duracion, guardados
+
+
+async def medir_async(ruta_db: str, pedidos: int, cajas: int):
+    engine, cliente_id, menu_ids = preparar(ruta_db)
+    motor = crear_motor_async(perfil="prod", url=f"sqlite:///{ruta_db}")
+    fabrica = crear_fabrica_async(motor)
+    pendientes = iter(range(pedidos))
+
+    async def caja():
+        # cada caja toma el siguiente pedido de la fila hasta que no queden
+        for numero in pendientes:
+            async with unidad_de_trabajo_async(fabrica) as db:
+                await apcrud.crear_pedido(db, cliente_id, lineas_de_pedido(numero, menu_ids))
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(caja() for _ in range(cajas)))
+    duracion = time.perf_counter() - inicio
+
+    await motor.dispose()
+    guardados = contar_pedidos(engine)
+    engine.dispose()
+    return duracion, guardados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pedidos/segundo con cajas concurrentes, sync vs async")
+    parser.add_argument("--pedidos", type=int, default=1000)
+    parser.add_argument("--cajas", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    print(f"{args.pedidos} pedidos por corrida\n")
+    print(f"{'cajas':>5}  {'sync (hilos)':>14}  {'async (tareas)':>14}")
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as nulo:
+        for cajas in args.cajas:
+            with contextlib.redirect_stdout(nulo):
+                t_sync, n_sync = medir_sync(os.path.join(tmp, f"sync_{cajas}.db"), args.pedidos, cajas)
+                t_async, n_async = asyncio.run(medir_async(os.path.join(tmp, f"async_{cajas}.db"), args.pedidos, cajas))
+            print(f"{cajas:>5}  {n_sync / t_sync:>10.1f} p/s  {n_async / t_async:>10.1f} p/s")
+            if n_sync != args.pedidos or n_async != args.pedidos:
+                print(f"       ADVERTENCIA: pedidos guardados sync={n_sync} async={n_async}")
+
+
+if __name__ == "__main__":
+    main()
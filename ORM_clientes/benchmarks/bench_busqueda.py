@@ -0,0 +1,100 @@
+# Archivo: benchmarks/bench_busqueda.py
+#
+# Latencia de la búsqueda mientras se escribe (cliente_crud.buscar_clientes,
+# índice FTS5 de la migración 5) contra el LIKE '%texto%' que haría falta sin
+# índice, sobre una BD sintética con muchos clientes. Cada consulta simula lo
+# que se escribe: "an", "ana", "ana p", ... para nombres (muy repetidos: el
+# LIKE encuentra 20 enseguida) y para el email de un cliente puntual
+# ("ana.perez76": el LIKE tiene que recorrer la tabla).
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/bench_busqueda.py --clientes 200000
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+from generar_datos import generar_bd, NOMBRES, APELLIDOS
+
+from sqlalchemy import or_
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import crear_motor
+from latencias import percentil
+from crud import cliente_crud as ccrud
+
+
+def _prefijos(completo: str):
+    return [completo[:n] for n in range(2, len(completo) + 1) if completo[n - 1] not in " ."]
+
+
+def textos_de_prueba(db, cantidad: int, semilla: int = 3):
+    """Prefijos de lo que se va escribiendo: (nombres, emails), `cantidad` búsquedas de cada tipo."""
+    rnd = random.Random(semilla)
+    nombres, emails = [], []
+    maximo_id = db.query(models.Cliente.id).order_by(models.Cliente.id.desc()).limit(1).scalar()
+    for _ in range(cantidad):
+        nombres.extend(_prefijos(f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}".lower()))
+        email = db.get(models.Cliente, rnd.randint(1, maximo_id)).email
+        emails.extend(_prefijos(email.split("@")[0]))
+    return nombres, emails
+
+
+def buscar_like(db, texto: str, limite: int = 20):
+    patron = f"%{texto}%"
+    return db.query(models.Cliente)\
+             .filter(or_(models.Cliente.nombre.ilike(patron), models.Cliente.email.ilike(patron)))\
+             .limit(limite).all()
+
+
+def medir(nombre: str, funcion, db, textos: list):
+    tiempos = []
+    for texto in textos:
+        inicio = time.perf_counter()
+        funcion(db, texto)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    print(f"{nombre:<20} {len(tiempos):5d} consultas   p50 {1000 * percentil(tiempos, 50):7.2f} ms   "
+          f"p95 {1000 * percentil(tiempos, 95):7.2f} ms   máx. {1000 * tiempos[-1]:7.2f} ms")
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de clientes")
+    parser.add_argument("--clientes", type=int, default=200000)
+    parser.add_argument("--busquedas", type=int, default=30, help="nombres completos a teclear")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "busqueda.db")
+        inicio = time.perf_counter()
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            generar_bd(ruta, clientes=args.clientes, ingredientes=50, menus=50, pedidos=1000, dias=30)
+        print(f"BD con {args.clientes} clientes generada en {time.perf_counter() - inicio:.1f} s\n")
+
+        engine = crear_motor(perfil="prod", url=f"sqlite:///{ruta}", echo=False)
+        db = sessionmaker(bind=engine)()
+        nombres, emails = textos_de_prueba(db, args.busquedas)
+        try:
+            fts = []
+            for titulo, textos in (("nombres", nombres), ("emails", emails)):
+                print(f"--- {titulo} ---")
+                fts += medir("FTS5 (buscar)", ccrud.buscar_clientes, db, textos)
+                medir("LIKE '%texto%'", buscar_like, db, textos)
+        finally:
+            db.close()
+            engine.dispose()
+
+        fts.sort()
+        objetivo = 0.020
+        estado = "OK" if percentil(fts, 95) < objetivo else "LENTO"
+        print(f"\n{estado}: p95 de la búsqueda indexada {'<' if estado == 'OK' else '>='} {objetivo * 1000:.0f} ms")
+        raise SystemExit(0 if estado == "OK" else 1)
+
+
+if __name__ == "__main__":
+    main()
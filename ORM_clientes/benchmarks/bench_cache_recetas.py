@@ -0,0 +1,59 @@
+# Archivo: benchmarks/bench_cache_recetas.py
+#
+# Pedidos/segundo (crear_pedido) con y sin el cache de recetas, y los
+# contadores de aciertos/fallos del cache.
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/bench_cache_recetas.py --pedidos 2000 --menus 50
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+from comun import nueva_sesion, sembrar_catalogo
+
+from crud import cache_recetas
+from crud import pedido_crud as pcrud
+
+
+def medir(con_cache: bool, ruta_db: str, pedidos: int, menus: int, semilla: int = 11):
+    rnd = random.Random(semilla)
+    cache_recetas.habilitado = con_cache
+    cache_recetas.invalidar()
+    cache_recetas.reiniciar_estadisticas()
+
+    engine, db = nueva_sesion(ruta_db)
+    try:
+        cliente_id, menu_ids = sembrar_catalogo(db, menus=menus)
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            inicio = time.perf_counter()
+            for _ in range(pedidos):
+                lineas = [{"id": menu_id, "cantidad": rnd.randint(1, 3)} for menu_id in rnd.sample(menu_ids, 3)]
+                pcrud.crear_pedido(db, cliente_id, lineas)
+            duracion = time.perf_counter() - inicio
+    finally:
+        db.close()
+        engine.dispose()
+    return duracion, dict(cache_recetas.estadisticas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pedidos/segundo con y sin cache de recetas")
+    parser.add_argument("--pedidos", type=int, default=1000)
+    parser.add_argument("--menus", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for con_cache in (False, True):
+            nombre = "con cache" if con_cache else "sin cache"
+            duracion, stats = medir(con_cache, os.path.join(tmp, f"{nombre.replace(' ', '_')}.db"), args.pedidos, args.menus)
+            print(f"{nombre:<10} {args.pedidos / duracion:8.1f} pedidos/s   aciertos={stats['aciertos']} fallos={stats['fallos']}")
+
+    cache_recetas.habilitado = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Archivo: benchmarks/bench_carga_csv.py
+#
+# Compara la carga CSV fila-a-fila (cargar_ingredientes_csv) contra la carga
+# masiva en una transacción (cargar_ingredientes_csv_masivo).
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/bench_carga_csv.py --lineas 50000 --nombres 300
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from comun import nueva_sesion
+
+from sqlalchemy import func
+
+import models
+from crud import ingrediente_crud as icrud
+
+
+def generar_csv(ruta: str, lineas: int, nombres: int, semilla: int = 42):
+    """Genera un CSV (nombre, unidad, cantidad) con nombres repetidos."""
+    rnd = random.Random(semilla)
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["nombre", "unidad", "cantidad"])
+        for _ in range(lineas):
+            writer.writerow([f"Ingrediente {rnd.randrange(nombres)}", "unid", rnd.randint(1, 50)])
+
+
+def medir(nombre: str, funcion, ruta_csv: str, ruta_db: str):
+    engine, db = nueva_sesion(ruta_db)
+    try:
+        inicio = time.perf_counter()
+        funcion(db, ruta_csv)
+        duracion = time.perf_counter() - inicio
+        stock_total = db.query(func.sum(models.Ingrediente.stock)).scalar() or 0
+        cantidad = db.query(func.count(models.Ingrediente.id)).scalar()
+    finally:
+        db.close()
+        engine.dispose()
+    print(f"{nombre:<28} {duracion:>9.3f} s   ingredientes={cantidad}  stock_total={stock_total:,.0f}")
+    return duracion, stock_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga CSV de ingredientes")
+    parser.add_argument("--lineas", type=int, default=5000)
+    parser.add_argument("--nombres", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_csv = os.path.join(tmp, "ingredientes.csv")
+        generar_csv(ruta_csv, args.lineas, args.nombres)
+        print(f"CSV de {args.lineas} lineas ({args.nombres} nombres distintos)\n")
+
+        t_fila, stock_fila = medir("fila a fila (actual)", icrud.cargar_ingredientes_csv, ruta_csv, os.path.join(tmp, "fila.db"))
+        t_masivo, stock_masivo = medir("masivo (1 transaccion)", icrud.cargar_ingredientes_csv_masivo, ruta_csv, os.path.join(tmp, "masivo.db"))
+
+        print(f"\nAceleracion: x{t_fila / t_masivo:,.1f}")
+        if abs(stock_fila - stock_masivo) > 1e-6:
+            print("ADVERTENCIA: los dos modos no dejaron el mismo stock total.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Archivo: benchmarks/bench_cola_pedidos.py
+#
+# Pedidos/segundo con varias cajas concurrentes:
+#   - un commit por pedido (crear_pedido en la unidad_de_trabajo de cada caja)
+#   - escritura diferida (ColaPedidos: un hilo escritor, un commit por lote)
+# Al final verifica que el stock y los pedidos guardados cuadran.
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/bench_cola_pedidos.py --pedidos 3000 --cajas 16 --lotes 1 16 64
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from comun import nueva_sesion, sembrar_catalogo
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import unidad_de_trabajo
+from crud import cache_recetas
+from crud import pedido_crud as pcrud
+from crud import movimientos_crud as movcrud
+from crud.cola_pedidos import ColaPedidos
+
+
+def lineas_de_pedido(numero: int, menu_ids: list):
+    rnd = random.Random(numero)
+    return [{"id": menu_id, "cantidad": rnd.randint(1, 3)} for menu_id in rnd.sample(menu_ids, 3)]
+
+
+def medir(ruta_db: str, pedidos: int, cajas: int, max_lote: int = None, perfil: str = "prod"):
+    """max_lote=None -> un commit por pedido; si no, escritura diferida con ese lote."""
+    cache_recetas.invalidar()
+    engine, db = nueva_sesion(ruta_db, perfil=perfil)
+    cliente_id, menu_ids = sembrar_catalogo(db, menus=30, stock=5000)
+    db.close()
+    fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    cola = ColaPedidos(fabrica, max_lote=max_lote).iniciar() if max_lote else None
+    resultados = {"ok": 0, "sin_stock": 0, "errores": []}
+
+    def caja(numeros):
+        for numero in numeros:
+            try:
+                if cola:
+                    cola.encolar(cliente_id, lineas_de_pedido(numero, menu_ids)).result()
+                else:
+                    with unidad_de_trabajo(fabrica) as sesion:
+                        pcrud.crear_pedido(sesion, cliente_id, lineas_de_pedido(numero, menu_ids))
+                resultados["ok"] += 1
+            except Exception as e:
+                if isinstance(e, pcrud.StockInsuficiente):
+                    resultados["sin_stock"] += 1
+                else:
+                    resultados["errores"].append(repr(e))
+
+    repartos = [range(c, pedidos, cajas) for c in range(cajas)]
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=cajas) as pool:
+        list(pool.map(caja, repartos))
+    duracion = time.perf_counter() - inicio
+    lotes = cola.estadisticas["lotes"] if cola else resultados["ok"]
+    if cola:
+        cola.detener()
+
+    with unidad_de_trabajo(fabrica) as sesion:
+        guardados = sesion.query(func.count(models.Pedido.id)).scalar()
+        minimo = sesion.query(func.min(models.Ingrediente.stock)).scalar()
+        diferencias = movcrud.verificar_stock(sesion)
+    engine.dispose()
+
+    consistente = guardados == resultados["ok"] and minimo >= 0 and not diferencias
+    return duracion, resultados, lotes, consistente
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Un commit por pedido vs escritura diferida con commit agrupado")
+    parser.add_argument("--pedidos", type=int, default=2000)
+    parser.add_argument("--cajas", type=int, default=16)
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 16, 64], help="max_lote de la cola a probar")
+    parser.add_argument("--perfil", default="prod", help="perfil de BD (dev: sin WAL, un fsync por commit)")
+    args = parser.parse_args()
+
+    print(f"{args.pedidos} pedidos desde {args.cajas} cajas (perfil {args.perfil})\n")
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as nulo:
+        for max_lote in [None] + args.lotes:
+            nombre = "un commit por pedido" if max_lote is None else f"cola, max_lote={max_lote}"
+            with contextlib.redirect_stdout(nulo):
+                duracion, r, lotes, consistente = medir(os.path.join(tmp, f"{max_lote}.db"), args.pedidos, args.cajas, max_lote, args.perfil)
+            print(f"{nombre:<24} {r['ok'] / duracion:8.1f} pedidos/s   transacciones={lotes:<5} "
+                  f"sin_stock={r['sin_stock']:<4} errores={len(r['errores']):<3} {'OK' if consistente else 'INCONSISTENTE'}")
+            if r["errores"]:
+                print(f"{'':<24} ej: {r['errores'][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Archivo: benchmarks/bench_menus_masivo.py
+#
+# Compara la creación de menús uno por uno (leer_menu_por_nombre + crear_menu,
+# como hacía la GUI) contra crear_menus_masivo (una transacción).
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/bench_menus_masivo.py --menus 2000 --ingredientes 300
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+from comun import nueva_sesion
+
+from sqlalchemy import func
+
+import models
+from crud import menu_crud as mcrud
+
+
+def preparar(ruta_db: str, ingredientes: int):
+    engine, db = nueva_sesion(ruta_db)
+    db.add_all([models.Ingrediente(nombre=f"Ingrediente {i}", stock=1000) for i in range(ingredientes)])
+    db.commit()
+    return engine, db
+
+
+def generar_catalogo(menus: int, ingredientes: int, semilla: int = 42):
+    """Lista de (nombre, precio, [(nombre_ingrediente, cantidad)])."""
+    rnd = random.Random(semilla)
+    catalogo = []
+    for m in range(menus):
+        receta = [(f"Ingrediente {i}", rnd.randint(1, 5)) for i in rnd.sample(range(ingredientes), 4)]
+        catalogo.append((f"Menu Franquicia {m}", rnd.randint(2000, 15000), receta))
+    return catalogo
+
+
+def uno_por_uno(db, catalogo):
+    ids_por_nombre = {i.nombre: i.id for i in db.query(models.Ingrediente).all()}
+    for nombre, precio, receta in catalogo:
+        if mcrud.leer_menu_por_nombre(db, nombre):
+            continue
+        receta_orm = [{"ingrediente_id": ids_por_nombre[n], "cantidad": c} for n, c in receta]
+        mcrud.crear_menu(db, nombre, f"Receta de {nombre}", precio, receta_orm)
+
+
+def medir(nombre: str, funcion, catalogo, ruta_db: str, ingredientes: int):
+    engine, db = preparar(ruta_db, ingredientes)
+    try:
+        inicio = time.perf_counter()
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            funcion(db, catalogo)
+        duracion = time.perf_counter() - inicio
+        menus = db.query(func.count(models.Menu.id)).scalar()
+        filas = db.query(func.count()).select_from(models.MenuIngrediente).scalar()
+    finally:
+        db.close()
+        engine.dispose()
+    print(f"{nombre:<28} {duracion:>9.3f} s   menus={menus}  filas_receta={filas}")
+    return duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de creación masiva de menús")
+    parser.add_argument("--menus", type=int, default=2000)
+    parser.add_argument("--ingredientes", type=int, default=300)
+    args = parser.parse_args()
+
+    catalogo = generar_catalogo(args.menus, args.ingredientes)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Catálogo de {args.menus} menús ({args.ingredientes} ingredientes)\n")
+        t_uno = medir("uno por uno (actual)", uno_por_uno, catalogo, os.path.join(tmp, "uno.db"), args.ingredientes)
+        t_lote = medir("masivo (1 transaccion)", mcrud.crear_menus_masivo, catalogo, os.path.join(tmp, "lote.db"), args.ingredientes)
+        print(f"\nAceleracion: x{t_uno / t_lote:,.1f}")
+
+
+if __name__ == "__main__":
+    main()
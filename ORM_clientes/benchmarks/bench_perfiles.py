@@ -0,0 +1,53 @@
+# Archivo: benchmarks/bench_perfiles.py
+#
+# Mide pedidos/segundo (crear_pedido) con cada perfil del motor (dev / prod).
+# La salida de echo del perfil dev y los print() del CRUD se descartan, pero
+# su costo se sigue midiendo.
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/bench_perfiles.py --pedidos 2000
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+from comun import nueva_sesion, sembrar_catalogo
+
+from database import PERFILES
+from crud import pedido_crud as pcrud
+
+
+def medir_perfil(perfil: str, ruta_db: str, pedidos: int, semilla: int = 7):
+    rnd = random.Random(semilla)
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        engine, db = nueva_sesion(ruta_db, perfil=perfil)
+        try:
+            cliente_id, menu_ids = sembrar_catalogo(db)
+            inicio = time.perf_counter()
+            for _ in range(pedidos):
+                lineas = [{"id": menu_id, "cantidad": rnd.randint(1, 3)} for menu_id in rnd.sample(menu_ids, 3)]
+                pcrud.crear_pedido(db, cliente_id, lineas)
+            duracion = time.perf_counter() - inicio
+        finally:
+            db.close()
+            engine.dispose()
+    return duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pedidos/segundo por perfil de motor")
+    parser.add_argument("--pedidos", type=int, default=1000)
+    parser.add_argument("--perfiles", nargs="+", default=list(PERFILES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for perfil in args.perfiles:
+            duracion = medir_perfil(perfil, os.path.join(tmp, f"{perfil}.db"), args.pedidos)
+            print(f"{perfil:<6} {args.pedidos} pedidos en {duracion:7.2f} s  ->  {args.pedidos / duracion:8.1f} pedidos/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# Archivo: benchmarks/carga_http.py
+#
+# Generador de carga para servicio_pedidos.py. Cada caja (hilo) usa una conexión
+# HTTP persistente y manda una mezcla de POST /pedidos, GET /menus y GET /stock.
+# Mide latencia p50/p99 por endpoint (del lado del cliente) y pedidos/segundo.
+#
+# Sin --url levanta el servicio en este proceso sobre una COPIA de
+# restaurante.db (con stock repuesto), así la BD real no se toca, y al final
+# comprueba que un precio cambiado desde otro proceso (como la GUI) se cobra
+# en el pedido siguiente (código de salida 1 si no).
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/carga_http.py --requests 2000 --cajas 8
+#   python benchmarks/carga_http.py --url http://127.0.0.1:8080 --cliente 1
+
+import argparse
+import contextlib
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from comun import nueva_sesion
+
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import crear_motor, ruta_base_datos, database_archivo
+from crud import cache_recetas
+from crud import menu_crud as mcrud
+from servicio_pedidos import crear_servicio
+from latencias import percentil
+
+
+def preparar_copia(tmp: str):
+    """Copia restaurante.db, repone el stock y asegura un cliente. Devuelve (ruta, cliente_id)."""
+    ruta = os.path.join(tmp, "carga.db")
+    shutil.copy(os.path.join(ruta_base_datos, database_archivo), ruta)
+    engine, db = nueva_sesion(ruta)
+    try:
+        db.query(models.Ingrediente).update({models.Ingrediente.stock: 1e9})
+        cliente = db.query(models.Cliente).first()
+        if cliente is None:
+            cliente = models.Cliente(nombre="Cliente Carga", email="carga@dominio.cl")
+            db.add(cliente)
+        db.commit()
+        return ruta, cliente.id
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def pedir(conexion, metodo: str, ruta: str, cuerpo=None):
+    datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else None
+    cabeceras = {"Content-Type": "application/json"} if datos else {}
+    conexion.request(metodo, ruta, body=datos, headers=cabeceras)
+    respuesta = conexion.getresponse()
+    return respuesta.status, json.loads(respuesta.read() or b"null")
+
+
+def cambiar_precio(url_bd: str, menu_id: int, precio: float):
+    """Cambia el precio de un menú con menu_crud (corre en otro proceso, como la GUI)."""
+    engine = crear_motor(perfil="prod", url=url_bd, echo=False)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        menu = mcrud.leer_menu_por_id(db, menu_id)
+        receta = [{"ingrediente_id": item.ingrediente_id, "cantidad": item.cantidad} for item in menu.items_receta]
+        resultado = mcrud.actualizar_menu_completo(db, menu_id, menu.nombre, menu.descripcion, precio, receta)
+        if isinstance(resultado, str):
+            raise SystemExit(resultado)
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def verificar_precio_nuevo(host: str, puerto: int, cliente_id: int, url_bd: str):
+    """
+    Pide un menú (queda su receta leída), cambia el precio desde otro proceso y
+    vuelve a pedirlo: el total tiene que salir con el precio nuevo.
+    Devuelve (ok, mensaje).
+    """
+    conexion = http.client.HTTPConnection(host, puerto, timeout=30)
+    try:
+        _, menus = pedir(conexion, "GET", "/menus")
+        menu = menus[0]
+        pedido = {"cliente_id": cliente_id, "lineas": [{"id": menu["id"], "cantidad": 1}]}
+        pedir(conexion, "POST", "/pedidos", pedido)
+
+        precio_nuevo = menu["precio"] + 100
+        proceso = multiprocessing.get_context("spawn").Process(target=cambiar_precio, args=(url_bd, menu["id"], precio_nuevo))
+        proceso.start()
+        proceso.join()
+        if proceso.exitcode != 0:
+            return False, f"no se pudo cambiar el precio del menú {menu['id']} (código {proceso.exitcode})"
+
+        estado, respuesta = pedir(conexion, "POST", "/pedidos", pedido)
+    finally:
+        conexion.close()
+    if estado != 201 or respuesta["total"] != precio_nuevo:
+        return False, f"menú {menu['id']}: se esperaba total {precio_nuevo:,.0f} y el servicio respondió {estado} {respuesta}"
+    return True, f"menú {menu['id']}: {menu['precio']:,.0f} -> {precio_nuevo:,.0f}, el pedido siguiente cobra {respuesta['total']:,.0f}"
+
+
+def generar_carga(host: str, puerto: int, cliente_id: int, requests: int, cajas: int, proporcion_pedidos: float):
+    conexion = http.client.HTTPConnection(host, puerto, timeout=30)
+    estado, menus = pedir(conexion, "GET", "/menus")
+    conexion.close()
+    if estado != 200 or not menus:
+        raise SystemExit(f"No se pudieron leer los menús (estado {estado}): {menus}")
+    menu_ids = [m["id"] for m in menus]
+
+    tiempos = {}
+    estados = {}
+    candado = threading.Lock()
+    pendientes = iter(range(requests))
+
+    def caja(numero_caja: int):
+        rnd = random.Random(numero_caja)
+        conexion = http.client.HTTPConnection(host, puerto, timeout=30)
+        try:
+            for _ in pendientes:
+                if rnd.random() < proporcion_pedidos:
+                    lineas = [{"id": m, "cantidad": rnd.randint(1, 3)} for m in rnd.sample(menu_ids, min(2, len(menu_ids)))]
+                    endpoint, args = "POST /pedidos", ("POST", "/pedidos", {"cliente_id": cliente_id, "lineas": lineas})
+                elif rnd.random() < 0.5:
+                    endpoint, args = "GET /menus", ("GET", "/menus")
+                else:
+                    endpoint, args = "GET /stock", ("GET", "/stock")
+                inicio = time.perf_counter()
+                estado, _ = pedir(conexion, *args)
+                duracion = time.perf_counter() - inicio
+                with candado:
+                    tiempos.setdefault(endpoint, []).append(duracion)
+                    estados[(endpoint, estado)] = estados.get((endpoint, estado), 0) + 1
+        finally:
+            conexion.close()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=cajas) as pool:
+        list(pool.map(caja, range(cajas)))
+    return time.perf_counter() - inicio, tiempos, estados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga HTTP sobre servicio_pedidos.py")
+    parser.add_argument("--url", default=None, help="servicio ya levantado; si no se indica se levanta uno sobre una copia de restaurante.db")
+    parser.add_argument("--cliente", type=int, default=None, help="cliente_id de los pedidos (obligatorio con --url)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cajas", type=int, default=8)
+    parser.add_argument("--pedidos", type=float, default=0.7, help="proporción de requests que son pedidos")
+    parser.add_argument("--max-concurrentes", type=int, default=8, help="límite del servicio levantado en este proceso")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as nulo:
+        servicio = None
+        if args.url:
+            if args.cliente is None:
+                raise SystemExit("Con --url hay que indicar --cliente.")
+            destino = urlparse(args.url)
+            host, puerto, cliente_id = destino.hostname, destino.port or 80, args.cliente
+        else:
+            ruta, cliente_id = preparar_copia(tmp)
+            cache_recetas.invalidar()
+            with contextlib.redirect_stdout(nulo):
+                servicio = crear_servicio("127.0.0.1", 0, perfil="prod", url=f"sqlite:///{ruta}",
+                                          max_concurrentes=args.max_concurrentes)
+            host, puerto = servicio.server_address
+            threading.Thread(target=servicio.serve_forever, daemon=True).start()
+
+        try:
+            with contextlib.redirect_stdout(nulo):
+                duracion, tiempos, estados = generar_carga(host, puerto, cliente_id, args.requests, args.cajas, args.pedidos)
+                precio = verificar_precio_nuevo(host, puerto, cliente_id, f"sqlite:///{ruta}") if servicio else None
+        finally:
+            if servicio:
+                servicio.shutdown()
+                servicio.server_close()
+
+    print(f"{args.requests} requests con {args.cajas} cajas en {duracion:.2f} s ({args.requests / duracion:,.0f} req/s)\n")
+    print(f"{'endpoint':<15} {'n':>6} {'p50 ms':>9} {'p99 ms':>9}   respuestas")
+    for endpoint in sorted(tiempos):
+        valores = sorted(tiempos[endpoint])
+        respuestas = {estado: n for (e, estado), n in estados.items() if e == endpoint}
+        print(f"{endpoint:<15} {len(valores):>6} {1000 * percentil(valores, 50):>9.2f} {1000 * percentil(valores, 99):>9.2f}   {respuestas}")
+
+    pedidos_ok = estados.get(("POST /pedidos", 201), 0)
+    print(f"\nPedidos creados: {pedidos_ok} ({pedidos_ok / duracion:,.1f} pedidos/s)")
+
+    if precio is not None:
+        ok, mensaje = precio
+        print(f"{'OK' if ok else 'FALLA'}: precio cambiado desde otro proceso, {mensaje}")
+        raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Archivo: benchmarks/comun.py
+#
+# Utilidades compartidas por los scripts de benchmarks/.
+# Los scripts se ejecutan desde ORM_clientes/ (python benchmarks/<script>.py).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# El motor global de database.py no debe escribir echo en los benchmarks
+os.environ.setdefault("RESTAURANTE_DB_PERFIL", "prod")
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import Base, crear_motor
+from crud import movimientos_crud
+
+
+def nueva_sesion(ruta_db: str, perfil: str = "prod"):
+    """Crea un motor (con el perfil indicado) sobre un archivo nuevo y devuelve (engine, sesion)."""
+    engine = crear_motor(perfil=perfil, url=f"sqlite:///{ruta_db}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+
+
+def sembrar_catalogo(db, menus: int = 20, ingredientes_por_menu: int = 4, stock: float = 1e9):
+    """
+    Inserta un catálogo mínimo para simular pedidos: 1 cliente, ingredientes con
+    stock de sobra y `menus` menús con receta. Devuelve (cliente_id, [menu_id]).
+    """
+    cliente = models.Cliente(nombre="Cliente Benchmark", email="benchmark@dominio.cl")
+    db.add(cliente)
+
+    ingredientes = [models.Ingrediente(nombre=f"Ingrediente {i}", stock=stock) for i in range(menus * 2)]
+    db.add_all(ingredientes)
+    db.flush()
+    movimientos_crud.registrar_movimientos(db, movimientos_crud.COMPRA, {i.id: stock for i in ingredientes})
+
+    lista_menus = []
+    for m in range(menus):
+        menu = models.Menu(nombre=f"Menu {m}", descripcion="benchmark", precio=1000 + m * 100)
+        for k in range(ingredientes_por_menu):
+            ingrediente = ingredientes[(m + k) % len(ingredientes)]
+            menu.items_receta.append(models.MenuIngrediente(ingrediente=ingrediente, cantidad=1 + k))
+        lista_menus.append(menu)
+    db.add_all(lista_menus)
+    db.commit()
+    return cliente.id, [m.id for m in lista_menus]
+
+
+def insertar_por_lotes(conn, tabla, filas: list, tamano_lote: int):
+    """INSERT masivo (executemany de Core) de `filas` en lotes de `tamano_lote`."""
+    for inicio in range(0, len(filas), tamano_lote):
+        conn.execute(insert(tabla), filas[inicio:inicio + tamano_lote])
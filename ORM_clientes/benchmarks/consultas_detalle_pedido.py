@@ -0,0 +1,57 @@
+# Archivo: benchmarks/consultas_detalle_pedido.py
+#
+# Cantidad de consultas de pedido_crud.leer_detalle_pedido: tiene que ser fija
+# (pedido+cliente, y las líneas), sin importar cuántas líneas tenga el pedido.
+# Cuenta las sentencias con un listener before_cursor_execute sobre una BD
+# temporal y sale con código 1 si algún caso pasa de MAXIMO_CONSULTAS.
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/consultas_detalle_pedido.py
+
+import contextlib
+import os
+import tempfile
+
+from comun import nueva_sesion, sembrar_catalogo
+
+from sqlalchemy import event
+
+from crud import pedido_crud as pcrud
+
+MAXIMO_CONSULTAS = 2
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = nueva_sesion(os.path.join(tmp, "detalle.db"))
+        try:
+            cliente_id, menu_ids = sembrar_catalogo(db, menus=20)
+            with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+                casos = [(f"pedido con {n} línea(s)", pcrud.crear_pedido(db, cliente_id, [{"id": m, "cantidad": 1} for m in menu_ids[:n]]).id)
+                         for n in (1, 5, 20)]
+            casos.append(("pedido inexistente", 999999))
+
+            sentencias = []
+            event.listen(engine, "before_cursor_execute", lambda *args: sentencias.append(args[2]))
+
+            fallos = 0
+            for nombre, pedido_id in casos:
+                db.expunge_all()  # sin objetos en la sesión: todo sale de la BD
+                sentencias.clear()
+                detalle = pcrud.leer_detalle_pedido(db, pedido_id)
+                lineas = len(detalle["lineas"]) if detalle else 0
+                estado = "OK" if len(sentencias) <= MAXIMO_CONSULTAS else "FALLA"
+                fallos += estado == "FALLA"
+                print(f"{estado:<6} {nombre:<24} {lineas:3d} líneas   {len(sentencias)} / {MAXIMO_CONSULTAS} consultas")
+                if estado == "FALLA":
+                    for sql in sentencias:
+                        print("         " + " ".join(sql.split())[:120])
+        finally:
+            db.close()
+            engine.dispose()
+
+    raise SystemExit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
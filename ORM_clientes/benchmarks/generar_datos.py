@@ -0,0 +1,268 @@
+# Archivo: benchmarks/generar_datos.py
+#
+# Generador rápido de datos sintéticos para pruebas de carga.
+#
+# Escribe directo con INSERT masivos (executemany de Core) por lotes, sin pasar
+# por crear_pedido, en una sola transacción. Con la misma semilla genera
+# exactamente los mismos datos. Distribuciones:
+#   - hora del pedido: picos de almuerzo (12-14 h) y cena (19-21 h)
+#   - día: más pedidos viernes y sábado, y una tendencia leve al alza
+#   - menús y clientes: popularidad tipo Zipf (pocos concentran muchas ventas)
+#   - líneas por pedido (1-4) y unidades por línea (1-3), sesgadas a pocas
+#
+# El stock queda consistente: cada ingrediente entra con una compra inicial que
+# cubre todo el periodo, las ventas se registran como un movimiento por
+# ingrediente y día, e Ingrediente.stock = compra - consumo (verificar_stock da 0).
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/generar_datos.py --bd /tmp/carga.db --clientes 10000 --menus 500 --pedidos 1000000
+
+import argparse
+import contextlib
+import itertools
+import os
+import random
+import time
+from bisect import bisect
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from comun import insertar_por_lotes
+
+from sqlalchemy import insert, update, bindparam
+
+import models
+import migraciones
+from database import Base, crear_motor
+from crud import movimientos_crud, ventas_crud
+
+
+NOMBRES = ["Ana", "Benjamin", "Camila", "Diego", "Elena", "Felipe", "Gabriela", "Hugo", "Isabel", "Joaquin",
+           "Karina", "Lucas", "Martina", "Nicolas", "Olivia", "Pablo", "Rocio", "Sebastian", "Tomas", "Valentina"]
+APELLIDOS = ["Gonzalez", "Munoz", "Rojas", "Diaz", "Perez", "Soto", "Contreras", "Silva", "Martinez", "Sepulveda",
+             "Morales", "Rodriguez", "Lopez", "Fuentes", "Hernandez", "Torres", "Araya", "Flores", "Espinoza", "Valenzuela"]
+PLATOS = ["Hamburguesa", "Completo", "Churrasco", "Pizza", "Ensalada", "Sopaipilla", "Empanada", "Lomito",
+          "Barros Luco", "Chorrillana", "Pastel De Choclo", "Cazuela", "Sandwich", "Wrap", "Papas Fritas", "Tacos"]
+VARIANTES = ["Clasica", "Doble", "Italiana", "Vegana", "Picante", "Especial", "De La Casa", "Familiar", "Mini", "Premium"]
+INSUMOS = ["Pan", "Carne", "Queso", "Tomate", "Palta", "Lechuga", "Cebolla", "Papa", "Pollo", "Cerdo", "Huevo",
+           "Harina", "Aceite", "Mayonesa", "Ketchup", "Mostaza", "Choclo", "Aji", "Pepinillo", "Champinon"]
+
+# Peso relativo de cada hora del día (0-23) y de cada día de la semana (lunes = 0)
+PESO_HORA = [0, 0, 0, 0, 0, 0, 0, 1, 2, 2, 3, 6, 14, 18, 12, 5, 4, 6, 10, 15, 18, 14, 7, 2]
+PESO_DIA_SEMANA = [0.8, 0.85, 0.9, 1.0, 1.35, 1.45, 1.1]
+LINEAS_POR_PEDIDO = ([1, 2, 3, 4], [45, 30, 17, 8])
+UNIDADES_POR_LINEA = ([1, 2, 3], [80, 15, 5])
+
+
+def _pesos_zipf(cantidad: int, exponente: float):
+    """Pesos acumulados 1/rango^s para random.choices(cum_weights=...)."""
+    return list(itertools.accumulate(1 / (rango ** exponente) for rango in range(1, cantidad + 1)))
+
+
+def _nombres_unicos(bases: list, variantes: list, cantidad: int):
+    """'Base Variante', y con un número al final cuando se acaban las combinaciones."""
+    combinaciones = [f"{b} {v}".strip() for b in bases for v in variantes]
+    return [combinaciones[i % len(combinaciones)] + (f" {i // len(combinaciones) + 1}" if i >= len(combinaciones) else "")
+            for i in range(cantidad)]
+
+
+# --- Catálogo ---
+
+def _generar_catalogo(conn, rnd, clientes: int, ingredientes: int, menus: int, tamano_lote: int):
+    """Inserta clientes, ingredientes (con stock 0) y menús con receta. Devuelve (precios, recetas)."""
+    filas = []
+    for i in range(1, clientes + 1):
+        nombre, apellido = rnd.choice(NOMBRES), rnd.choice(APELLIDOS)
+        filas.append({"id": i, "nombre": f"{nombre} {apellido}", "email": f"{nombre}.{apellido}{i}@dominio.cl".lower()})
+    insertar_por_lotes(conn, models.Cliente, filas, tamano_lote)
+
+    nombres = _nombres_unicos(INSUMOS, ["", "Premium", "Organico", "Importado"], ingredientes)
+    insertar_por_lotes(conn, models.Ingrediente, [
+        {"id": i, "nombre": nombre, "stock": 0.0} for i, nombre in enumerate(nombres, start=1)
+    ], tamano_lote)
+
+    nombres = _nombres_unicos(PLATOS, VARIANTES, menus)
+    precios, recetas, filas_receta = {}, {}, []
+    for menu_id in range(1, menus + 1):
+        precios[menu_id] = rnd.randrange(25, 160) * 100.0
+        receta = [(ing_id, rnd.choice((0.05, 0.1, 0.15, 0.2, 0.25, 0.5, 1.0)))
+                  for ing_id in rnd.sample(range(1, ingredientes + 1), min(ingredientes, rnd.randint(3, 6)))]
+        recetas[menu_id] = receta
+        filas_receta.extend({"menu_id": menu_id, "ingrediente_id": i, "cantidad": c} for i, c in receta)
+    insertar_por_lotes(conn, models.Menu, [
+        {"id": m, "nombre": nombre, "descripcion": "generado", "precio": precios[m]}
+        for m, nombre in enumerate(nombres, start=1)
+    ], tamano_lote)
+    insertar_por_lotes(conn, models.MenuIngrediente, filas_receta, tamano_lote)
+    return precios, recetas
+
+
+# --- Pedidos ---
+
+def _instantes_pedidos(rnd, pedidos: int, dias: int):
+    """Segundos desde el inicio del periodo para cada pedido, ordenados."""
+    inicio_periodo = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=dias)
+    peso_dias = list(itertools.accumulate(
+        PESO_DIA_SEMANA[(inicio_periodo + timedelta(days=d)).weekday()] * (1 + 0.3 * d / max(dias, 1))
+        for d in range(dias)
+    ))
+    dias_pedido = rnd.choices(range(dias), cum_weights=peso_dias, k=pedidos)
+    horas = rnd.choices(range(24), weights=PESO_HORA, k=pedidos)
+    instantes = [d * 86400 + h * 3600 + rnd.randrange(3600) for d, h in zip(dias_pedido, horas)]
+    instantes.sort()
+    return inicio_periodo, instantes
+
+
+def _generar_pedidos(conn, rnd, precios: dict, clientes: int, pedidos: int, dias: int, tamano_lote: int):
+    """
+    Inserta los pedidos (ids en orden de fecha) con sus líneas.
+    Devuelve (inicio_periodo, unidades[(dia, menu_id)], ultimo instante de cada dia, lineas insertadas).
+    """
+    inicio_periodo, instantes = _instantes_pedidos(rnd, pedidos, dias)
+
+    menu_ids = list(precios)
+    rnd.shuffle(menu_ids)  # el más popular no es siempre el menú 1
+    acumulado_menus = _pesos_zipf(len(menu_ids), 1.1)
+    acumulado_clientes = _pesos_zipf(clientes, 0.7) if clientes else None
+    total_peso_menus = acumulado_menus[-1]
+
+    valores_unidades, acumulado_unidades = UNIDADES_POR_LINEA[0], list(itertools.accumulate(UNIDADES_POR_LINEA[1]))
+    lineas_por_pedido = rnd.choices(*LINEAS_POR_PEDIDO, k=pedidos)
+    unidades_por_menu_dia = defaultdict(int)
+    ultimo_de_dia = {}
+    lote_pedidos, lote_lineas, lineas_total = [], [], 0
+
+    for pedido_id, (instante, n_lineas) in enumerate(zip(instantes, lineas_por_pedido), start=1):
+        lineas = {}
+        for _ in range(n_lineas):
+            menu_id = menu_ids[bisect(acumulado_menus, rnd.random() * total_peso_menus)]
+            unidades = valores_unidades[bisect(acumulado_unidades, rnd.random() * acumulado_unidades[-1])]
+            lineas[menu_id] = lineas.get(menu_id, 0) + unidades
+
+        dia = instante // 86400
+        ultimo_de_dia[dia] = instante
+        total = 0.0
+        for menu_id, cantidad in lineas.items():
+            subtotal = precios[menu_id] * cantidad
+            total += subtotal
+            unidades_por_menu_dia[(dia, menu_id)] += cantidad
+            lote_lineas.append({"pedido_id": pedido_id, "menu_id": menu_id, "cantidad": cantidad,
+                                "precio_unitario": precios[menu_id], "subtotal": subtotal})
+
+        cliente_id = None
+        if clientes:
+            cliente_id = bisect(acumulado_clientes, rnd.random() * acumulado_clientes[-1]) + 1
+        lote_pedidos.append({"id": pedido_id, "fecha": inicio_periodo + timedelta(seconds=instante),
+                             "total": total, "cliente_id": cliente_id})
+
+        if len(lote_pedidos) >= tamano_lote:
+            conn.execute(insert(models.Pedido), lote_pedidos)
+            conn.execute(insert(models.PedidoMenu), lote_lineas)
+            lineas_total += len(lote_lineas)
+            lote_pedidos, lote_lineas = [], []
+    if lote_pedidos:
+        conn.execute(insert(models.Pedido), lote_pedidos)
+        conn.execute(insert(models.PedidoMenu), lote_lineas)
+        lineas_total += len(lote_lineas)
+
+    return inicio_periodo, unidades_por_menu_dia, ultimo_de_dia, lineas_total
+
+
+# --- Stock ---
+
+def _registrar_stock(conn, rnd, recetas: dict, ingredientes: int, inicio_periodo: datetime, unidades_por_menu_dia: dict,
+                     ultimo_de_dia: dict, tamano_lote: int):
+    """
+    Compra inicial por ingrediente (consumo total + un margen) y un movimiento de
+    venta por ingrediente y día (fechado en el último pedido del día).
+    Deja Ingrediente.stock = compra - consumo. Devuelve la cantidad de movimientos.
+    """
+    consumo_dia = defaultdict(float)
+    for (dia, menu_id), unidades in unidades_por_menu_dia.items():
+        for ing_id, cantidad in recetas[menu_id]:
+            consumo_dia[(dia, ing_id)] += unidades * cantidad
+
+    consumo_total = defaultdict(float)
+    for (_, ing_id), cantidad in consumo_dia.items():
+        consumo_total[ing_id] += cantidad
+
+    compras = {ing_id: round(consumo_total[ing_id] * rnd.uniform(1.05, 1.5) + rnd.uniform(50, 500), 2)
+               for ing_id in range(1, ingredientes + 1)}
+
+    movimientos = [{"ingrediente_id": ing_id, "fecha": inicio_periodo, "tipo": movimientos_crud.COMPRA,
+                    "cantidad": compra, "pedido_id": None} for ing_id, compra in compras.items()]
+    movimientos.extend(
+        {"ingrediente_id": ing_id, "fecha": inicio_periodo + timedelta(seconds=ultimo_de_dia[dia]),
+         "tipo": movimientos_crud.VENTA, "cantidad": -cantidad, "pedido_id": None}
+        for (dia, ing_id), cantidad in sorted(consumo_dia.items())
+    )
+    insertar_por_lotes(conn, models.MovimientoStock, movimientos, tamano_lote)
+
+    conn.execute(
+        update(models.Ingrediente).where(models.Ingrediente.id == bindparam("ing_id")).values(stock=bindparam("nuevo_stock")),
+        [{"ing_id": ing_id, "nuevo_stock": round(compras[ing_id] - consumo_total[ing_id], 6)} for ing_id in compras],
+    )
+    return len(movimientos)
+
+
+def generar_bd(ruta_db: str, clientes: int = 10000, ingredientes: int = 300, menus: int = 500,
+               pedidos: int = 100000, dias: int = 365, semilla: int = 7, tamano_lote: int = 50000):
+    """
+    Crea `ruta_db` (reemplazándola si existe) con el esquema al día y los datos
+    generados, todo en una transacción. Devuelve un dict con las filas de cada tabla.
+    """
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(ruta_db + sufijo):
+            os.remove(ruta_db + sufijo)
+
+    rnd = random.Random(semilla)
+    engine = crear_motor(perfil="prod", url=f"sqlite:///{ruta_db}", echo=False)
+    try:
+        Base.metadata.create_all(bind=engine)
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            migraciones.migrar(engine)
+
+        with engine.begin() as conn:
+            precios, recetas = _generar_catalogo(conn, rnd, clientes, ingredientes, menus, tamano_lote)
+            inicio_periodo, unidades, ultimo_de_dia, lineas = _generar_pedidos(
+                conn, rnd, precios, clientes, pedidos, dias, tamano_lote)
+            movimientos = _registrar_stock(conn, rnd, recetas, ingredientes, inicio_periodo,
+                                           unidades, ultimo_de_dia, tamano_lote)
+            dias_con_ventas = ventas_crud.reconstruir_ventas_diarias(conn)
+    finally:
+        engine.dispose()
+
+    return {"clientes": clientes, "ingredientes": ingredientes, "menus": menus,
+            "recetas": sum(len(r) for r in recetas.values()), "pedidos": pedidos, "lineas": lineas,
+            "movimientos_stock": movimientos, "dias_con_ventas": dias_con_ventas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una BD sintética para pruebas de carga")
+    parser.add_argument("--bd", required=True, help="archivo SQLite de destino")
+    parser.add_argument("--reemplazar", action="store_true", help="borrar el archivo si ya existe")
+    parser.add_argument("--clientes", type=int, default=10000)
+    parser.add_argument("--ingredientes", type=int, default=300)
+    parser.add_argument("--menus", type=int, default=500)
+    parser.add_argument("--pedidos", type=int, default=100000)
+    parser.add_argument("--dias", type=int, default=365, help="días hacia atrás (hasta ayer) con pedidos")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--lote", type=int, default=50000, help="filas por executemany")
+    args = parser.parse_args()
+
+    if os.path.exists(args.bd) and not args.reemplazar:
+        raise SystemExit(f"{args.bd} ya existe; use --reemplazar para generarla de nuevo.")
+    if args.menus < 1 or args.ingredientes < 1 or args.dias < 1:
+        raise SystemExit("Se necesita al menos 1 menú, 1 ingrediente y 1 día.")
+
+    inicio = time.perf_counter()
+    filas = generar_bd(args.bd, args.clientes, args.ingredientes, args.menus,
+                       args.pedidos, args.dias, args.semilla, args.lote)
+    duracion = time.perf_counter() - inicio
+    for tabla, cantidad in filas.items():
+        print(f"{tabla:<18} {cantidad:>10}")
+    print(f"{args.bd} generada en {duracion:.1f} s ({args.pedidos / duracion:,.0f} pedidos/s)")
+
+
+if __name__ == "__main__":
+    main()
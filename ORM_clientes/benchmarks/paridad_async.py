@@ -0,0 +1,152 @@
+# Archivo: benchmarks/paridad_async.py
+#
+# Verifica que crud/ (síncrono) y crud_async/ (AsyncSession + aiosqlite) se
+# comportan igual: el mismo escenario se ejecuta contra las dos implementaciones,
+# cada una sobre su propia BD, y se comparan los resultados paso a paso.
+# Además se comprueban las reglas de validación esperadas.
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/paridad_async.py
+
+import asyncio
+import contextlib
+import importlib
+import os
+import tempfile
+
+from comun import nueva_sesion
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, crear_motor_async, crear_fabrica_async, unidad_de_trabajo, unidad_de_trabajo_async
+from crud import cache_recetas
+
+
+def normalizar(valor):
+    """Convierte objetos ORM en tuplas de columnas para poder compararlos."""
+    if isinstance(valor, Base):
+        return (type(valor).__name__,) + tuple(
+            getattr(valor, c.key) for c in inspect(valor).mapper.column_attrs if c.key != "fecha"
+        )
+    if isinstance(valor, dict):
+        return {k: normalizar(v) for k, v in valor.items() if k != "fecha"}
+    if hasattr(valor, "_fields"):  # filas (Row) de consultas por columnas
+        return [normalizar(v) for k, v in zip(valor._fields, valor) if k != "fecha"]
+    if isinstance(valor, (list, tuple)):
+        return [normalizar(v) for v in valor]
+    return valor
+
+
+def implementacion_sync(ruta_db):
+    engine, db = nueva_sesion(ruta_db)
+    db.close()
+    fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    async def llamar(modulo, funcion, *args, **kwargs):
+        funcion_crud = getattr(importlib.import_module(f"crud.{modulo}"), funcion)
+        try:
+            with unidad_de_trabajo(fabrica) as sesion:
+                return normalizar(funcion_crud(sesion, *args, **kwargs))
+        except Exception as e:
+            return ("excepcion", str(e))
+
+    return llamar, engine.dispose
+
+
+def implementacion_async(ruta_db):
+    engine, db = nueva_sesion(ruta_db)  # crea las tablas con el motor síncrono
+    db.close()
+    engine.dispose()
+    motor = crear_motor_async(perfil="prod", url=f"sqlite:///{ruta_db}")
+    fabrica = crear_fabrica_async(motor)
+
+    async def llamar(modulo, funcion, *args, **kwargs):
+        funcion_crud = getattr(importlib.import_module(f"crud_async.{modulo}"), funcion)
+        try:
+            async with unidad_de_trabajo_async(fabrica) as sesion:
+                return normalizar(await funcion_crud(sesion, *args, **kwargs))
+        except Exception as e:
+            return ("excepcion", str(e))
+
+    async def cerrar():
+        await motor.dispose()
+
+    return llamar, cerrar
+
+
+# --- Escenario compartido ---
+# Cada paso: (descripción, modulo, funcion, args, kwargs, verificación sobre el resultado)
+
+def es_error(r):
+    return isinstance(r, str) and "Error" in r
+
+def es_excepcion(texto):
+    return lambda r: isinstance(r, tuple) and r[0] == "excepcion" and texto in r[1]
+
+RECETA = [{"ingrediente_id": 1, "cantidad": 2}, {"ingrediente_id": 2, "cantidad": 1}]
+
+PASOS = [
+    ("crear cliente", "cliente_crud", "crear_cliente", ("ana perez", " Ana@Mail.CL "), {}, lambda r: r[2:] == ("Ana Perez", "ana@mail.cl")),
+    ("email repetido", "cliente_crud", "crear_cliente", ("otra", "ana@mail.cl"), {}, lambda r: r is None),
+    ("cliente vacío", "cliente_crud", "crear_cliente", ("", "x@mail.cl"), {}, lambda r: r is None),
+    ("crear ingrediente", "ingrediente_crud", "crear_ingrediente", ("pan", 10), {}, lambda r: r[3] == 10),
+    ("sumar stock", "ingrediente_crud", "crear_ingrediente", (" PAN ", 5), {}, lambda r: r[3] == 15),
+    ("segundo ingrediente", "ingrediente_crud", "crear_ingrediente", ("carne", 4), {}, lambda r: r[3] == 4),
+    ("stock negativo", "ingrediente_crud", "crear_ingrediente", ("queso", -1), {}, es_error),
+    ("ingreso por ajuste", "ingrediente_crud", "crear_ingrediente", ("sal", 3), {"tipo": "ajuste"}, lambda r: r[0] == "Ingrediente" and r[3] == 3),
+    ("crear menú", "menu_crud", "crear_menu", ("hamburguesa", "d", 3000, RECETA), {}, lambda r: r[2] == "Hamburguesa"),
+    ("menú precio 0", "menu_crud", "crear_menu", ("gratis", "d", 0, RECETA), {}, lambda r: r is None or es_error(r)),
+    ("leer menú por nombre", "menu_crud", "leer_menu_por_nombre", ("Hamburguesa",), {}, lambda r: r[4] == 3000),
+    ("menús en lote", "menu_crud", "crear_menus_masivo", ([("Doble", 5000, [("Pan", 2), ("Carne", 2)]), ("Hamburguesa", 1, [])],), {},
+     lambda r: r["creados"] == ["Doble"] and r["existentes"] == ["Hamburguesa"]),
+    ("disponibilidad", "pedido_crud", "verificar_disponibilidad", ([{"id": 1, "cantidad": 5}],), {}, lambda r: r == [["Carne", 4.0, 5]]),
+    ("pedido vacío", "pedido_crud", "crear_pedido", (1, []), {}, es_excepcion("vacio")),
+    ("menú inexistente", "pedido_crud", "crear_pedido", (1, [{"id": 99, "cantidad": 1}]), {}, es_excepcion("no existe")),
+    ("crear pedido", "pedido_crud", "crear_pedido", (1, [{"id": 1, "cantidad": 2}]), {}, lambda r: r[2] == 6000),
+    ("sin stock", "pedido_crud", "crear_pedido", (1, [{"id": 2, "cantidad": 2}]), {}, es_excepcion("Stock insuficiente")),
+    ("stock descontado", "ingrediente_crud", "obtener_ingrediente_por_nombre", ("pan",), {}, lambda r: r[3] == 11),
+    ("detalle", "pedido_crud", "leer_detalle_pedido", (1,), {}, lambda r: r["lineas"][0]["subtotal"] == 6000),
+    ("historial", "pedido_crud", "leer_historial_pedidos", (), {"limite": 10}, lambda r: len(r) == 1),
+    ("actualizar receta", "menu_crud", "actualizar_menu_completo", (1, "hamburguesa", "d", 3200, [{"ingrediente_id": 1, "cantidad": 1}]), {},
+     lambda r: r["precio_cambiado"] and r["eliminados"] == [2]),
+    ("cliente con pedidos", "cliente_crud", "eliminar_cliente", (1,), {}, lambda r: r is False),
+    ("eliminar pedido", "pedido_crud", "eliminar_pedido", (1,), {}, lambda r: r is True),
+    ("eliminar cliente", "cliente_crud", "eliminar_cliente", (1,), {}, lambda r: r is True),
+]
+
+
+async def ejecutar(llamar):
+    # El cache de recetas es del proceso: se vacía para no mezclar las dos BD
+    cache_recetas.invalidar()
+    resultados = []
+    for descripcion, modulo, funcion, args, kwargs, _ in PASOS:
+        resultados.append(await llamar(modulo, funcion, *args, **kwargs))
+    return resultados
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as nulo:
+        llamar_sync, cerrar_sync = implementacion_sync(os.path.join(tmp, "sync.db"))
+        llamar_async, cerrar_async = implementacion_async(os.path.join(tmp, "async.db"))
+        with contextlib.redirect_stdout(nulo):
+            r_sync = await ejecutar(llamar_sync)
+            r_async = await ejecutar(llamar_async)
+        cerrar_sync()
+        await cerrar_async()
+
+    fallos = 0
+    for (descripcion, _, _, _, _, verificar), a, b in zip(PASOS, r_sync, r_async):
+        ok_sync, ok_async = verificar(a), verificar(b)
+        iguales = a == b
+        estado = "OK   " if ok_sync and ok_async and iguales else "FALLO"
+        fallos += estado == "FALLO"
+        print(f"{estado} {descripcion:<24} sync={'ok' if ok_sync else repr(a)}  async={'ok' if ok_async else repr(b)}"
+              + ("" if iguales else "  (distintos)"))
+
+    print(f"\n{len(PASOS) - fallos}/{len(PASOS)} pasos iguales y correctos en ambas implementaciones")
+    raise SystemExit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,247 @@
+# Archivo: benchmarks/perfil_concurrente.py
+#
+# latencias.ejecutar_medido con umbral de perfil cuando hay llamadas
+# superpuestas. Desde Python 3.12 solo puede haber un cProfile activo por
+# proceso (uno en otro hilo ya hace fallar enable() con ValueError); aquí se
+# simula esa regla en cualquier versión, así la prueba vale también en 3.11.
+# Cada llamada tiene que correr y quedar medida aunque no se perfile; el
+# último caso repite lo mismo a través de EjecutorTk (trabajos del pool y una
+# acción del hilo de Tk a la vez), como pasa en la GUI.
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/perfil_concurrente.py       -> código de salida 1 si algo falla
+
+import contextlib
+import cProfile
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from latencias import RegistroLatencias, ejecutar_medido, medir_accion, registro
+from ejecutor_gui import EjecutorTk
+
+
+class PerfiladorExclusivo(cProfile.Profile):
+    """cProfile.Profile con la regla de 3.12+: un solo perfilador activo en el proceso."""
+    activo = None
+    _candado = threading.Lock()
+
+    def enable(self, *args, **kwargs):
+        with PerfiladorExclusivo._candado:
+            if PerfiladorExclusivo.activo is not None:
+                raise ValueError("Another profiling tool is already active")
+            PerfiladorExclusivo.activo = self
+        try:
+            super().enable(*args, **kwargs)
+        except Exception:
+            PerfiladorExclusivo.activo = None
+            raise
+
+    def disable(self):
+        super().disable()
+        with PerfiladorExclusivo._candado:
+            if PerfiladorExclusivo.activo is self:
+                PerfiladorExclusivo.activo = None
+
+    def runcall(self, funcion, *args, **kwargs):
+        self.enable()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            self.disable()
+
+
+@contextlib.contextmanager
+def perfilador_exclusivo():
+    original = cProfile.Profile
+    cProfile.Profile = PerfiladorExclusivo
+    try:
+        yield
+    finally:
+        cProfile.Profile = original
+        PerfiladorExclusivo.activo = None
+
+
+class RaizFalsa:
+    """Lo que EjecutorTk usa de la ventana: after/after_cancel corridos a mano desde este hilo."""
+
+    def __init__(self):
+        self._pendientes = {}
+        self._siguiente = 0
+
+    def after(self, ms, funcion):
+        self._siguiente += 1
+        self._pendientes[self._siguiente] = (time.perf_counter() + ms / 1000, funcion)
+        return self._siguiente
+
+    def after_cancel(self, id_after):
+        self._pendientes.pop(id_after, None)
+
+    def report_callback_exception(self, tipo, valor, traza):
+        raise valor
+
+    def correr_hasta(self, condicion, maximo: float = 5):
+        limite = time.perf_counter() + maximo
+        while not condicion() and time.perf_counter() < limite:
+            for id_after, (momento, funcion) in sorted(self._pendientes.items()):
+                if momento <= time.perf_counter():
+                    self._pendientes.pop(id_after, None)
+                    funcion()
+            time.sleep(0.002)
+
+
+def nuevo_registro(carpeta: str):
+    return RegistroLatencias().configurar(umbral_perfil_ms=0, carpeta_perfiles=carpeta)
+
+
+# --- Casos: cada uno devuelve None si está bien o el motivo de la falla ---
+
+def caso_hilos_superpuestos(carpeta: str):
+    destino = nuevo_registro(carpeta)
+    juntos = threading.Barrier(2)
+    resultados, errores = {}, []
+
+    def trabajo(i):
+        juntos.wait(timeout=5)   # las dos llamadas están dentro a la vez
+        time.sleep(0.02)
+        return i
+
+    def hilo(i):
+        try:
+            resultados[i] = ejecutar_medido(f"hilo {i}", trabajo, (i,), registro_destino=destino)
+        except Exception as e:
+            errores.append(repr(e))
+
+    hilos = [threading.Thread(target=hilo, args=(i,)) for i in range(2)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    resumen = destino.resumen()
+    if errores:
+        return f"excepciones: {errores}"
+    if resultados != {0: 0, 1: 1}:
+        return f"resultados {resultados}"
+    if sorted(resumen) != ["hilo 0", "hilo 1"] or any(r["errores"] for r in resumen.values()):
+        return f"registro {resumen}"
+    if destino.perfiles_guardados != 1:
+        return f"{destino.perfiles_guardados} perfiles guardados (se esperaba 1)"
+    return None
+
+
+def caso_anidada(carpeta: str):
+    destino = nuevo_registro(carpeta)
+
+    def adentro():
+        return ejecutar_medido("adentro", lambda: 7, registro_destino=destino)
+
+    resultado = ejecutar_medido("afuera", adentro, registro_destino=destino)
+    if resultado != 7 or sorted(destino.resumen()) != ["adentro", "afuera"]:
+        return f"resultado {resultado}, registro {destino.resumen()}"
+    if destino.perfiles_guardados != 1:
+        return f"{destino.perfiles_guardados} perfiles guardados (se esperaba 1)"
+    return None
+
+
+def caso_otra_herramienta(carpeta: str):
+    destino = nuevo_registro(carpeta)
+    PerfiladorExclusivo.activo = object()   # p. ej. un depurador ya perfilando
+    try:
+        resultado = ejecutar_medido("con depurador", lambda: 3, registro_destino=destino)
+    except Exception as e:
+        return f"excepción {e!r}"
+    finally:
+        PerfiladorExclusivo.activo = None
+    if resultado != 3 or destino.resumen()["con depurador"]["cantidad"] != 1 or destino.perfiles_guardados:
+        return f"resultado {resultado}, perfiles {destino.perfiles_guardados}"
+    return None
+
+
+def caso_valueerror_propio(carpeta: str):
+    destino = nuevo_registro(carpeta)
+    llamadas = []
+
+    def falla():
+        llamadas.append(1)
+        raise ValueError("dato inválido")
+
+    try:
+        ejecutar_medido("falla", falla, registro_destino=destino)
+        return "no se propagó el ValueError de la función"
+    except ValueError:
+        pass
+    if len(llamadas) != 1 or destino.resumen()["falla"]["errores"] != 1:
+        return f"{len(llamadas)} llamadas, registro {destino.resumen()}"
+    return None
+
+
+def caso_ejecutor(carpeta: str):
+    """Dos trabajos del pool y una acción del hilo de Tk, los tres a la vez, con perfil activado."""
+    umbral, carpeta_original = registro.umbral_perfil, registro.carpeta_perfiles
+    registro.configurar(umbral_perfil_ms=0, carpeta_perfiles=carpeta)
+    registro.reiniciar()
+    juntos = threading.Barrier(3)
+    entregados, fallidos = [], []
+
+    def trabajo(i):
+        juntos.wait(timeout=5)
+        time.sleep(0.02)
+        return i
+
+    @medir_accion("accion tk")
+    def accion():
+        juntos.wait(timeout=5)
+        time.sleep(0.02)
+
+    raiz = RaizFalsa()
+    ejecutor = EjecutorTk(raiz, max_hilos=2)
+    try:
+        for i in range(2):
+            ejecutor.enviar(trabajo, i, nombre=f"trabajo {i}", al_terminar=entregados.append, al_fallar=fallidos.append)
+        try:
+            accion()
+        except Exception as e:
+            fallidos.append(e)
+        raiz.correr_hasta(lambda: not ejecutor.ocupado())
+    finally:
+        ejecutor.cerrar()
+        registro.umbral_perfil, registro.carpeta_perfiles = umbral, carpeta_original
+
+    resumen = registro.resumen()
+    if fallidos:
+        return f"fallas: {fallidos!r}"
+    if sorted(entregados) != [0, 1]:
+        return f"entregados {entregados}"
+    if sorted(resumen) != ["accion tk", "trabajo 0 [hilo]", "trabajo 1 [hilo]"]:
+        return f"registro {sorted(resumen)}"
+    return None
+
+
+CASOS = [
+    ("dos hilos superpuestos", caso_hilos_superpuestos),
+    ("llamada anidada", caso_anidada),
+    ("otra herramienta activa", caso_otra_herramienta),
+    ("ValueError de la función", caso_valueerror_propio),
+    ("ejecutor de la GUI", caso_ejecutor),
+]
+
+
+def main():
+    fallos = 0
+    with tempfile.TemporaryDirectory() as carpeta, perfilador_exclusivo():
+        for nombre, caso in CASOS:
+            motivo = caso(carpeta)
+            fallos += motivo is not None
+            print(f"{'OK' if motivo is None else 'FALLA':<6} {nombre}" + (f": {motivo}" if motivo else ""))
+
+    print(f"\n{len(CASOS) - fallos} de {len(CASOS)} casos correctos.")
+    raise SystemExit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
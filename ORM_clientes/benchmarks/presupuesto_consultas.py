@@ -0,0 +1,89 @@
+# Archivo: benchmarks/presupuesto_consultas.py
+#
+# Presupuesto de consultas de los caminos calientes del CRUD (modo prueba de
+# instrumentacion.py). Cada caso corre sobre una BD sintética chica y falla si
+# hace más consultas que su presupuesto o si repite una sentencia (posible N+1,
+# p. ej. un lazy load dentro de un for).
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/presupuesto_consultas.py            -> código de salida 1 si algo falla
+
+import contextlib
+import os
+import tempfile
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from generar_datos import generar_bd
+
+from sqlalchemy.orm import sessionmaker
+
+import graficos
+import instrumentacion
+from instrumentacion import presupuesto_consultas, PresupuestoExcedido
+from database import crear_motor
+from crud import cache_recetas
+from crud import cliente_crud as ccrud
+from crud import ingrediente_crud as icrud
+from crud import menu_crud as mcrud
+from crud import pedido_crud as pcrud
+
+
+LINEAS = [{"id": 1, "cantidad": 2}, {"id": 2, "cantidad": 1}, {"id": 3, "cantidad": 1}]
+
+# (nombre, presupuesto, función(db, datos))
+CASOS = [
+    ("crear_pedido", 9, lambda db, d: pcrud.crear_pedido(db, 1, LINEAS)),
+    ("verificar_disponibilidad", 2, lambda db, d: pcrud.verificar_disponibilidad(db, LINEAS)),
+    ("leer_detalle_pedido", 2, lambda db, d: pcrud.leer_detalle_pedido(db, d["pedido_id"])),
+    ("leer_historial_pedidos", 1, lambda db, d: pcrud.leer_historial_pedidos(db, limite=100)),
+    ("leer_historial_pedidos (filtros)", 1, lambda db, d: pcrud.leer_historial_pedidos(db, limite=100, cliente_id=1, total_minimo=5000)),
+    ("listar_clientes", 1, lambda db, d: ccrud.listar_clientes(db)),
+    ("listar_ingredientes", 1, lambda db, d: icrud.listar_ingredientes(db)),
+    ("leer_todos_los_menus", 1, lambda db, d: mcrud.leer_todos_los_menus(db)),
+    ("obtener_datos_ventas", 1, lambda db, d: graficos.obtener_datos_ventas(db, "month")),
+    ("generar_grafico_menus (consulta)", 1, lambda db, d: graficos.generar_grafico_menus(db)),
+    ("obtener_ingresos_por_menu", 2, lambda db, d: graficos.obtener_ingresos_por_menu(db)),
+    ("obtener_consumo_ingredientes", 1, lambda db, d: graficos.obtener_consumo_ingredientes(db)),
+    ("actualizar_menu_completo", 7, lambda db, d: mcrud.actualizar_menu_completo(
+        db, 4, d["menu"].nombre, "editado", d["menu"].precio + 100, [{"ingrediente_id": i, "cantidad": 1.0} for i in (1, 2, 3)])),
+    ("crear_menus_masivo", 4, lambda db, d: mcrud.crear_menus_masivo(
+        db, [(f"Menu Presupuesto {n}", 1000 + n, [(1, 0.5), (2, 1.0)]) for n in range(50)])),
+]
+
+
+def main():
+    fallos = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "presupuesto.db")
+        generar_bd(ruta, clientes=500, ingredientes=60, menus=40, pedidos=5000, dias=60)
+        engine = crear_motor(perfil="prod", url=f"sqlite:///{ruta}", echo=False)
+        instrumentacion.instrumentar(engine)
+        fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+        db = fabrica()
+        datos = {"pedido_id": 1, "menu": mcrud.leer_menu_por_id(db, 4)}
+        db.close()
+
+        for nombre, maximo, funcion in CASOS:
+            cache_recetas.invalidar()  # el peor caso: recetas leídas de la BD
+            db = fabrica()
+            try:
+                with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo), \
+                        presupuesto_consultas(nombre, maximo) as medicion:
+                    funcion(db, datos)
+                print(f"OK     {nombre:<36} {medicion.consultas:3d} / {maximo} consultas")
+            except PresupuestoExcedido as e:
+                fallos += 1
+                print(f"FALLA  {e}")
+            finally:
+                db.close()
+
+        engine.dispose()
+
+    print(f"\n{len(CASOS) - fallos} de {len(CASOS)} casos dentro del presupuesto.")
+    raise SystemExit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Archivo: benchmarks/stress_hilos.py
+#
+# Prueba de estrés: varios hilos leen y escriben a la vez, cada tarea con su
+# propia unidad_de_trabajo(). Al final verifica que:
+#   - no hubo errores de conexión/lock (solo StockInsuficiente es esperable),
+#   - el stock nunca quedó negativo (no hay sobreventa),
+#   - stock_final == stock_inicial - consumo de los pedidos que se guardaron,
+#   - el resumen ventas_diarias coincide con los pedidos guardados,
+#   - el libro movimientos_stock explica el stock final de cada ingrediente.
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/stress_hilos.py --hilos 8 --tareas 2000 --perfil prod
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from comun import nueva_sesion, sembrar_catalogo
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import unidad_de_trabajo
+from crud import ingrediente_crud as icrud
+from crud import menu_crud as mcrud
+from crud import movimientos_crud as movcrud
+from crud import pedido_crud as pcrud
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estrés de lecturas/escrituras concurrentes")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--tareas", type=int, default=1000)
+    parser.add_argument("--perfil", default="prod")
+    parser.add_argument("--stock", type=float, default=2000, help="stock inicial de cada ingrediente")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = nueva_sesion(os.path.join(tmp, "stress.db"), perfil=args.perfil)
+        cliente_id, menu_ids = sembrar_catalogo(db, menus=10, stock=args.stock)
+        stock_inicial = db.query(func.sum(models.Ingrediente.stock)).scalar()
+        db.close()
+
+        fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+        contadores = {"lecturas": 0, "pedidos": 0, "sin_stock": 0, "errores": 0}
+        candado = threading.Lock()
+        errores = []
+
+        def sumar(clave):
+            with candado:
+                contadores[clave] += 1
+
+        def tarea(numero: int):
+            rnd = random.Random(numero)
+            try:
+                if rnd.random() < 0.5:
+                    with unidad_de_trabajo(fabrica) as sesion:
+                        icrud.listar_ingredientes(sesion)
+                        mcrud.leer_todos_los_menus(sesion)
+                    sumar("lecturas")
+                else:
+                    lineas = [{"id": rnd.choice(menu_ids), "cantidad": rnd.randint(1, 3)}]
+                    with unidad_de_trabajo(fabrica) as sesion:
+                        pcrud.crear_pedido(sesion, cliente_id, lineas)
+                    sumar("pedidos")
+            except Exception as e:
+                if isinstance(e, pcrud.StockInsuficiente):
+                    sumar("sin_stock")
+                else:
+                    sumar("errores")
+                    errores.append(repr(e))
+
+        inicio = time.perf_counter()
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            with ThreadPoolExecutor(max_workers=args.hilos) as pool:
+                list(pool.map(tarea, range(args.tareas)))
+        duracion = time.perf_counter() - inicio
+
+        with unidad_de_trabajo(fabrica) as sesion:
+            stock_final = sesion.query(func.sum(models.Ingrediente.stock)).scalar()
+            minimo = sesion.query(func.min(models.Ingrediente.stock)).scalar()
+            pedidos_guardados = sesion.query(func.count(models.Pedido.id)).scalar()
+            consumo = sesion.query(func.sum(models.PedidoMenu.cantidad * models.MenuIngrediente.cantidad))\
+                            .join(models.MenuIngrediente, models.MenuIngrediente.menu_id == models.PedidoMenu.menu_id)\
+                            .scalar() or 0
+            total_pedidos = sesion.query(func.sum(models.Pedido.total)).scalar() or 0
+            resumen_pedidos, resumen_total = sesion.query(
+                func.sum(models.VentaDiaria.pedidos), func.sum(models.VentaDiaria.total)
+            ).one()
+            diferencias_libro = movcrud.verificar_stock(sesion)
+        engine.dispose()
+
+    print(f"{args.tareas} tareas con {args.hilos} hilos en {duracion:.2f} s ({args.tareas / duracion:,.0f} tareas/s)")
+    print(f"  {contadores}")
+    ok = True
+    if contadores["errores"]:
+        ok = False
+        print(f"  FALLO: {contadores['errores']} errores inesperados, ej: {errores[:3]}")
+    if minimo < 0:
+        ok = False
+        print(f"  FALLO: stock negativo ({minimo})")
+    if pedidos_guardados != contadores["pedidos"]:
+        ok = False
+        print(f"  FALLO: {pedidos_guardados} pedidos en la BD, {contadores['pedidos']} confirmados")
+    if abs((stock_inicial - consumo) - stock_final) > 1e-6:
+        ok = False
+        print(f"  FALLO: stock final {stock_final} != inicial {stock_inicial} - consumo {consumo}")
+    if (resumen_pedidos or 0) != pedidos_guardados or abs((resumen_total or 0) - total_pedidos) > 1e-6:
+        ok = False
+        print(f"  FALLO: resumen diario ({resumen_pedidos} pedidos, {resumen_total}) != pedidos ({pedidos_guardados}, {total_pedidos})")
+    if diferencias_libro:
+        ok = False
+        print(f"  FALLO: el libro de stock no coincide, ej: {diferencias_libro[:3]}")
+    print("OK" if ok else "ERROR")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+# Archivo: benchmarks/suite_orm.py
+#
+# Suite reproducible de los caminos calientes del ORM.
+#
+#   generar   -> crea una BD sintética a la escala pedida (ver generar_datos.py)
+#   correr    -> mide cada caso sobre una COPIA de esa BD y guarda un JSON con
+#                tiempos (por repetición, mínimo, mediana) y cantidad de consultas
+#   comparar  -> compara dos JSON y marca las regresiones (código de salida 1)
+#
+# Uso (desde ORM_clientes/):
+#   python benchmarks/suite_orm.py generar --bd /tmp/bench.db --clientes 10000 --menus 500 --pedidos 1000000
+#   python benchmarks/suite_orm.py correr --bd /tmp/bench.db --salida antes.json
+#   python benchmarks/suite_orm.py correr --bd /tmp/bench.db --salida despues.json --solo crear_pedido listar_clientes
+#   python benchmarks/suite_orm.py comparar antes.json despues.json --umbral 0.10
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("MPLBACKEND", "Agg")  # los gráficos se generan sin ventana
+
+from generar_datos import generar_bd
+
+import sqlalchemy
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+import models
+import graficos
+import instrumentacion
+from database import crear_motor
+from crud import cache_recetas
+from crud import cliente_crud as ccrud
+from crud import ingrediente_crud as icrud
+from crud import pedido_crud as pcrud
+
+
+# --- Casos ---
+# Cada caso recibe (db, contexto) y devuelve cuántas operaciones hizo
+# (para el tiempo por operación).
+
+def caso_crear_pedido(db, contexto):
+    rnd = contexto["rnd"]
+    for _ in range(contexto["pedidos_por_repeticion"]):
+        lineas = [{"id": m, "cantidad": rnd.randint(1, 3)} for m in rnd.sample(contexto["menu_ids"], 2)]
+        pcrud.crear_pedido(db, rnd.choice(contexto["cliente_ids"]), lineas)
+    return contexto["pedidos_por_repeticion"]
+
+
+def caso_leer_todos_los_pedidos(db, contexto):
+    pcrud.leer_todos_los_pedidos(db)
+    return 1
+
+
+def caso_listar_clientes(db, contexto):
+    ccrud.listar_clientes(db)
+    return 1
+
+
+def caso_cargar_ingredientes_csv(db, contexto):
+    icrud.cargar_ingredientes_csv(db, contexto["csv"])
+    return contexto["lineas_csv"]
+
+
+def caso_cargar_ingredientes_csv_masivo(db, contexto):
+    icrud.cargar_ingredientes_csv_masivo(db, contexto["csv"])
+    return contexto["lineas_csv"]
+
+
+def _caso_ventas(periodo):
+    def caso(db, contexto):
+        graficos.obtener_datos_ventas(db, periodo)
+        return 1
+    return caso
+
+
+def _caso_grafico(generar, *args):
+    def caso(db, contexto):
+        generar(db, *args)
+        return 1
+    return caso
+
+
+CASOS = {
+    "crear_pedido": caso_crear_pedido,
+    "leer_todos_los_pedidos": caso_leer_todos_los_pedidos,
+    "listar_clientes": caso_listar_clientes,
+    "cargar_ingredientes_csv": caso_cargar_ingredientes_csv,
+    "cargar_ingredientes_csv_masivo": caso_cargar_ingredientes_csv_masivo,
+    "obtener_datos_ventas_dia": _caso_ventas("day"),
+    "obtener_datos_ventas_mes": _caso_ventas("month"),
+    "obtener_datos_ventas_anio": _caso_ventas("year"),
+    "generar_grafico_ventas": _caso_grafico(graficos.generar_grafico_ventas, "Diaria"),
+    "generar_grafico_menus": _caso_grafico(graficos.generar_grafico_menus),
+    "generar_grafico_ingresos_menus": _caso_grafico(graficos.generar_grafico_ingresos_menus),
+    "generar_grafico_ingredientes": _caso_grafico(graficos.generar_grafico_ingredientes),
+}
+
+
+# --- Correr ---
+
+def escala_de(fabrica):
+    """Cantidad de filas de las tablas principales (queda en el JSON)."""
+    db = fabrica()
+    try:
+        return {
+            "clientes": db.query(func.count(models.Cliente.id)).scalar(),
+            "ingredientes": db.query(func.count(models.Ingrediente.id)).scalar(),
+            "menus": db.query(func.count(models.Menu.id)).scalar(),
+            "pedidos": db.query(func.count(models.Pedido.id)).scalar(),
+            "lineas": db.query(func.count()).select_from(models.PedidoMenu).scalar(),
+        }
+    finally:
+        db.close()
+
+
+def generar_csv(ruta: str, lineas: int, nombres: int, rnd):
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["nombre", "unidad", "cantidad"])
+        for _ in range(lineas):
+            writer.writerow([f"Ingrediente Csv {rnd.randrange(nombres)}", "unid", rnd.randint(1, 50)])
+
+
+def medir_caso(nombre: str, caso, fabrica, contexto, repeticiones: int, calentamiento: int):
+    tiempos, consultas, repetidas, operaciones = [], [], {}, 0
+    for vuelta in range(calentamiento + repeticiones):
+        db = fabrica()
+        try:
+            with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo), \
+                    instrumentacion.medir(nombre, avisar_n_mas_1=False) as medicion:
+                inicio = time.perf_counter()
+                operaciones = caso(db, contexto)
+                duracion = time.perf_counter() - inicio
+        finally:
+            db.close()
+        if vuelta >= calentamiento:
+            tiempos.append(duracion)
+            consultas.append(medicion.consultas)
+            # Por operación: un caso que hace N operaciones repite sus sentencias N veces
+            for sql, veces in medicion.repetidas(max(operaciones, 1) * instrumentacion.UMBRAL_N_MAS_1):
+                repetidas[sql] = max(repetidas.get(sql, 0), veces)
+
+    mediana = statistics.median(tiempos)
+    return {
+        "repeticiones": repeticiones,
+        "operaciones": operaciones,
+        "tiempos_s": [round(t, 6) for t in tiempos],
+        "minimo_s": round(min(tiempos), 6),
+        "mediana_s": round(mediana, 6),
+        "media_s": round(statistics.mean(tiempos), 6),
+        "por_operacion_ms": round(1000 * mediana / max(operaciones, 1), 4),
+        "consultas": max(consultas),
+        "consultas_por_operacion": round(max(consultas) / max(operaciones, 1), 2),
+        "posibles_n_mas_1": [{"sql": sql, "veces": veces} for sql, veces in repetidas.items()],
+    }
+
+
+def correr(args):
+    if not os.path.exists(args.bd):
+        sys.exit(f"No existe {args.bd}; créela con: python benchmarks/suite_orm.py generar --bd {args.bd}")
+    desconocidos = set(args.solo or []) - set(CASOS)
+    if desconocidos:
+        sys.exit(f"Casos desconocidos: {', '.join(sorted(desconocidos))}. Opciones: {', '.join(CASOS)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Los casos que escriben (pedidos, CSV) no tocan la BD original
+        copia = os.path.join(tmp, "bench.db")
+        shutil.copy(args.bd, copia)
+        engine = crear_motor(perfil=args.perfil, url=f"sqlite:///{copia}", echo=False)
+        fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+        instrumentacion.instrumentar(engine)
+
+        rnd = random.Random(args.semilla)
+        db = fabrica()
+        contexto = {
+            "rnd": rnd,
+            "cliente_ids": [i for (i,) in db.query(models.Cliente.id).limit(10000)],
+            "menu_ids": [i for (i,) in db.query(models.Menu.id).filter(models.Menu.items_receta.any())],
+            "pedidos_por_repeticion": args.pedidos_por_repeticion,
+            "csv": os.path.join(tmp, "ingredientes.csv"),
+            "lineas_csv": args.lineas_csv,
+        }
+        db.close()
+        generar_csv(contexto["csv"], args.lineas_csv, max(1, args.lineas_csv // 4), rnd)
+
+        resultado = {
+            "meta": {
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "bd": os.path.abspath(args.bd),
+                "escala": escala_de(fabrica),
+                "perfil": args.perfil,
+                "semilla": args.semilla,
+                "calentamiento": args.calentamiento,
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "sqlite": sqlite3.sqlite_version,
+                "plataforma": platform.platform(),
+            },
+            "resultados": {},
+        }
+
+        cache_recetas.invalidar()
+        for nombre, caso in CASOS.items():
+            if args.solo and nombre not in args.solo:
+                continue
+            datos = medir_caso(nombre, caso, fabrica, contexto, args.repeticiones, args.calentamiento)
+            resultado["resultados"][nombre] = datos
+            print(f"{nombre:<32} mediana {datos['mediana_s']:9.4f} s  "
+                  f"({datos['por_operacion_ms']:9.3f} ms/op)  {datos['consultas']:6d} consultas"
+                  f"{'  POSIBLE N+1' if datos['posibles_n_mas_1'] else ''}")
+
+        instrumentacion.desinstrumentar(engine)
+        engine.dispose()
+
+    salida = args.salida or f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {salida}")
+
+
+# --- Comparar ---
+
+def comparar(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.nuevo, encoding="utf-8") as f:
+        nuevo = json.load(f)
+
+    if base["meta"].get("escala") != nuevo["meta"].get("escala"):
+        print(f"AVISO: la escala no coincide: {base['meta'].get('escala')} vs {nuevo['meta'].get('escala')}")
+
+    regresiones = 0
+    print(f"{'caso':<32} {'base ms/op':>11} {'nuevo ms/op':>12} {'cambio':>8} {'consultas':>14}")
+    for nombre in sorted(set(base["resultados"]) | set(nuevo["resultados"])):
+        antes = base["resultados"].get(nombre)
+        despues = nuevo["resultados"].get(nombre)
+        if antes is None or despues is None:
+            print(f"{nombre:<32} {'(solo en ' + ('nuevo' if antes is None else 'base') + ')':>34}")
+            continue
+
+        cambio = despues["por_operacion_ms"] / antes["por_operacion_ms"] - 1 if antes["por_operacion_ms"] else 0.0
+        consultas = f"{antes['consultas_por_operacion']:g} -> {despues['consultas_por_operacion']:g}"
+        marca = ""
+        if cambio > args.umbral or despues["consultas_por_operacion"] > antes["consultas_por_operacion"]:
+            marca = "REGRESIÓN"
+            regresiones += 1
+        elif cambio < -args.umbral:
+            marca = "mejora"
+        print(f"{nombre:<32} {antes['por_operacion_ms']:11.3f} {despues['por_operacion_ms']:12.3f} "
+              f"{cambio:+8.1%} {consultas:>14}  {marca}")
+
+    print(f"\n{regresiones} regresiones (umbral {args.umbral:.0%} en tiempo; cualquier aumento de consultas)")
+    return 1 if regresiones else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del ORM")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("generar", help="crear una BD sintética")
+    p.add_argument("--bd", required=True)
+    p.add_argument("--clientes", type=int, default=10000)
+    p.add_argument("--ingredientes", type=int, default=300)
+    p.add_argument("--menus", type=int, default=500)
+    p.add_argument("--pedidos", type=int, default=100000)
+    p.add_argument("--dias", type=int, default=365)
+    p.add_argument("--semilla", type=int, default=7)
+
+    p = sub.add_parser("correr", help="medir los casos y guardar un JSON")
+    p.add_argument("--bd", required=True)
+    p.add_argument("--salida", default=None, help="archivo JSON; por defecto bench_<fecha>.json")
+    p.add_argument("--solo", nargs="+", default=None, metavar="CASO", help=f"opciones: {', '.join(CASOS)}")
+    p.add_argument("--repeticiones", type=int, default=5)
+    p.add_argument("--calentamiento", type=int, default=1)
+    p.add_argument("--pedidos-por-repeticion", type=int, default=200)
+    p.add_argument("--lineas-csv", type=int, default=1000)
+    p.add_argument("--perfil", default="prod")
+    p.add_argument("--semilla", type=int, default=7)
+
+    p = sub.add_parser("comparar", help="comparar dos JSON de resultados")
+    p.add_argument("base")
+    p.add_argument("nuevo")
+    p.add_argument("--umbral", type=float, default=0.10, help="cambio relativo tolerado en ms/op (0.10 = 10%%)")
+
+    args = parser.parse_args()
+
+    if args.comando == "generar":
+        inicio = time.perf_counter()
+        filas = generar_bd(args.bd, args.clientes, args.ingredientes, args.menus,
+                           args.pedidos, args.dias, args.semilla)
+        print(f"{args.bd}: {filas} en {time.perf_counter() - inicio:.1f} s")
+    elif args.comando == "correr":
+        correr(args)
+    else:
+        raise SystemExit(comparar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Archivo: crud/busqueda.py
+#
+# Búsqueda por prefijo con los índices FTS5 (migración 5): clientes_fts
+# (nombre, email) y menus_fts (nombre, descripcion). Son tablas de contenido
+# externo: guardan solo el índice, los datos siguen en clientes / menus, y
+# los triggers de la migración las mantienen al día.
+#
+#   "ana per"  ->  MATCH '"ana"* "per"*'   (todas las palabras, como prefijo)
+#
+# Ordenar por bm25 obliga a puntuar TODOS los calces: con las primeras letras
+# de un nombre común (miles de "Ana ...") eso solo ya se come el presupuesto de
+# una tecla. Por eso primero se cuentan los calces (con tope, sin puntuar) y
+# si pasan de TOPE_RANKING se devuelven los primeros por id; la siguiente letra
+# achica el conjunto y vuelve el orden por relevancia.
+#
+# Sin la migración (BD creada solo con create_all, p. ej. en los benchmarks)
+# se cae a LIKE sobre las mismas columnas: correcto, pero lento.
+#
+# Las palabras se cortan igual que el tokenizador unicode61: solo letras y
+# dígitos. "_" también separa (en \w no, y "juan_perez"* no calzaría nunca con
+# los tokens "juan" y "perez" del índice); de paso ninguna palabra trae los
+# comodines % y _ de LIKE.
+
+import re
+from sqlalchemy import text, or_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+_PALABRAS = re.compile(r"[^\W_]+")
+
+TOPE_RANKING = 2000
+
+
+def consulta_fts(texto: str):
+    """Texto libre -> expresión MATCH de FTS5 (cada palabra como prefijo). None si no hay palabras."""
+    palabras = _PALABRAS.findall((texto or "").lower())
+    if not palabras:
+        return None
+    # solo letras y dígitos: no pasan comillas ni operadores de FTS5
+    return " ".join(f'"{p}"*' for p in palabras)
+
+
+def buscar(db: Session, modelo, tabla_fts: str, pesos: tuple, columnas_like: list, texto: str, limite: int):
+    """
+    Los `limite` objetos de `modelo` que mejor calzan con `texto`, ordenados
+    por bm25 (con `pesos` por columna del índice) si hay menos de TOPE_RANKING
+    calces, o por id si hay más. Lista vacía si no hay texto.
+    """
+    consulta = consulta_fts(texto)
+    if consulta is None:
+        return []
+
+    tabla = modelo.__tablename__
+    try:
+        calces = db.execute(
+            text(f"SELECT count(*) FROM (SELECT rowid FROM {tabla_fts} WHERE {tabla_fts} MATCH :consulta LIMIT :tope)"),
+            {"consulta": consulta, "tope": TOPE_RANKING},
+        ).scalar()
+    except OperationalError as e:
+        if tabla_fts not in str(e) and "fts5" not in str(e):
+            raise
+        return _buscar_like(db, modelo, columnas_like, texto, limite)
+
+    if not calces:
+        return []
+    orden = f"bm25({tabla_fts}, {', '.join(str(p) for p in pesos)})" if calces < TOPE_RANKING else f"{tabla_fts}.rowid"
+    sql = text(
+        f"SELECT {tabla}.* FROM {tabla_fts} JOIN {tabla} ON {tabla}.id = {tabla_fts}.rowid "
+        f"WHERE {tabla_fts} MATCH :consulta ORDER BY {orden} LIMIT :limite"
+    )
+    return db.query(modelo).from_statement(sql).params(consulta=consulta, limite=limite).all()
+
+
+def _buscar_like(db: Session, modelo, columnas_like: list, texto: str, limite: int):
+    """
+    Sin índice FTS: como el MATCH, todas las palabras como prefijo, cada una en
+    alguna columna (al principio o después de un espacio). No ignora acentos.
+    """
+    condiciones = [
+        or_(*[or_(columna.ilike(f"{p}%"), columna.ilike(f"% {p}%")) for columna in columnas_like])
+        for p in _PALABRAS.findall(texto.lower())
+    ]
+    return db.query(modelo)\
+             .filter(*condiciones)\
+             .order_by(columnas_like[0])\
+             .limit(limite)\
+             .all()
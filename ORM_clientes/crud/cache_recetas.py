@@ -0,0 +1,104 @@
+# Archivo: crud/cache_recetas.py
+#
+# Cache en memoria (por proceso) de las recetas para el camino caliente de los
+# pedidos. Las recetas cambian muy poco; los pedidos las leen todo el tiempo.
+#
+#   menu_id -> (precio, [(ingrediente_id, cantidad), ...])
+#
+# Se invalida con un contador de versión: las funciones de menu_crud que
+# modifican menús o recetas llaman a invalidar() (todo) o invalidar_menus()
+# (solo los menús que cambiaron) después del commit.
+# Los cambios hechos desde otro proceso no se ven: por eso servicio_pedidos
+# (que corre aparte de la GUI) lo desactiva.
+
+import threading
+from sqlalchemy.orm import Session
+from models import Menu, MenuIngrediente
+
+_candado = threading.Lock()
+_recetas = {}
+_version = 0            # sube con cada invalidación (total o parcial)
+
+# Se puede desactivar (p. ej. para benchmarks): siempre se lee de la BD
+habilitado = True
+
+estadisticas = {"aciertos": 0, "fallos": 0, "invalidaciones": 0}
+
+
+def invalidar():
+    """Marca todas las recetas como obsoletas. Llamar después de cambiar menús o recetas."""
+    global _recetas, _version
+    with _candado:
+        _recetas = {}
+        _version += 1
+        estadisticas["invalidaciones"] += 1
+
+
+def invalidar_menus(menu_ids):
+    """Descarta solo las recetas de los menús indicados; el resto sigue en cache."""
+    global _version
+    menu_ids = list(menu_ids)
+    if not menu_ids:
+        return
+    with _candado:
+        for menu_id in menu_ids:
+            _recetas.pop(menu_id, None)
+        _version += 1
+        estadisticas["invalidaciones"] += 1
+
+
+def version():
+    return _version
+
+
+def reiniciar_estadisticas():
+    with _candado:
+        for clave in estadisticas:
+            estadisticas[clave] = 0
+
+
+def _leer_de_bd(db: Session, menu_ids: list):
+    """Lee precio y receta de los menús pedidos en una sola consulta (LEFT JOIN)."""
+    filas = db.query(Menu.id, Menu.precio, MenuIngrediente.ingrediente_id, MenuIngrediente.cantidad)\
+              .outerjoin(MenuIngrediente, MenuIngrediente.menu_id == Menu.id)\
+              .filter(Menu.id.in_(menu_ids))\
+              .all()
+
+    recetas = {}
+    for menu_id, precio, ingrediente_id, cantidad in filas:
+        _, receta = recetas.setdefault(menu_id, (precio, []))
+        if ingrediente_id is not None:
+            receta.append((ingrediente_id, cantidad))
+    return recetas
+
+
+def obtener_recetas(db: Session, menu_ids):
+    """
+    Devuelve {menu_id: (precio, [(ingrediente_id, cantidad)])} para los menús
+    pedidos. Los que no están en cache se leen de la BD en una sola consulta.
+    Los menús que no existen no aparecen en el resultado.
+    """
+    menu_ids = set(menu_ids)
+
+    if not habilitado:
+        with _candado:
+            estadisticas["fallos"] += len(menu_ids)
+        return _leer_de_bd(db, list(menu_ids))
+
+    with _candado:
+        version_lectura = _version
+
+        resultado = {m: _recetas[m] for m in menu_ids if m in _recetas}
+        faltantes = [m for m in menu_ids if m not in resultado]
+        estadisticas["aciertos"] += len(resultado)
+        estadisticas["fallos"] += len(faltantes)
+
+    if faltantes:
+        leidas = _leer_de_bd(db, faltantes)
+        resultado.update(leidas)
+        with _candado:
+            # Si alguien invalidó mientras leíamos, no guardamos datos viejos
+            if version_lectura == _version:
+                _recetas.update(leidas)
+
+    return resultado
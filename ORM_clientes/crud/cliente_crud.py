@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 import models  
 from sqlalchemy.exc import IntegrityError 
+from . import busqueda
 
 # --- Función de CREACIÓN (Create) ---
 
@@ -62,12 +63,24 @@ def obtener_cliente_por_id(db: Session, cliente_id: int):
 
     return db.query(models.Cliente).filter(models.Cliente.id == cliente_id).first()
 
-def listar_clientes(db: Session):
+def listar_clientes(db: Session, limite: int = None):
     """
-    Devuelve una lista de todos los clientes en la base de datos.
+    Devuelve una lista de todos los clientes en la base de datos
+    (o solo los primeros `limite`, por ID).
     """
+    if limite:
+        return db.query(models.Cliente).order_by(models.Cliente.id).limit(limite).all()
     return db.query(models.Cliente).all()
 
+def buscar_clientes(db: Session, texto: str, limite: int = 20):
+    """
+    Búsqueda mientras se escribe: los `limite` clientes cuyo nombre o email
+    tienen palabras que empiezan con las de `texto`, del más al menos relevante
+    (índice FTS5 clientes_fts; el nombre pesa el doble que el email).
+    """
+    return busqueda.buscar(db, models.Cliente, "clientes_fts", (2.0, 1.0),
+                           [models.Cliente.nombre, models.Cliente.email], texto, limite)
+
 # --- Función de ACTUALIZACIÓN (Update) ---
 
 def actualizar_cliente(db: Session, cliente_id: int, nuevo_nombre: str, nuevo_email: str):
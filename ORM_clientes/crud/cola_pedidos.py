@@ -0,0 +1,163 @@
+# Archivo: crud/cola_pedidos.py
+#
+# Modo de escritura diferida (write-behind) para los pedidos.
+#
+# En vez de una transacción (y un commit) por pedido, los pedidos validados se
+# encolan y un único hilo escritor los guarda por lotes: una transacción por
+# lote, con un SAVEPOINT por pedido para que uno sin stock no tumbe a los demás.
+# Cada pedido recibe un Future con {"id", "total"} o con la excepción del motivo.
+#
+#     cola = ColaPedidos(max_lote=64, espera_maxima=0.005).iniciar()
+#     futuro = cola.encolar(cliente_id, [{"id": 2, "cantidad": 1}])
+#     futuro.result()  # -> {"id": 15, "total": 3500.0}  (o lanza Exception)
+#     cola.detener()
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy import text
+from database import SessionLocal
+from instrumentacion import medir
+from . import pedido_crud
+
+_FIN = object()  # marca para que el hilo escritor termine
+
+
+class ColaPedidos:
+    """
+    Cola en memoria + hilo escritor con commit agrupado.
+    max_lote: pedidos como máximo por transacción.
+    espera_maxima: segundos que se espera a juntar más pedidos después del primero.
+    """
+
+    def __init__(self, fabrica=None, max_lote: int = 64, espera_maxima: float = 0.005):
+        if max_lote < 1:
+            raise ValueError("max_lote debe ser al menos 1.")
+        self.fabrica = fabrica or SessionLocal
+        self.max_lote = max_lote
+        self.espera_maxima = espera_maxima
+        self.estadisticas = {"lotes": 0, "pedidos": 0, "fallidos": 0}
+        self._cola = queue.Queue()
+        self._hilo = None
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._escritor, name="escritor-pedidos", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self, timeout: float = None):
+        """Guarda lo que quede en la cola y termina el hilo escritor."""
+        if self._hilo is not None and self._hilo.is_alive():
+            self._cola.put(_FIN)
+            self._hilo.join(timeout)
+        self._hilo = None
+
+    def activa(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    # --- Entrada ---
+
+    def encolar(self, cliente_id: int, menus_pedido: list, callback=None):
+        """
+        Valida lo que no necesita la BD y encola el pedido. Devuelve un Future.
+        `callback(futuro)` se llama al terminar, DESDE EL HILO ESCRITOR (una GUI
+        debe pasar el resultado a su propio hilo, p. ej. revisando el futuro con after()).
+        """
+        futuro = Future()
+        if callback:
+            futuro.add_done_callback(callback)
+
+        if not self.activa():
+            futuro.set_exception(Exception("La cola de pedidos no está iniciada."))
+            return futuro
+        try:
+            pedido_crud.validar_lineas(menus_pedido)
+        except Exception as e:
+            futuro.set_exception(e)
+            return futuro
+
+        self._cola.put((cliente_id, list(menus_pedido), futuro))
+        return futuro
+
+    # --- Hilo escritor ---
+
+    def _tomar_lote(self):
+        """Espera el primer pedido y junta más hasta max_lote o hasta espera_maxima."""
+        primero = self._cola.get()
+        if primero is _FIN:
+            return [], True
+
+        lote = [primero]
+        limite = time.monotonic() + self.espera_maxima
+        while len(lote) < self.max_lote:
+            restante = limite - time.monotonic()
+            try:
+                item = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if item is _FIN:
+                return lote, True
+            lote.append(item)
+        return lote, False
+
+    def _escribir_lote(self, lote: list):
+        """Una transacción para todo el lote; un SAVEPOINT por pedido."""
+        guardados = []
+        db = self.fabrica()
+        try:
+            # BEGIN explícito: así los SAVEPOINT quedan dentro de la transacción
+            # (pysqlite no abre una antes del primer SAVEPOINT) y el lock de
+            # escritura se toma una sola vez para todo el lote
+            db.execute(text("BEGIN IMMEDIATE"))
+            for cliente_id, menus_pedido, futuro in lote:
+                if not futuro.set_running_or_notify_cancel():
+                    continue
+                punto = db.begin_nested()
+                try:
+                    pedido = pedido_crud.preparar_pedido(db, cliente_id, menus_pedido)
+                    punto.commit()
+                    guardados.append((futuro, {"id": pedido.id, "total": pedido.total}))
+                except Exception as e:
+                    punto.rollback()
+                    self.estadisticas["fallidos"] += 1
+                    futuro.set_exception(e)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # Se revirtió todo el lote: fallan también los que ya estaban guardados
+            for _, _, futuro in lote:
+                if not futuro.done():
+                    self.estadisticas["fallidos"] += 1
+                    futuro.set_exception(Exception(f"Error al guardar el lote de pedidos: {e}"))
+            return
+        finally:
+            db.close()
+
+        self.estadisticas["lotes"] += 1
+        self.estadisticas["pedidos"] += len(guardados)
+        # Los resultados se publican recién después del commit
+        for futuro, resultado in guardados:
+            futuro.set_result(resultado)
+
+    def _escritor(self):
+        terminar = False
+        while not terminar:
+            lote, terminar = self._tomar_lote()
+            if lote:
+                with medir("cola_pedidos: lote"):
+                    self._escribir_lote(lote)
+        # Lo que haya llegado después de la marca de fin también se guarda
+        resto = []
+        while True:
+            try:
+                item = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _FIN:
+                resto.append(item)
+        for inicio in range(0, len(resto), self.max_lote):
+            self._escribir_lote(resto[inicio:inicio + self.max_lote])
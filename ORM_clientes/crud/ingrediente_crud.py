@@ -1,5 +1,8 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import models 
+from . import movimientos_crud
 from sqlalchemy.exc import IntegrityError 
 import csv 
 
@@ -18,9 +21,10 @@ def listar_ingredientes(db: Session):
     return db.query(models.Ingrediente).all()
 
 # --- Función de CREACIÓN/UPSERT (Create or Sum Stock) ---
-def crear_ingrediente(db: Session, nombre: str, stock: float):
+def crear_ingrediente(db: Session, nombre: str, stock: float, tipo: str = movimientos_crud.COMPRA):
     """
     Busca el ingrediente por nombre. Si existe, SUMA el stock. Si no existe, lo crea.
+    El ingreso queda en el libro de movimientos como `tipo` (compra por defecto).
     Devuelve el objeto Ingrediente o un string de error.
     """
     
@@ -35,6 +39,7 @@ def crear_ingrediente(db: Session, nombre: str, stock: float):
             # 1. Si existe, SUMAR el stock
             stock_nuevo = db_ingrediente.stock + stock
             db_ingrediente.stock = stock_nuevo
+            movimientos_crud.registrar_movimientos(db, tipo, {db_ingrediente.id: stock})
             db.commit()
             db.refresh(db_ingrediente)
             return db_ingrediente
@@ -45,6 +50,8 @@ def crear_ingrediente(db: Session, nombre: str, stock: float):
                 stock=stock
             )
             db.add(db_ingrediente)
+            db.flush() # para tener el ID del movimiento
+            movimientos_crud.registrar_movimientos(db, tipo, {db_ingrediente.id: stock})
             db.commit()
             db.refresh(db_ingrediente)
             return db_ingrediente
@@ -55,15 +62,41 @@ def crear_ingrediente(db: Session, nombre: str, stock: float):
 
 # --- Función de ACTUALIZACIÓN (Update - Fija un valor) ---
 def actualizar_stock_ingrediente(db: Session, ingrediente_id: int, nuevo_stock: float):
-    """Actualiza el stock de un ingrediente al valor especificado (reemplaza)."""
-    db_ingrediente = obtener_ingrediente_por_id(db, ingrediente_id)
-    
-    if not db_ingrediente or nuevo_stock < 0:
+    """
+    Actualiza el stock de un ingrediente al valor especificado (reemplaza).
+    La diferencia queda en el libro de movimientos como ajuste, calculada con
+    el stock leído dentro de la misma transacción de escritura (no con el que
+    tenía el objeto en la sesión, que puede estar viejo si otro pedido o
+    compra se guardó en el medio).
+    """
+    if nuevo_stock < 0:
         return None
-    
+
     try:
-        db_ingrediente.stock = nuevo_stock
+        # UPDATE sin cambios que toma el lock de escritura y devuelve el stock
+        # actual: desde acá nadie más puede modificarlo hasta el commit
+        stock_anterior = db.execute(
+            update(models.Ingrediente)
+            .where(models.Ingrediente.id == ingrediente_id)
+            .values(stock=models.Ingrediente.stock)
+            .returning(models.Ingrediente.stock)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if stock_anterior is None:
+            db.rollback()
+            return None
+
+        db.execute(
+            update(models.Ingrediente)
+            .where(models.Ingrediente.id == ingrediente_id)
+            .values(stock=nuevo_stock)
+            .execution_options(synchronize_session=False)
+        )
+        movimientos_crud.registrar_movimientos(
+            db, movimientos_crud.AJUSTE, {ingrediente_id: nuevo_stock - stock_anterior}
+        )
         db.commit()
+        db_ingrediente = obtener_ingrediente_por_id(db, ingrediente_id)
         db.refresh(db_ingrediente)
         return db_ingrediente
     except Exception:
@@ -81,6 +114,9 @@ def eliminar_ingrediente(db: Session, ingrediente_id: int):
     # Se eliminó la restricción de menús para cumplir el requisito.
         
     try:
+        # Su historia de stock se va con él
+        db.query(models.MovimientoStock).filter(models.MovimientoStock.ingrediente_id == ingrediente_id).delete()
+        db.query(models.SnapshotStock).filter(models.SnapshotStock.ingrediente_id == ingrediente_id).delete()
         db.delete(db_ingrediente)
         db.commit()
         return True
@@ -90,6 +126,35 @@ def eliminar_ingrediente(db: Session, ingrediente_id: int):
 
 # --- Función de Carga CSV ---
 
+def _parsear_fila_csv(fila: list):
+    """
+    Valida una fila del CSV y devuelve (nombre, stock).
+    Acepta 3 columnas (nombre, unidad, cantidad) o 2 columnas (nombre, cantidad).
+    Lanza ValueError con el motivo si la fila no es válida.
+    """
+    if len(fila) == 3:
+        nombre_ingrediente = fila[0]
+        # Ignoramos fila[1] (unidad)
+        stock_str = fila[2]
+    elif len(fila) == 2:
+        nombre_ingrediente = fila[0]
+        stock_str = fila[1]
+    else:
+        raise ValueError(f"se esperaban 2 o 3 columnas, llegaron {len(fila)}")
+
+    if not nombre_ingrediente.strip():
+        raise ValueError("nombre vacio")
+
+    try:
+        stock_a_cargar = float(stock_str)
+    except ValueError:
+        raise ValueError(f"stock invalido ('{stock_str}')")
+
+    if stock_a_cargar < 0:
+        raise ValueError(f"stock negativo ('{stock_str}')")
+
+    return nombre_ingrediente, stock_a_cargar
+
 
 def cargar_ingredientes_csv(db: Session, ruta_archivo: str):
     """
@@ -112,31 +177,14 @@ def cargar_ingredientes_csv(db: Session, ruta_archivo: str):
                 if not fila:
                     continue
                 
-                # CORRECCIÓN: Esperamos 3 columnas (nombre, unidad, cantidad)
-                if len(fila) == 3:
-                    nombre_ingrediente = fila[0]
-                    # Ignoramos fila[1] (unidad)
-                    stock_str = fila[2]
-                
-                # (Mantenemos la lógica de 2 columnas por si acaso)
-                elif len(fila) == 2:
-                    nombre_ingrediente = fila[0]
-                    stock_str = fila[1]
-                
-                else:
-                    print(f"Error de formato en CSV, linea ignorada (se esperaban 2 o 3 columnas): {fila}")
-                    continue
-                
                 try:
-                    stock_a_cargar = float(stock_str)
-                    if stock_a_cargar < 0:
-                        raise ValueError("Stock no puede ser negativo")
-                except ValueError:
-                    print(f"Error de formato en CSV, stock invalido ('{stock_str}'), linea ignorada: {fila}")
+                    nombre_ingrediente, stock_a_cargar = _parsear_fila_csv(fila)
+                except ValueError as e:
+                    print(f"Error de formato en CSV, linea ignorada ({e}): {fila}")
                     continue
 
                 # Llama a la función que GUARDA EN LA BD (crear o sumar)
-                resultado = crear_ingrediente(db, nombre_ingrediente, stock_a_cargar)
+                resultado = crear_ingrediente(db, nombre_ingrediente, stock_a_cargar, movimientos_crud.CARGA_CSV)
                 
                 if isinstance(resultado, str):
                     print(f"Fallo al procesar '{nombre_ingrediente}': {resultado}")
@@ -149,4 +197,108 @@ def cargar_ingredientes_csv(db: Session, ruta_archivo: str):
         return False
     except Exception as e:
         print(f"Error inesperado durante la carga CSV: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+# --- Función de Carga CSV Masiva (Bulk Upsert) ---
+
+def _aplicar_lote_ingredientes(db: Session, lote: dict):
+    """
+    Aplica un lote {nombre: stock} con un único INSERT ... ON CONFLICT(nombre) DO UPDATE.
+    Si el ingrediente existe, SUMA el stock; si no, lo crea.
+    Los ingresos quedan en el libro de movimientos como carga_csv (otro INSERT masivo).
+    """
+    if not lote:
+        return
+
+    stmt = sqlite_insert(models.Ingrediente)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Ingrediente.nombre],
+        set_={"stock": models.Ingrediente.stock + stmt.excluded.stock},
+    )
+    db.execute(stmt, [{"nombre": nombre, "stock": stock} for nombre, stock in lote.items()])
+
+    ids = db.query(models.Ingrediente.nombre, models.Ingrediente.id)\
+            .filter(models.Ingrediente.nombre.in_(list(lote)))\
+            .all()
+    movimientos_crud.registrar_movimientos(
+        db, movimientos_crud.CARGA_CSV, {ing_id: lote[nombre] for nombre, ing_id in ids}
+    )
+
+
+def cargar_ingredientes_csv_masivo(db: Session, ruta_archivo: str, tamano_lote: int = 5000):
+    """
+    Carga ingredientes desde un CSV en modo masivo, en UNA sola transacción.
+    Lee el archivo por lotes de `tamano_lote` líneas, suma los nombres repetidos
+    dentro de cada lote y aplica un upsert set-based por lote.
+    Si algo falla en la BD se revierte todo el archivo.
+
+    Devuelve un reporte (dict):
+        exito, lineas_leidas, lineas_cargadas, ingredientes_afectados,
+        errores -> lista de (numero_linea, fila, motivo)
+    """
+    reporte = {
+        "exito": False,
+        "lineas_leidas": 0,
+        "lineas_cargadas": 0,
+        "ingredientes_afectados": 0,
+        "errores": [],
+    }
+    afectados = set()
+
+    print(f"Iniciando carga masiva de stock desde {ruta_archivo}...")
+    try:
+        with open(ruta_archivo, mode='r', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+
+            # Omitir la cabecera si existe
+            try:
+                next(reader)
+            except StopIteration:
+                pass
+
+            lote = {}
+            lineas_en_lote = 0
+            for fila in reader:
+                if not fila:
+                    continue
+
+                reporte["lineas_leidas"] += 1
+                try:
+                    nombre_ingrediente, stock_a_cargar = _parsear_fila_csv(fila)
+                except ValueError as e:
+                    reporte["errores"].append((reader.line_num, fila, str(e)))
+                    continue
+
+                # Misma normalización que crear_ingrediente
+                nombre_formateado = nombre_ingrediente.strip().title()
+                lote[nombre_formateado] = lote.get(nombre_formateado, 0.0) + stock_a_cargar
+                lineas_en_lote += 1
+
+                if lineas_en_lote >= tamano_lote:
+                    _aplicar_lote_ingredientes(db, lote)
+                    afectados.update(lote)
+                    reporte["lineas_cargadas"] += lineas_en_lote
+                    lote = {}
+                    lineas_en_lote = 0
+
+            _aplicar_lote_ingredientes(db, lote)
+            afectados.update(lote)
+            reporte["lineas_cargadas"] += lineas_en_lote
+
+        db.commit()
+        reporte["exito"] = True
+        reporte["ingredientes_afectados"] = len(afectados)
+        print(f"Carga masiva completada: {reporte['lineas_cargadas']} lineas, {len(reporte['errores'])} con error.")
+        return reporte
+
+    except FileNotFoundError:
+        print(f"Error: Archivo CSV no encontrado en {ruta_archivo}")
+        reporte["errores"].append((0, None, "archivo no encontrado"))
+        return reporte
+    except Exception as e:
+        db.rollback()
+        print(f"Error inesperado durante la carga masiva CSV: {e}")
+        reporte["lineas_cargadas"] = 0
+        reporte["errores"].append((0, None, f"error de BD, carga revertida: {e}"))
+        return reporte
@@ -1,8 +1,9 @@
 # Archivo: crud/menu_crud.py
 
 from sqlalchemy.orm import Session
+from sqlalchemy import or_, insert
 from models import Menu, Ingrediente, MenuIngrediente
-from . import ingrediente_crud 
+from . import ingrediente_crud, cache_recetas, busqueda
 from sqlalchemy.exc import IntegrityError
 
 # --- Funciones de LECTURA (Read) ---
@@ -13,9 +14,16 @@ def leer_menu_por_id(db: Session, menu_id: int):
 def leer_menu_por_nombre(db: Session, nombre: str):
     return db.query(Menu).filter(Menu.nombre == nombre).first()
 
-def leer_todos_los_menus(db: Session):
+def leer_todos_los_menus(db: Session, limite: int = None):
+    """Todos los menús (o solo los primeros `limite`, por ID)."""
+    if limite:
+        return db.query(Menu).order_by(Menu.id).limit(limite).all()
     return db.query(Menu).all()
 
+def buscar_menus(db: Session, texto: str, limite: int = 20):
+    """Los `limite` menús que mejor calzan con `texto` por nombre o descripción (índice FTS5 menus_fts)."""
+    return busqueda.buscar(db, Menu, "menus_fts", (3.0, 1.0), [Menu.nombre, Menu.descripcion], texto, limite)
+
 # --- Función de CREACIÓN (Create) ---
 
 def crear_menu(db: Session, nombre: str, descripcion: str, precio: float, receta: list = None):
@@ -55,6 +63,7 @@ def crear_menu(db: Session, nombre: str, descripcion: str, precio: float, receta
                 db.add(asoc)
         
         db.commit()
+        cache_recetas.invalidar()
         db.refresh(db_menu)
         return db_menu
 
@@ -62,15 +71,133 @@ def crear_menu(db: Session, nombre: str, descripcion: str, precio: float, receta
         db.rollback()
         return f"Error al crear menú: {e}"
 
+# --- Función de CREACIÓN MASIVA (Batch) ---
+
+def crear_menus_masivo(db: Session, definiciones: list):
+    """
+    Crea muchos menús con sus recetas en UNA transacción.
+    `definiciones` es una lista de (nombre, precio, receta), donde receta es una
+    lista de (ingrediente, cantidad) e ingrediente puede ser el nombre o el ID.
+
+    - Todos los ingredientes (por nombre o ID) se resuelven en una consulta IN.
+    - Los menús que ya existen se detectan con una sola consulta y se saltan.
+    - Un menú con precio/cantidad inválida o ingredientes faltantes se reporta
+      como fallido y no se crea; el resto se inserta igual.
+
+    Devuelve un reporte (dict): creados, existentes, fallidos -> [(nombre, motivo)]
+    o un string de error si falla la BD (en ese caso no se crea ninguno).
+    """
+    reporte = {"creados": [], "existentes": [], "fallidos": []}
+
+    # 1. Normalizar nombres (igual que crear_menu) y quitar duplicados del lote
+    pendientes = {}
+    for nombre, precio, receta in definiciones:
+        nombre_formateado = nombre.strip().title()
+        if nombre_formateado in pendientes:
+            reporte["fallidos"].append((nombre_formateado, "Menú repetido en el lote."))
+            continue
+        pendientes[nombre_formateado] = (precio, receta)
+
+    if not pendientes:
+        return reporte
+
+    # 2. Menús que ya existen (una consulta)
+    existentes = {n for (n,) in db.query(Menu.nombre).filter(Menu.nombre.in_(list(pendientes))).all()}
+    reporte["existentes"] = sorted(existentes)
+
+    # 3. Resolver todos los ingredientes por nombre o ID (una consulta)
+    nombres_ing, ids_ing = set(), set()
+    for nombre, (precio, receta) in pendientes.items():
+        if nombre in existentes:
+            continue
+        for ingrediente, cantidad in receta:
+            if isinstance(ingrediente, int):
+                ids_ing.add(ingrediente)
+            else:
+                nombres_ing.add(ingrediente.strip().title())
+
+    por_nombre, por_id = {}, set()
+    if nombres_ing or ids_ing:
+        filas = db.query(Ingrediente.id, Ingrediente.nombre)\
+                  .filter(or_(Ingrediente.nombre.in_(list(nombres_ing)), Ingrediente.id.in_(list(ids_ing))))\
+                  .all()
+        por_nombre = {n: i for i, n in filas}
+        por_id = {i for i, n in filas}
+
+    # 4. Armar los menús válidos
+    nuevos = []
+    for nombre, (precio, receta) in pendientes.items():
+        if nombre in existentes:
+            continue
+        if precio <= 0:
+            reporte["fallidos"].append((nombre, "El precio debe ser positivo."))
+            continue
+
+        items, motivo = {}, None
+        for ingrediente, cantidad in receta:
+            ing_id = ingrediente if isinstance(ingrediente, int) else por_nombre.get(ingrediente.strip().title())
+            if ing_id is None or ing_id not in por_id:
+                motivo = f"Ingrediente '{ingrediente}' no encontrado."
+                break
+            if cantidad <= 0:
+                motivo = f"Cantidad inválida para ingrediente '{ingrediente}'."
+                break
+            items[ing_id] = items.get(ing_id, 0) + cantidad
+
+        if motivo:
+            reporte["fallidos"].append((nombre, motivo))
+            continue
+
+        nuevos.append(({"nombre": nombre, "descripcion": f"Receta de {nombre}", "precio": precio}, items))
+
+    if not nuevos:
+        return reporte
+
+    # 5. Insertar todo en una transacción (INSERT masivo, sin armar objetos ORM)
+    try:
+        filas_menu = [menu for menu, items in nuevos]
+        ids_menu = dict(db.execute(insert(Menu).returning(Menu.nombre, Menu.id), filas_menu).all())
+        filas_receta = [
+            {"menu_id": ids_menu[menu["nombre"]], "ingrediente_id": i, "cantidad": c}
+            for menu, items in nuevos for i, c in items.items()
+        ]
+        if filas_receta:
+            db.execute(insert(MenuIngrediente), filas_receta)
+        db.commit()
+        cache_recetas.invalidar()
+        reporte["creados"] = [menu["nombre"] for menu, items in nuevos]
+        return reporte
+    except Exception as e:
+        db.rollback()
+        return f"Error al crear menús en lote: {e}"
+
 # --- Funciones de ACTUALIZACION (Update) ---
 
 # Archivo: crud/menu_crud.py
 # (Mantén las importaciones y las funciones de leer/crear/eliminar como estaban)
 # SOLO REEMPLAZA O AÑADE ESTA FUNCIÓN DE ACTUALIZACIÓN:
 
+def _diferencias_receta(actual: dict, nueva: dict):
+    """
+    Compara dos recetas {ingrediente_id: cantidad}.
+    Devuelve (agregados, modificados, eliminados):
+      agregados   -> [(ingrediente_id, cantidad)]
+      modificados -> [(ingrediente_id, cantidad_anterior, cantidad_nueva)]
+      eliminados  -> [ingrediente_id]
+    """
+    agregados = [(i, c) for i, c in nueva.items() if i not in actual]
+    modificados = [(i, actual[i], c) for i, c in nueva.items() if i in actual and actual[i] != c]
+    eliminados = [i for i in actual if i not in nueva]
+    return agregados, modificados, eliminados
+
+
 def actualizar_menu_completo(db: Session, menu_id: int, nombre: str, descripcion: str, precio: float, nueva_receta: list):
     """
-    Actualiza un menú y REEMPLAZA su receta completa.
+    Actualiza un menú y su receta completa. La receta nueva se compara con la
+    guardada y solo se insertan, modifican o borran las filas que cambiaron.
+    Devuelve un dict con el menú y los cambios:
+      {"menu", "agregados", "modificados", "eliminados", "precio_cambiado"}
+    o un string de error.
     """
     # 1. Buscar el menú
     db_menu = leer_menu_por_id(db, menu_id)
@@ -80,35 +207,52 @@ def actualizar_menu_completo(db: Session, menu_id: int, nombre: str, descripcion
     if precio <= 0:
         return "Error: El precio debe ser positivo."
 
+    # 2. Receta nueva como {ingrediente_id: cantidad} (los repetidos se suman)
+    nueva = {}
+    for item in nueva_receta or []:
+        if item['cantidad'] <= 0:
+            return f"Error: Cantidad inválida para ingrediente ID {item['ingrediente_id']}."
+        nueva[item['ingrediente_id']] = nueva.get(item['ingrediente_id'], 0) + item['cantidad']
+
+    # 3. Validar todos los ingredientes en una sola consulta
+    if nueva:
+        existentes = {i for (i,) in db.query(Ingrediente.id).filter(Ingrediente.id.in_(list(nueva))).all()}
+        faltantes = sorted(set(nueva) - existentes)
+        if faltantes:
+            return f"Error al actualizar menú: Ingrediente ID {', '.join(map(str, faltantes))} no existe."
+
     try:
-        # 2. Actualizar datos básicos
+        # 4. Actualizar datos básicos
+        precio_cambiado = db_menu.precio != precio
         db_menu.nombre = nombre.strip().title()
         db_menu.descripcion = descripcion.strip()
         db_menu.precio = precio
 
-        # 3. ACTUALIZAR LA RECETA (La parte difícil)
-        # Estrategia: Borramos todas las asociaciones viejas y creamos las nuevas.
-        
-        # Borrar ingredientes actuales de este menú
-        db.query(MenuIngrediente).filter(MenuIngrediente.menu_id == menu_id).delete()
-        
-        # Agregar los nuevos ingredientes (si hay)
-        if nueva_receta:
-            for item in nueva_receta:
-                ing_id = item['ingrediente_id']
-                cant = item['cantidad']
-                
-                db_ing = ingrediente_crud.obtener_ingrediente_por_id(db, ing_id)
-                if not db_ing:
-                    raise Exception(f"Ingrediente ID {ing_id} no existe.")
-                
-                # Crear nueva asociación
-                nuevo_item = MenuIngrediente(menu=db_menu, ingrediente=db_ing, cantidad=cant)
-                db.add(nuevo_item)
+        # 5. Aplicar solo las diferencias de la receta
+        filas = {f.ingrediente_id: f for f in db.query(MenuIngrediente).filter(MenuIngrediente.menu_id == menu_id).all()}
+        agregados, modificados, eliminados = _diferencias_receta(
+            {i: f.cantidad for i, f in filas.items()}, nueva
+        )
+
+        for ing_id, cant in agregados:
+            db.add(MenuIngrediente(menu_id=menu_id, ingrediente_id=ing_id, cantidad=cant))
+        for ing_id, _, cant in modificados:
+            filas[ing_id].cantidad = cant
+        for ing_id in eliminados:
+            db.delete(filas[ing_id])
 
         db.commit()
+        # Solo el precio y la receta están en cache; nombre/descripción no
+        if precio_cambiado or agregados or modificados or eliminados:
+            cache_recetas.invalidar_menus([menu_id])
         db.refresh(db_menu)
-        return db_menu
+        return {
+            "menu": db_menu,
+            "agregados": agregados,
+            "modificados": modificados,
+            "eliminados": eliminados,
+            "precio_cambiado": precio_cambiado,
+        }
 
     except Exception as e:
         db.rollback()
@@ -124,6 +268,7 @@ def eliminar_menu(db: Session, menu_id: int):
         # Pero debemos verificar si está en pedidos (pendiente)
         db.delete(db_menu)
         db.commit()
+        cache_recetas.invalidar()
         return True
     except Exception as e:
         db.rollback()
@@ -157,6 +302,7 @@ def crear_receta_existente(db: Session, menu_id: int, receta: list):
             db.add(asoc)
 
         db.commit()
+        cache_recetas.invalidar()
         return db_menu
 
     except Exception as e:
@@ -0,0 +1,150 @@
+# Archivo: crud/movimientos_crud.py
+#
+# Libro de movimientos de stock (movimientos_stock) y snapshots periódicos.
+#
+# - Cada cambio de stock agrega movimientos (INSERT masivo, sin leer nada).
+# - Ingrediente.stock es el valor actual mantenido en la misma transacción.
+# - El stock a cualquier fecha = último snapshot <= fecha + movimientos posteriores
+#   hasta esa fecha (dos consultas sobre índices, sin recorrer toda la historia).
+#
+# Crear un snapshot de todo el inventario (desde ORM_clientes/):
+#   python -m crud.movimientos_crud
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, and_, select, insert, delete
+from models import Ingrediente, MovimientoStock, SnapshotStock
+from datetime import datetime, timedelta
+
+# Tipos de movimiento
+COMPRA = "compra"
+VENTA = "venta"
+AJUSTE = "ajuste"
+CARGA_CSV = "carga_csv"
+TIPOS = (COMPRA, VENTA, AJUSTE, CARGA_CSV)
+
+# --- Funciones de ESCRITURA (solo agregan) ---
+
+def registrar_movimientos(db: Session, tipo: str, cantidades: dict, fecha: datetime = None, pedido_id: int = None):
+    """
+    Agrega al libro un movimiento por ingrediente con un solo INSERT masivo.
+    `cantidades` es {ingrediente_id: cantidad} (positiva entra, negativa sale).
+    No hace commit (lo hace quien llama, junto con el cambio de Ingrediente.stock).
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de movimiento desconocido: '{tipo}'")
+
+    fecha = fecha or datetime.now()
+    filas = [
+        {"ingrediente_id": ing_id, "fecha": fecha, "tipo": tipo, "cantidad": cantidad, "pedido_id": pedido_id}
+        for ing_id, cantidad in cantidades.items() if cantidad
+    ]
+    if filas:
+        db.execute(insert(MovimientoStock), filas)
+
+# --- Funciones de LECTURA ---
+
+def _ultimos_snapshots(fecha: datetime):
+    """Subconsulta: fecha del último snapshot <= fecha de cada ingrediente."""
+    return select(SnapshotStock.ingrediente_id, func.max(SnapshotStock.fecha).label("fecha"))\
+             .where(SnapshotStock.fecha <= fecha)\
+             .group_by(SnapshotStock.ingrediente_id)\
+             .subquery()
+
+def stock_al(db: Session, fecha: datetime = None, ingrediente_ids: list = None):
+    """
+    Stock de cada ingrediente a una fecha (por defecto, ahora) calculado como
+    snapshot + movimientos posteriores. Devuelve {ingrediente_id: stock}.
+    Los ingredientes sin snapshot ni movimientos hasta esa fecha no aparecen.
+    """
+    fecha = fecha or datetime.now()
+    ultimos = _ultimos_snapshots(fecha)
+
+    # 1. Valor de los snapshots
+    consulta = db.query(SnapshotStock.ingrediente_id, SnapshotStock.stock)\
+                 .join(ultimos, and_(ultimos.c.ingrediente_id == SnapshotStock.ingrediente_id,
+                                     ultimos.c.fecha == SnapshotStock.fecha))
+    if ingrediente_ids is not None:
+        consulta = consulta.filter(SnapshotStock.ingrediente_id.in_(ingrediente_ids))
+    stock = dict(consulta.all())
+
+    # 2. Movimientos posteriores al snapshot (o todos, si no hay snapshot)
+    consulta = db.query(MovimientoStock.ingrediente_id, func.sum(MovimientoStock.cantidad))\
+                 .outerjoin(ultimos, ultimos.c.ingrediente_id == MovimientoStock.ingrediente_id)\
+                 .filter(MovimientoStock.fecha <= fecha,
+                         or_(ultimos.c.fecha.is_(None), MovimientoStock.fecha > ultimos.c.fecha))
+    if ingrediente_ids is not None:
+        consulta = consulta.filter(MovimientoStock.ingrediente_id.in_(ingrediente_ids))
+    for ing_id, delta in consulta.group_by(MovimientoStock.ingrediente_id).all():
+        stock[ing_id] = stock.get(ing_id, 0.0) + delta
+
+    return stock
+
+def leer_movimientos(db: Session, ingrediente_id: int, desde: datetime = None, hasta: datetime = None):
+    """Movimientos de un ingrediente (más recientes primero), filtrados por fecha."""
+    consulta = db.query(MovimientoStock).filter(MovimientoStock.ingrediente_id == ingrediente_id)
+    if desde is not None:
+        consulta = consulta.filter(MovimientoStock.fecha >= desde)
+    if hasta is not None:
+        consulta = consulta.filter(MovimientoStock.fecha < hasta)
+    return consulta.order_by(MovimientoStock.fecha.desc(), MovimientoStock.id.desc()).all()
+
+def verificar_stock(db: Session):
+    """
+    Compara Ingrediente.stock (cache) con snapshot + movimientos.
+    Devuelve una lista de (nombre, stock_cache, stock_libro) que no coinciden.
+    """
+    libro = stock_al(db)
+    diferencias = []
+    for ing_id, nombre, stock in db.query(Ingrediente.id, Ingrediente.nombre, Ingrediente.stock).all():
+        calculado = libro.get(ing_id, 0.0)
+        if abs(calculado - stock) > 1e-6:
+            diferencias.append((nombre, stock, calculado))
+    return diferencias
+
+# --- Funciones de SNAPSHOT / COMPACTACIÓN ---
+
+def crear_snapshot(db: Session, fecha: datetime = None, borrar_movimientos: bool = False):
+    """
+    Guarda el stock de cada ingrediente a `fecha` (snapshot + movimientos) para
+    que las lecturas posteriores solo sumen los movimientos nuevos.
+    Con borrar_movimientos=True se borran los movimientos ya incluidos en el
+    snapshot (compactación): el stock a fechas anteriores solo queda disponible
+    en las fechas de los snapshots. No hace commit.
+    Devuelve la cantidad de ingredientes en el snapshot.
+    """
+    fecha = fecha or datetime.now()
+    stock = stock_al(db, fecha)
+
+    db.execute(delete(SnapshotStock).where(SnapshotStock.fecha == fecha))
+    if stock:
+        db.execute(insert(SnapshotStock), [
+            {"ingrediente_id": ing_id, "fecha": fecha, "stock": valor} for ing_id, valor in stock.items()
+        ])
+    if borrar_movimientos:
+        db.execute(delete(MovimientoStock).where(MovimientoStock.fecha <= fecha))
+    return len(stock)
+
+def compactar_si_corresponde(db: Session, cada: timedelta = timedelta(days=1)):
+    """
+    Crea un snapshot (a la medianoche de hoy) si el último tiene más de `cada`.
+    Pensado para llamarse al iniciar la aplicación. No hace commit.
+    Devuelve True si creó un snapshot.
+    """
+    hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    ultimo = db.query(func.max(SnapshotStock.fecha)).scalar()
+    if ultimo is not None and hoy - ultimo < cada:
+        return False
+    crear_snapshot(db, hoy)
+    return True
+
+
+if __name__ == "__main__":
+    from database import engine, Base, unidad_de_trabajo
+
+    Base.metadata.create_all(bind=engine)
+    with unidad_de_trabajo() as db:
+        cantidad = crear_snapshot(db)
+        diferencias = verificar_stock(db)
+    print(f"Snapshot creado para {cantidad} ingredientes.")
+    for nombre, cache, libro in diferencias:
+        print(f"  DIFERENCIA: {nombre}: stock={cache}, libro={libro}")
@@ -1,8 +1,9 @@
 # Archivo: crud/pedido_crud.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import update, tuple_, case
 from models import Pedido, PedidoMenu, Menu, Ingrediente, Cliente
-from . import cliente_crud, menu_crud, ingrediente_crud 
+from . import cliente_crud, ingrediente_crud, cache_recetas, ventas_crud, movimientos_crud
 from datetime import datetime
 from functools import reduce 
 from sqlalchemy.exc import IntegrityError
@@ -12,106 +13,292 @@ from sqlalchemy.exc import IntegrityError
 def leer_pedido_por_id(db: Session, pedido_id: int):
     return db.query(Pedido).filter(Pedido.id == pedido_id).first()
 
+def leer_detalle_pedido(db: Session, pedido_id: int):
+    """
+    Carga un pedido con su cliente y sus líneas en un número fijo de consultas
+    (2: pedido+cliente con JOIN, y las líneas). Precio y subtotal de cada línea
+    son los guardados al vender; de menus solo se trae el nombre.
+
+    Devuelve un dict plano (usable después de cerrar la sesión) o None:
+        id, fecha, total, cliente_id, cliente_nombre, cliente_email,
+        lineas -> lista de dicts (menu_id, nombre, cantidad, precio_unitario, subtotal)
+    """
+    pedido = db.query(Pedido)\
+               .options(joinedload(Pedido.cliente))\
+               .filter(Pedido.id == pedido_id)\
+               .first()
+    if not pedido:
+        return None
+
+    filas = db.query(PedidoMenu.menu_id, Menu.nombre, PedidoMenu.cantidad,
+                     PedidoMenu.precio_unitario, PedidoMenu.subtotal)\
+              .outerjoin(Menu, Menu.id == PedidoMenu.menu_id)\
+              .filter(PedidoMenu.pedido_id == pedido_id)\
+              .all()
+
+    lineas = []
+    for menu_id, nombre, cantidad, precio_unitario, subtotal in filas:
+        lineas.append({
+            "menu_id": menu_id,
+            "nombre": nombre if nombre is not None else "Menú borrado",
+            "cantidad": cantidad,
+            "precio_unitario": precio_unitario,
+            "subtotal": subtotal,
+        })
+
+    return {
+        "id": pedido.id,
+        "fecha": pedido.fecha,
+        "total": pedido.total,
+        "cliente_id": pedido.cliente_id,
+        "cliente_nombre": pedido.cliente.nombre if pedido.cliente else None,
+        "cliente_email": pedido.cliente.email if pedido.cliente else None,
+        "lineas": lineas,
+    }
+
 def leer_pedidos_por_cliente(db: Session, cliente_id: int):
     return db.query(Pedido).filter(Pedido.cliente_id == cliente_id).all()
 
 def leer_todos_los_pedidos(db: Session):
     return db.query(Pedido).order_by(Pedido.fecha.desc()).all()
 
+def leer_historial_pedidos(db: Session, limite: int = 100, despues_de: tuple = None,
+                           cliente_id: int = None, desde: datetime = None, hasta: datetime = None,
+                           total_minimo: float = None):
+    """
+    Página del historial de pedidos (más recientes primero), paginada por keyset
+    sobre (fecha, id): para pedir la página siguiente se pasa en `despues_de`
+    el (fecha, id) de la última fila recibida. No usa OFFSET, así que cada
+    página cuesta lo mismo aunque haya cientos de miles de pedidos.
+
+    Devuelve tuplas (id, fecha, nombre_cliente, total) de una sola consulta
+    con JOIN a clientes (nombre_cliente es None si el cliente fue eliminado).
+    Filtros opcionales: cliente, desde <= fecha < hasta, total >= total_minimo.
+    """
+    consulta = db.query(Pedido.id, Pedido.fecha, Cliente.nombre, Pedido.total)\
+                 .outerjoin(Cliente, Cliente.id == Pedido.cliente_id)
+
+    if cliente_id is not None:
+        consulta = consulta.filter(Pedido.cliente_id == cliente_id)
+    if desde is not None:
+        consulta = consulta.filter(Pedido.fecha >= desde)
+    if hasta is not None:
+        consulta = consulta.filter(Pedido.fecha < hasta)
+    if total_minimo is not None:
+        consulta = consulta.filter(Pedido.total >= total_minimo)
+
+    if despues_de is not None:
+        fecha_ultima, id_ultimo = despues_de
+        consulta = consulta.filter(tuple_(Pedido.fecha, Pedido.id) < tuple_(fecha_ultima, id_ultimo))
+
+    return consulta.order_by(Pedido.fecha.desc(), Pedido.id.desc())\
+                   .limit(limite)\
+                   .all()
+
+# --- Errores de pedidos ---
+
+class PedidoInvalido(Exception):
+    """Pedido que no se puede guardar: vacío, cantidades no positivas, o cliente/menú/ingrediente inexistente."""
+
+class StockInsuficiente(Exception):
+    """No alcanza el stock de algún ingrediente para el pedido."""
+
 # --- Función de CREACIÓN (Create) ---
 
-def crear_pedido(db: Session, cliente_id: int, menus_pedido: list):
+def _sumar_requerimientos(recetas: dict, cantidades_por_menu: dict):
+    """Suma lo necesario de cada ingrediente entre TODAS las líneas: {ingrediente_id: cantidad}."""
+    requerimientos = {}
+    for menu_id, cantidad_pedida in cantidades_por_menu.items():
+        _, receta = recetas[menu_id]
+        for ingrediente_id, cantidad in receta:
+            requerimientos[ingrediente_id] = requerimientos.get(ingrediente_id, 0) + cantidad * cantidad_pedida
+    return requerimientos
+
+def _agrupar_lineas(menus_pedido: list):
+    """Valida las cantidades y agrupa las líneas repetidas del mismo menú: {menu_id: cantidad}."""
+    cantidades_por_menu = {}
+    for item in menus_pedido:
+        menu_id = item['id']
+        cantidad = item['cantidad']
+        
+        if cantidad <= 0:
+            raise PedidoInvalido(f"La cantidad para el menu ID {menu_id} debe ser positiva.")
+
+        cantidades_por_menu[menu_id] = cantidades_por_menu.get(menu_id, 0) + cantidad
+    return cantidades_por_menu
+
+def _descontar_stock(db: Session, requerimientos: dict):
     """
-    Crea un nuevo pedido, descuenta stock y calcula el total.
+    Descuenta el stock de todos los ingredientes con UN solo UPDATE condicional
+    (stock >= necesario, con el necesario de cada uno en un CASE) que devuelve
+    los IDs actualizados. Si falta alguno es porque no alcanza el stock: se
+    lanza StockInsuficiente y el llamador revierte el pedido completo.
     """
-    
-    try:
-        # 1. Validar Cliente
-        db_cliente = cliente_crud.obtener_cliente_por_id(db, cliente_id)
-        if not db_cliente:
-            raise Exception("El cliente seleccionado no existe.")
-            
-        # 2. Validar que el pedido no este vacio
-        if not menus_pedido:
-            raise Exception("El pedido esta vacio.")
+    if not requerimientos:
+        return
+    necesario = case(requerimientos, value=Ingrediente.id)
+    actualizados = db.execute(
+        update(Ingrediente)
+        .where(Ingrediente.id.in_(list(requerimientos)), Ingrediente.stock >= necesario)
+        .values(stock=Ingrediente.stock - necesario)
+        .returning(Ingrediente.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    faltantes = set(requerimientos) - set(actualizados)
+    if faltantes:
+        # Solo en el caso de error se consulta el ingrediente (para el mensaje)
+        ingrediente_id = min(faltantes)
+        db_ingrediente = ingrediente_crud.obtener_ingrediente_por_id(db, ingrediente_id)
+        if db_ingrediente is None:
+            # Receta (p. ej. en cache) que apunta a un ingrediente ya borrado
+            raise PedidoInvalido(f"Ingrediente ID {ingrediente_id} no existe")
+        raise StockInsuficiente(f"Stock insuficiente: Falta '{db_ingrediente.nombre}' (Tienes {db_ingrediente.stock}, necesitas {requerimientos[ingrediente_id]})")
 
-        lista_menus_obj = [] 
+def verificar_disponibilidad(db: Session, menus_pedido: list):
+    """
+    Revisa (sin modificar nada) si hay stock para un pedido, usando las recetas
+    en cache y una sola consulta de stock.
+    Devuelve una lista de faltantes: (nombre_ingrediente, stock_actual, necesario).
+    """
+    cantidades_por_menu = _agrupar_lineas(menus_pedido)
+    recetas = cache_recetas.obtener_recetas(db, cantidades_por_menu)
+
+    no_existen = [m for m in cantidades_por_menu if m not in recetas]
+    if no_existen:
+        raise PedidoInvalido(f"El menu con ID {no_existen[0]} no existe.")
+
+    requerimientos = _sumar_requerimientos(recetas, cantidades_por_menu)
+    if not requerimientos:
+        return []
+
+    stock_actual = db.query(Ingrediente.id, Ingrediente.nombre, Ingrediente.stock)\
+                     .filter(Ingrediente.id.in_(list(requerimientos)))\
+                     .all()
+    return [
+        (nombre, stock, requerimientos[ing_id])
+        for ing_id, nombre, stock in stock_actual
+        if stock < requerimientos[ing_id]
+    ]
+
+def validar_lineas(menus_pedido: list):
+    """
+    Validación que no necesita la BD (pedido no vacío, cantidades válidas).
+    Devuelve {menu_id: cantidad} o lanza PedidoInvalido.
+    """
+    if not menus_pedido:
+        raise PedidoInvalido("El pedido esta vacio.")
+    return _agrupar_lineas(menus_pedido)
+
+def preparar_pedido(db: Session, cliente_id: int, menus_pedido: list):
+    """
+    Valida el pedido, descuenta stock y deja el Pedido, sus líneas, el resumen
+    de ventas y los movimientos de stock escritos en la transacción actual
+    (con flush, así el pedido ya tiene ID). NO hace commit ni rollback:
+    lo usan crear_pedido (un commit por pedido) y la cola de escritura
+    diferida (un commit por lote). Lanza PedidoInvalido si algo no es válido
+    y StockInsuficiente si no alcanza el stock.
+    """
+    # 1. Validar Cliente
+    db_cliente = cliente_crud.obtener_cliente_por_id(db, cliente_id)
+    if not db_cliente:
+        raise PedidoInvalido("El cliente seleccionado no existe.")
         
-        # 3. Validar Menus
-        for item in menus_pedido:
-            menu_id = item['id']
-            cantidad = item['cantidad']
-            
-            if cantidad <= 0:
-                raise Exception(f"La cantidad para el menu ID {menu_id} debe ser positiva.")
+    # 2-3. Validar que el pedido no este vacio y las cantidades (agrupando líneas repetidas)
+    cantidades_por_menu = validar_lineas(menus_pedido)
 
-            db_menu = menu_crud.leer_menu_por_id(db, menu_id)
-            if not db_menu:
-                raise Exception(f"El menu con ID {menu_id} no existe.")
-            
-            lista_menus_obj.append( (db_menu, cantidad) )
+    # 4. Validar Menus (precio y receta desde el cache)
+    recetas = cache_recetas.obtener_recetas(db, cantidades_por_menu)
 
-        # 4. Calcular Total (usando reduce)
-        total_pedido = reduce(
-            lambda acumulador, item: acumulador + (item[0].precio * item[1]),
-            lista_menus_obj, 
-            0 
-        )
+    lista_menus = [] 
+    for menu_id, cantidad in cantidades_por_menu.items():
+        if menu_id not in recetas:
+            raise PedidoInvalido(f"El menu con ID {menu_id} no existe.")
+        
+        precio, _ = recetas[menu_id]
+        lista_menus.append( (menu_id, precio, cantidad) )
+
+    # 5. Calcular Total (usando reduce)
+    total_pedido = reduce(
+        lambda acumulador, item: acumulador + (item[1] * item[2]),
+        lista_menus, 
+        0 
+    )
 
-        # 5. Validar y Descontar Stock (Paso critico)
-        for db_menu, cantidad_pedida in lista_menus_obj:
-            # Iterar sobre la receta del menu
-            for item_receta in db_menu.items_receta:
-                db_ingrediente = item_receta.ingrediente
-                cantidad_necesaria_total = item_receta.cantidad * cantidad_pedida
-                
-                # Validacion de stock
-                if db_ingrediente.stock < cantidad_necesaria_total:
-                    raise Exception(f"Stock insuficiente: Falta '{db_ingrediente.nombre}' (Tienes {db_ingrediente.stock}, necesitas {cantidad_necesaria_total})")
-                
-                # Descontar el stock
-                db_ingrediente.stock -= cantidad_necesaria_total
-
-        # 6. Crear el Pedido
-        db_pedido = Pedido(
-            cliente=db_cliente,
-            fecha=datetime.now(), # <--- CORREGIDO: Se envia el objeto datetime directo
-            total=total_pedido
+    # 6. Validar y Descontar Stock (Paso critico, atómico en la BD)
+    requerimientos = _sumar_requerimientos(recetas, cantidades_por_menu)
+    _descontar_stock(db, requerimientos)
+
+    # 7. Crear el Pedido
+    db_pedido = Pedido(
+        cliente=db_cliente,
+        fecha=datetime.now(), # <--- CORREGIDO: Se envia el objeto datetime directo
+        total=total_pedido
+    )
+    db.add(db_pedido)
+    
+    # 8. Crear las asociaciones
+    for menu_id, precio, cantidad_pedida in lista_menus:
+        db_pedido_menu = PedidoMenu(
+            pedido=db_pedido, 
+            menu_id=menu_id,     
+            cantidad=cantidad_pedida,
+            precio_unitario=precio,
+            subtotal=precio * cantidad_pedida
         )
-        db.add(db_pedido)
-        
-        # 7. Crear las asociaciones
-        for db_menu, cantidad_pedida in lista_menus_obj:
-            db_pedido_menu = PedidoMenu(
-                pedido=db_pedido, 
-                menu=db_menu,     
-                cantidad=cantidad_pedida
-            )
-            db.add(db_pedido_menu)
+        db.add(db_pedido_menu)
+
+    # 9. Actualizar el resumen de ventas del día y el libro de stock (misma transacción)
+    db.flush() # para tener el ID del pedido
+    ventas_crud.registrar_pedido(db, db_pedido.fecha, total_pedido, cantidades_por_menu)
+    movimientos_crud.registrar_movimientos(
+        db, movimientos_crud.VENTA, {i: -c for i, c in requerimientos.items()},
+        fecha=db_pedido.fecha, pedido_id=db_pedido.id
+    )
+    return db_pedido
+
+def crear_pedido(db: Session, cliente_id: int, menus_pedido: list):
+    """
+    Crea un nuevo pedido, descuenta stock y calcula el total.
+    Precios y recetas salen del cache de recetas (una consulta solo si no
+    están en cache) y el stock se descuenta de forma atómica
+    (UPDATE ... WHERE stock >= necesario), así dos cajas no pueden vender
+    el mismo stock.
+    """
+    
+    try:
+        db_pedido = preparar_pedido(db, cliente_id, menus_pedido)
             
-        # 8. Guardar todo
+        # 10. Guardar todo
         db.commit()
         db.refresh(db_pedido)
         print(f"Pedido ID {db_pedido.id} creado con exito.")
         return db_pedido
         
     except Exception as e:
-        db.rollback() # Revertir todo si falla
+        db.rollback() # Revertir todo si falla (incluye los descuentos de stock)
         print(f"Error al crear pedido: {e}")
         raise e
     
 
 def eliminar_pedido(db: Session, pedido_id: int):
     """
-    Elimina un pedido por su ID.
+    Elimina un pedido por su ID (con sus líneas) y lo resta del resumen de
+    ventas del día, todo en la misma transacción.
     """
     pedido = leer_pedido_por_id(db, pedido_id)
     if not pedido:
         return False
     
     try:
-        # Al borrar el pedido, SQLAlchemy borrará en cascada los items 
-        # (si la relación está bien configurada) o los borrará manualmente.
+        # items_comprados no tiene cascade: las líneas se borran a mano
+        lineas = db.query(PedidoMenu).filter(PedidoMenu.pedido_id == pedido_id).all()
+        unidades_por_menu = {}
+        for linea in lineas:
+            unidades_por_menu[linea.menu_id] = unidades_por_menu.get(linea.menu_id, 0) + linea.cantidad
+            db.delete(linea)
+
+        ventas_crud.anular_pedido(db, pedido.fecha, pedido.total, unidades_por_menu)
         db.delete(pedido)
         db.commit()
         return True
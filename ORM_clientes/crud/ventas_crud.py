@@ -0,0 +1,96 @@
+# Archivo: crud/ventas_crud.py
+#
+# Resumen de ventas por día (ventas_diarias y ventas_diarias_menus).
+# crear_pedido y eliminar_pedido lo actualizan en su misma transacción, así los
+# gráficos leen una fila por día en vez de recorrer todos los pedidos.
+#
+# Reconstruir desde los pedidos existentes (desde ORM_clientes/):
+#   python -m crud.ventas_crud
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, delete, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import Pedido, PedidoMenu, VentaDiaria, VentaDiariaMenu
+from datetime import datetime
+
+# --- Funciones de ACTUALIZACIÓN INCREMENTAL ---
+
+def _acumular(db: Session, dia, pedidos: int, total: float, unidades_por_menu: dict):
+    """
+    Suma (o resta, con valores negativos) un pedido al resumen del día con
+    INSERT ... ON CONFLICT DO UPDATE. Las filas que quedan en cero se borran.
+    """
+    stmt = sqlite_insert(VentaDiaria).values(dia=dia, pedidos=pedidos, total=total)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VentaDiaria.dia],
+        set_={
+            "pedidos": VentaDiaria.pedidos + stmt.excluded.pedidos,
+            "total": VentaDiaria.total + stmt.excluded.total,
+        },
+    )
+    db.execute(stmt)
+
+    if unidades_por_menu:
+        stmt = sqlite_insert(VentaDiariaMenu)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VentaDiariaMenu.dia, VentaDiariaMenu.menu_id],
+            set_={"unidades": VentaDiariaMenu.unidades + stmt.excluded.unidades},
+        )
+        db.execute(stmt, [
+            {"dia": dia, "menu_id": menu_id, "unidades": unidades}
+            for menu_id, unidades in unidades_por_menu.items()
+        ])
+
+    if pedidos < 0:
+        db.execute(delete(VentaDiaria).where(VentaDiaria.dia == dia, VentaDiaria.pedidos <= 0))
+        db.execute(delete(VentaDiariaMenu).where(VentaDiariaMenu.dia == dia, VentaDiariaMenu.unidades <= 0))
+
+
+def registrar_pedido(db: Session, fecha: datetime, total: float, unidades_por_menu: dict):
+    """Suma un pedido nuevo al resumen. No hace commit (lo hace quien llama)."""
+    _acumular(db, fecha.date(), 1, total, unidades_por_menu)
+
+
+def anular_pedido(db: Session, fecha: datetime, total: float, unidades_por_menu: dict):
+    """Resta un pedido eliminado del resumen. No hace commit (lo hace quien llama)."""
+    _acumular(db, fecha.date(), -1, -total, {m: -u for m, u in unidades_por_menu.items()})
+
+
+# --- Función de RECONSTRUCCIÓN ---
+
+def reconstruir_ventas_diarias(db):
+    """
+    Borra el resumen y lo vuelve a calcular desde pedidos y pedido_menus con
+    dos INSERT ... SELECT ... GROUP BY date(fecha). Sirve con una Session o
+    con una Connection (la usa la migración). No hace commit.
+    Devuelve la cantidad de días del resumen.
+    """
+    dia = func.date(Pedido.fecha)
+
+    db.execute(delete(VentaDiariaMenu))
+    db.execute(delete(VentaDiaria))
+
+    db.execute(insert(VentaDiaria).from_select(
+        ["dia", "pedidos", "total"],
+        select(dia, func.count(Pedido.id), func.sum(Pedido.total))
+            .where(Pedido.fecha.is_not(None))
+            .group_by(dia),
+    ))
+    db.execute(insert(VentaDiariaMenu).from_select(
+        ["dia", "menu_id", "unidades"],
+        select(dia, PedidoMenu.menu_id, func.sum(PedidoMenu.cantidad))
+            .join(Pedido, Pedido.id == PedidoMenu.pedido_id)
+            .where(Pedido.fecha.is_not(None))
+            .group_by(dia, PedidoMenu.menu_id),
+    ))
+
+    return db.execute(select(func.count()).select_from(VentaDiaria)).scalar()
+
+
+if __name__ == "__main__":
+    from database import engine, Base, unidad_de_trabajo
+
+    Base.metadata.create_all(bind=engine)
+    with unidad_de_trabajo() as db:
+        dias = reconstruir_ventas_diarias(db)
+    print(f"Resumen de ventas reconstruido: {dias} días.")
@@ -0,0 +1,41 @@
+# Archivo: crud_async/cliente_crud.py
+#
+# Versión asíncrona de crud/cliente_crud.py (AsyncSession + aiosqlite).
+# Cada función ejecuta la función síncrona con AsyncSession.run_sync: las
+# validaciones, mensajes y valores de retorno son exactamente los mismos, y la
+# E/S con la BD no bloquea el event loop.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import cliente_crud
+
+# --- Funciones de CREACIÓN (Create) ---
+
+async def crear_cliente(db: AsyncSession, nombre: str, email: str):
+    return await db.run_sync(cliente_crud.crear_cliente, nombre, email)
+
+
+# --- Funciones de LECTURA (Read) ---
+
+async def obtener_cliente_por_email(db: AsyncSession, email: str):
+    return await db.run_sync(cliente_crud.obtener_cliente_por_email, email)
+
+async def obtener_cliente_por_id(db: AsyncSession, cliente_id: int):
+    return await db.run_sync(cliente_crud.obtener_cliente_por_id, cliente_id)
+
+async def listar_clientes(db: AsyncSession, limite: int = None):
+    return await db.run_sync(cliente_crud.listar_clientes, limite)
+
+async def buscar_clientes(db: AsyncSession, texto: str, limite: int = 20):
+    return await db.run_sync(cliente_crud.buscar_clientes, texto, limite)
+
+
+# --- Funciones de ACTUALIZACIÓN (Update) ---
+
+async def actualizar_cliente(db: AsyncSession, cliente_id: int, nuevo_nombre: str, nuevo_email: str):
+    return await db.run_sync(cliente_crud.actualizar_cliente, cliente_id, nuevo_nombre, nuevo_email)
+
+
+# --- Funciones de ELIMINACIÓN (Delete) ---
+
+async def eliminar_cliente(db: AsyncSession, cliente_id: int):
+    return await db.run_sync(cliente_crud.eliminar_cliente, cliente_id)
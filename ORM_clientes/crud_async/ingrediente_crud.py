@@ -0,0 +1,38 @@
+# Archivo: crud_async/ingrediente_crud.py
+#
+# Versión asíncrona de crud/ingrediente_crud.py (AsyncSession + aiosqlite).
+# Cada función ejecuta la función síncrona con AsyncSession.run_sync: las
+# validaciones, mensajes y valores de retorno son exactamente los mismos, y la
+# E/S con la BD no bloquea el event loop.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import ingrediente_crud, movimientos_crud
+
+# --- Funciones de LECTURA (Read) ---
+
+async def obtener_ingrediente_por_id(db: AsyncSession, ingrediente_id: int):
+    return await db.run_sync(ingrediente_crud.obtener_ingrediente_por_id, ingrediente_id)
+
+async def obtener_ingrediente_por_nombre(db: AsyncSession, nombre: str):
+    return await db.run_sync(ingrediente_crud.obtener_ingrediente_por_nombre, nombre)
+
+async def listar_ingredientes(db: AsyncSession):
+    return await db.run_sync(ingrediente_crud.listar_ingredientes)
+
+
+# --- Funciones de CREACIÓN/UPSERT (Create or Sum Stock) ---
+
+async def crear_ingrediente(db: AsyncSession, nombre: str, stock: float, tipo: str = movimientos_crud.COMPRA):
+    return await db.run_sync(ingrediente_crud.crear_ingrediente, nombre, stock, tipo)
+
+
+# --- Funciones de ACTUALIZACIÓN (Update) ---
+
+async def actualizar_stock_ingrediente(db: AsyncSession, ingrediente_id: int, nuevo_stock: float):
+    return await db.run_sync(ingrediente_crud.actualizar_stock_ingrediente, ingrediente_id, nuevo_stock)
+
+
+# --- Funciones de ELIMINACIÓN (Delete) ---
+
+async def eliminar_ingrediente(db: AsyncSession, ingrediente_id: int):
+    return await db.run_sync(ingrediente_crud.eliminar_ingrediente, ingrediente_id)
@@ -0,0 +1,50 @@
+# Archivo: crud_async/menu_crud.py
+#
+# Versión asíncrona de crud/menu_crud.py (AsyncSession + aiosqlite).
+# Cada función ejecuta la función síncrona con AsyncSession.run_sync: las
+# validaciones, mensajes y valores de retorno son exactamente los mismos, y la
+# E/S con la BD no bloquea el event loop.
+#
+# Los menús devueltos no pueden cargar relaciones (items_receta) fuera de la
+# sesión: en async no hay lazy loads.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud import menu_crud
+
+# --- Funciones de LECTURA (Read) ---
+
+async def leer_menu_por_id(db: AsyncSession, menu_id: int):
+    return await db.run_sync(menu_crud.leer_menu_por_id, menu_id)
+
+async def leer_menu_por_nombre(db: AsyncSession, nombre: str):
+    return await db.run_sync(menu_crud.leer_menu_por_nombre, nombre)
+
+async def leer_todos_los_menus(db: AsyncSession, limite: int = None):
+    return await db.run_sync(menu_crud.leer_todos_los_menus, limite)
+
+async def buscar_menus(db: AsyncSession, texto: str, limite: int = 20):
+    return await db.run_sync(menu_crud.buscar_menus, texto, limite)
+
+
+# --- Funciones de CREACIÓN (Create) ---
+
+async def crear_menu(db: AsyncSession, nombre: str, descripcion: str, precio: float, receta: list = None):
+    return await db.run_sync(menu_crud.crear_menu, nombre, descripcion, precio, receta)
+
+async def crear_menus_masivo(db: AsyncSession, definiciones: list):
+    return await db.run_sync(menu_crud.crear_menus_masivo, definiciones)
+
+async def crear_receta_existente(db: AsyncSession, menu_id: int, receta: list):
+    return await db.run_sync(menu_crud.crear_receta_existente, menu_id, receta)
+
+
+# --- Funciones de ACTUALIZACIÓN (Update) ---
+
+async def actualizar_menu_completo(db: AsyncSession, menu_id: int, nombre: str, descripcion: str, precio: float, nueva_receta: list):
+    return await db.run_sync(menu_crud.actualizar_menu_completo, menu_id, nombre, descripcion, precio, nueva_receta)
+
+
+# --- Funciones de ELIMINACIÓN (Delete) ---
+
+async def eliminar_menu(db: AsyncSession, menu_id: int):
+    return await db.run_sync(menu_crud.eliminar_menu, menu_id)
@@ -0,0 +1,45 @@
+# Archivo: crud_async/pedido_crud.py
+#
+# Versión asíncrona de crud/pedido_crud.py (AsyncSession + aiosqlite).
+# Cada función ejecuta la función síncrona con AsyncSession.run_sync: las
+# validaciones, mensajes y valores de retorno son exactamente los mismos, y la
+# E/S con la BD no bloquea el event loop.
+#
+# Los pedidos devueltos no pueden cargar relaciones fuera de la sesión (en async
+# no hay lazy loads): para mostrar un pedido usar leer_detalle_pedido.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from crud import pedido_crud
+
+# --- Funciones de LECTURA (Read) ---
+
+async def leer_pedido_por_id(db: AsyncSession, pedido_id: int):
+    return await db.run_sync(pedido_crud.leer_pedido_por_id, pedido_id)
+
+async def leer_detalle_pedido(db: AsyncSession, pedido_id: int):
+    return await db.run_sync(pedido_crud.leer_detalle_pedido, pedido_id)
+
+async def leer_pedidos_por_cliente(db: AsyncSession, cliente_id: int):
+    return await db.run_sync(pedido_crud.leer_pedidos_por_cliente, cliente_id)
+
+async def leer_todos_los_pedidos(db: AsyncSession):
+    return await db.run_sync(pedido_crud.leer_todos_los_pedidos)
+
+async def leer_historial_pedidos(db: AsyncSession, limite: int = 100, despues_de: tuple = None, cliente_id: int = None, desde: datetime = None, hasta: datetime = None, total_minimo: float = None):
+    return await db.run_sync(pedido_crud.leer_historial_pedidos, limite, despues_de=despues_de, cliente_id=cliente_id, desde=desde, hasta=hasta, total_minimo=total_minimo)
+
+
+# --- Funciones de CREACIÓN (Create) ---
+
+async def verificar_disponibilidad(db: AsyncSession, menus_pedido: list):
+    return await db.run_sync(pedido_crud.verificar_disponibilidad, menus_pedido)
+
+async def crear_pedido(db: AsyncSession, cliente_id: int, menus_pedido: list):
+    return await db.run_sync(pedido_crud.crear_pedido, cliente_id, menus_pedido)
+
+
+# --- Funciones de ELIMINACIÓN (Delete) ---
+
+async def eliminar_pedido(db: AsyncSession, pedido_id: int):
+    return await db.run_sync(pedido_crud.eliminar_pedido, pedido_id)
@@ -1,6 +1,8 @@
-import os 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base   
+import os
+import configparser
+from contextlib import contextmanager, asynccontextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
 
 #creamos el nombre del archivo de la bd
@@ -12,30 +14,219 @@ ruta_base_datos = os.path.abspath(os.path.dirname(__file__))
 #creamos la url de conexion para sqlite
 database_url = f"sqlite:///{os.path.join(ruta_base_datos, database_archivo)}"
 
+#archivo de configuracion opcional (seccion [database]: perfil, url, echo)
+config_archivo = os.environ.get("RESTAURANTE_DB_CONFIG", os.path.join(ruta_base_datos, "database.ini"))
+
+#----------------------------------
+# Perfiles del motor
+#----------------------------------
+
+# dev: como siempre, con echo para ver las consultas que se ejecutan
+# prod: sin echo, WAL y pragmas de rendimiento en cada conexion
+# pool_size / max_overflow: cada sesion activa (y por lo tanto cada hilo) toma
+# su propia conexion del pool; nunca se comparte una conexion entre hilos.
+PERFILES = {
+    "dev": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pragmas": {},
+    },
+    "prod": {
+        "echo": False,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,       # ms esperando el lock de escritura
+            "cache_size": -64000,       # negativo = KiB (~64 MB)
+            "mmap_size": 268435456,     # 256 MB
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        },
+    },
+}
+
+PERFIL_POR_DEFECTO = "dev"
+
+
+def leer_configuracion():
+    """
+    Lee la configuracion del motor. Prioridad (de menor a mayor):
+    perfil por defecto -> archivo database.ini -> variables de entorno
+    (RESTAURANTE_DB_PERFIL, RESTAURANTE_DB_URL, RESTAURANTE_DB_ECHO).
+    """
+    config = {"perfil": PERFIL_POR_DEFECTO, "url": database_url, "echo": None}
+
+    if os.path.exists(config_archivo):
+        parser = configparser.ConfigParser()
+        parser.read(config_archivo, encoding="utf-8")
+        if parser.has_section("database"):
+            seccion = parser["database"]
+            config["perfil"] = seccion.get("perfil", config["perfil"])
+            config["url"] = seccion.get("url", config["url"])
+            if "echo" in seccion:
+                config["echo"] = seccion.getboolean("echo")
+
+    config["perfil"] = os.environ.get("RESTAURANTE_DB_PERFIL", config["perfil"])
+    config["url"] = os.environ.get("RESTAURANTE_DB_URL", config["url"])
+    if "RESTAURANTE_DB_ECHO" in os.environ:
+        config["echo"] = os.environ["RESTAURANTE_DB_ECHO"].strip().lower() in ("1", "true", "si", "yes", "on")
+
+    return config
+
+
+def aplicar_pragmas(engine, pragmas: dict):
+    """Registra un evento 'connect' que ejecuta los PRAGMA en cada conexion nueva."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre}={valor}")
+        cursor.close()
+
+
+def es_memoria(url: str):
+    """True si la url apunta a una BD SQLite en memoria."""
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _opciones_motor(perfil: str = None, url: str = None, echo: bool = None):
+    """Resuelve (url, argumentos de create_engine, pragmas) para un perfil."""
+    config = leer_configuracion()
+    perfil = perfil or config["perfil"]
+    url = url or config["url"]
+
+    if perfil not in PERFILES:
+        raise ValueError(f"Perfil de BD desconocido: '{perfil}'. Opciones: {', '.join(PERFILES)}")
+
+    opciones = PERFILES[perfil]
+    if echo is None:
+        echo = config["echo"] if config["echo"] is not None else opciones["echo"]
+
+    argumentos = {
+        "echo": echo,
+        # la conexion se crea en un hilo y el pool la puede entregar a otro,
+        # pero nunca la usan dos hilos a la vez
+        "connect_args": {"check_same_thread": False}, #para sqlite
+    }
+    if es_memoria(url):
+        # una BD en memoria solo existe dentro de su conexion: se comparte una sola
+        argumentos["poolclass"] = StaticPool
+    else:
+        argumentos["pool_size"] = opciones["pool_size"]
+        argumentos["max_overflow"] = opciones["max_overflow"]
+
+    return url, argumentos, opciones["pragmas"]
+
+
+def crear_motor(perfil: str = None, url: str = None, echo: bool = None):
+    """
+    Fabrica del motor de BD segun un perfil ('dev' o 'prod').
+    Los argumentos que no se pasan se toman de leer_configuracion().
+    """
+    url, argumentos, pragmas = _opciones_motor(perfil, url, echo)
+    motor = create_engine(url, **argumentos)
+    aplicar_pragmas(motor, pragmas)
+    return motor
+
+#----------------------------------
+# Motor asincrono (AsyncSession + aiosqlite)
+# Para procesos sin GUI que atienden muchas cajas desde un solo event loop.
+# Se importa al usarlo: la GUI no necesita aiosqlite.
+#----------------------------------
+
+def url_async(url: str):
+    """sqlite:///ruta.db -> sqlite+aiosqlite:///ruta.db"""
+    if url.startswith("sqlite+aiosqlite"):
+        return url
+    return url.replace("sqlite", "sqlite+aiosqlite", 1)
+
+
+def crear_motor_async(perfil: str = None, url: str = None, echo: bool = None):
+    """Igual que crear_motor, pero devuelve un AsyncEngine con el driver aiosqlite."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url, argumentos, pragmas = _opciones_motor(perfil, url, echo)
+    motor = create_async_engine(url_async(url), **argumentos)
+    # los eventos de conexion se registran en el motor sincrono interno
+    aplicar_pragmas(motor.sync_engine, pragmas)
+    return motor
+
+
+def crear_fabrica_async(motor):
+    """Fabrica de AsyncSession (sin expirar objetos en el commit, como unidad_de_trabajo)."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(bind=motor, autoflush=False, expire_on_commit=False)
+
 #----------------------------------
 
 #creamos el motor de la base de datos
-engine = create_engine(
-    database_url,
-    echo=True,  #para ver las consultas que se ejecutan
-    connect_args={"check_same_thread": False}, #para sqlite
-    poolclass=StaticPool
-    )
+engine = crear_motor()
 
 #creamos la sesion
 SessionLocal = sessionmaker(
     bind=engine, #para enlazar el motor
-    autocommit=False, 
+    autocommit=False,
     autoflush=False, #para que no se guarden los cambios automaticamente
 )
 
 #creamos la base de modelos
 Base =declarative_base()
-    
+
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@contextmanager
+def unidad_de_trabajo(fabrica=None):
+    """
+    Unidad de trabajo: abre una sesion nueva, hace commit si el bloque
+    termina bien, rollback si lanza una excepcion, y siempre la cierra.
+    Cada llamada usa su propia sesion (y conexion), asi que se puede usar
+    desde cualquier hilo o ThreadPoolExecutor.
+    Los objetos no se expiran en el commit: siguen legibles despues del bloque
+    (p. ej. los menus que la GUI guarda en menu_map).
+
+        with unidad_de_trabajo() as db:
+            ccrud.crear_cliente(db, "Ana", "ana@gmail.com")
+    """
+    db = (fabrica or SessionLocal)(expire_on_commit=False)
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def unidad_de_trabajo_async(fabrica):
+    """
+    Version asincrona de unidad_de_trabajo: commit si el bloque termina bien,
+    rollback si lanza una excepcion, y siempre cierra la sesion.
+
+        async with unidad_de_trabajo_async(fabrica) as db:
+            await apcrud.crear_pedido(db, cliente_id, lineas)
+    """
+    db = fabrica()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
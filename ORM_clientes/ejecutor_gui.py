@@ -0,0 +1,183 @@
+# Archivo: ejecutor_gui.py
+#
+# Trabajo de BD fuera del hilo de Tk.
+#
+# Los handlers de la GUI envían la parte de BD (consultas, commits, armar un
+# gráfico) a un pool de hilos y el resultado vuelve al hilo de Tk por una cola
+# que se revisa con after(). Tk nunca se toca desde un hilo de trabajo.
+#
+#     self.ejecutor = EjecutorTk(self, al_cambiar_ocupado=self.mostrar_ocupado)
+#     self.ejecutor.enviar(leer_clientes, clave="clientes", al_terminar=self.pintar_clientes)
+#
+# - clave: los trabajos con la misma clave se reemplazan. Si llega uno nuevo
+#   antes de que termine el anterior, el resultado viejo se descarta (y si el
+#   viejo todavía no empezó, ni siquiera corre). Para lecturas.
+# - sin clave: el trabajo corre y su resultado se entrega siempre. Para
+#   escrituras (crear, eliminar, finalizar un pedido).
+# - nombre: con qué nombre queda el tiempo del hilo en latencias.registro
+#   ("<nombre> [hilo]"). Por defecto la clave; las escrituras, que no tienen,
+#   pasan el nombre de su acción (si no, todas quedarían como "guardar").
+# - enviar_diferido: igual que con clave, pero espera unos ms sin envíos
+#   nuevos con esa clave antes de mandarlo (búsqueda mientras se escribe:
+#   solo va a la BD la última tecla de una ráfaga).
+#
+# Los trabajos no tocan widgets: devuelven datos (tuplas, dicts u objetos ya
+# cargados, con expire_on_commit=False) y el callback los pinta.
+
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from latencias import ejecutar_medido
+
+
+class EjecutorTk:
+    """
+    Pool de hilos + cola de resultados revisada desde el hilo de Tk.
+    intervalo_ms: cada cuánto se revisa la cola mientras hay trabajos pendientes.
+    presupuesto_ms: tiempo máximo de callbacks por revisión (lo que sobra queda
+    para la siguiente), para no bloquear la ventana más de un cuadro.
+    al_cambiar_ocupado(bool): se llama al pasar de 0 a 1 trabajo pendiente y al volver a 0.
+    """
+
+    def __init__(self, raiz, max_hilos: int = 4, intervalo_ms: int = 16, presupuesto_ms: float = 8,
+                 al_cambiar_ocupado=None):
+        self.raiz = raiz
+        self.intervalo_ms = intervalo_ms
+        self.presupuesto = presupuesto_ms / 1000
+        self.al_cambiar_ocupado = al_cambiar_ocupado
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="gui-bd")
+        self._resultados = queue.SimpleQueue()
+        self._candado = threading.Lock()
+        self._generaciones = {}     # clave -> generación del último trabajo enviado
+        self._pendientes = 0        # solo se toca desde el hilo de Tk
+        self._id_revision = None
+        self._diferidos = {}        # clave -> id de after() del envío diferido
+        self._cerrado = False
+
+    # --- Envío (hilo de Tk) ---
+
+    def enviar(self, trabajo, *args, clave: str = None, nombre: str = None, al_terminar=None, al_fallar=None, **kwargs):
+        """
+        Corre trabajo(*args, **kwargs) en un hilo del pool. al_terminar(resultado)
+        o al_fallar(excepción) corren después en el hilo de Tk. Devuelve el Future.
+        nombre: métrica del trabajo (por defecto la clave o el nombre de la función).
+        """
+        if self._cerrado:
+            raise RuntimeError("El ejecutor ya está cerrado.")
+        generacion = self._nueva_generacion(clave) if clave else None
+        self._pendientes += 1
+        if self._pendientes == 1:
+            self._avisar_ocupado(True)
+        nombre = nombre or clave or getattr(trabajo, "__name__", "trabajo")
+        futuro = self._pool.submit(self._correr, trabajo, args, kwargs, clave, nombre, generacion, al_terminar, al_fallar)
+        if self._id_revision is None:
+            self._id_revision = self.raiz.after(self.intervalo_ms, self._revisar)
+        return futuro
+
+    def enviar_diferido(self, retardo_ms: int, trabajo, *args, clave: str, nombre: str = None, al_terminar=None, al_fallar=None,
+                        **kwargs):
+        """
+        Envía trabajo(*args, **kwargs) con `clave` cuando pasan `retardo_ms` sin
+        otro envío con la misma clave. Con retardo 0 se envía ya (y se descarta
+        el diferido pendiente).
+        """
+        anterior = self._diferidos.pop(clave, None)
+        if anterior is not None:
+            self.raiz.after_cancel(anterior)
+
+        def disparar():
+            self._diferidos.pop(clave, None)
+            if not self._cerrado:
+                self.enviar(trabajo, *args, clave=clave, nombre=nombre, al_terminar=al_terminar, al_fallar=al_fallar, **kwargs)
+
+        if retardo_ms <= 0:
+            disparar()
+        else:
+            self._diferidos[clave] = self.raiz.after(retardo_ms, disparar)
+
+    def cancelar(self, clave: str):
+        """Descarta el resultado del trabajo en curso con esa clave (si lo hay)."""
+        self._nueva_generacion(clave)
+
+    def ocupado(self):
+        return self._pendientes > 0
+
+    def cerrar(self):
+        """
+        Descarta las lecturas pendientes y espera a que terminen las que ya
+        corren y las escrituras (para no perder un commit al cerrar la ventana).
+        """
+        self._cerrado = True
+        for id_after in self._diferidos.values():
+            self.raiz.after_cancel(id_after)
+        self._diferidos.clear()
+        with self._candado:
+            for clave in self._generaciones:
+                self._generaciones[clave] += 1
+        if self._id_revision is not None:
+            self.raiz.after_cancel(self._id_revision)
+            self._id_revision = None
+        self._pool.shutdown(wait=True)
+
+    # --- Hilo de trabajo ---
+
+    def _nueva_generacion(self, clave: str):
+        with self._candado:
+            generacion = self._generaciones.get(clave, 0) + 1
+            self._generaciones[clave] = generacion
+            return generacion
+
+    def _vigente(self, clave: str, generacion: int):
+        if clave is None:
+            return True
+        with self._candado:
+            return self._generaciones.get(clave) == generacion
+
+    def _correr(self, trabajo, args, kwargs, clave, nombre, generacion, al_terminar, al_fallar):
+        if not self._vigente(clave, generacion):
+            # Ya hay uno más nuevo con la misma clave: no vale la pena ir a la BD
+            self._resultados.put((clave, generacion, None, None, None, None))
+            return
+        # Mismo registro (y perfil de las lentas) que @medir_accion, pero del hilo de trabajo
+        try:
+            resultado = ejecutar_medido(f"{nombre} [hilo]", trabajo, args, kwargs)
+            self._resultados.put((clave, generacion, True, resultado, al_terminar, al_fallar))
+        except Exception as e:
+            self._resultados.put((clave, generacion, False, e, al_terminar, al_fallar))
+
+    # --- Entrega (hilo de Tk) ---
+
+    def _revisar(self):
+        self._id_revision = None
+        limite = time.perf_counter() + self.presupuesto
+        while time.perf_counter() < limite:
+            try:
+                clave, generacion, ok, valor, al_terminar, al_fallar = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendientes -= 1
+            if ok is None or not self._vigente(clave, generacion):
+                continue
+            try:
+                if ok:
+                    if al_terminar:
+                        al_terminar(valor)
+                elif al_fallar:
+                    al_fallar(valor)
+                else:
+                    raise valor
+            except Exception:
+                self.raiz.report_callback_exception(*sys.exc_info())
+
+        if self._pendientes == 0:
+            self._avisar_ocupado(False)
+        elif not self._cerrado and self._id_revision is None:
+            # (un callback que envió otro trabajo ya pudo programar la revisión)
+            self._id_revision = self.raiz.after(self.intervalo_ms, self._revisar)
+
+    def _avisar_ocupado(self, ocupado: bool):
+        if self.al_cambiar_ocupado:
+            self.al_cambiar_ocupado(ocupado)
@@ -1,61 +1,87 @@
 # Archivo: graficos.py
 
-import matplotlib.pyplot as plt
+import matplotlib.style
+from matplotlib.figure import Figure
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from models import Pedido, PedidoMenu, Menu, MenuIngrediente, Ingrediente
-from datetime import datetime
+from models import Pedido, PedidoMenu, Menu, MenuIngrediente, Ingrediente, VentaDiaria, VentaDiariaMenu
+from datetime import datetime, time
 
 # Configuración para que los gráficos se vean bien en fondo oscuro
-plt.style.use('dark_background')
-
-# --- Función Auxiliar para Ventas (CORREGIDA) ---
-def obtener_datos_ventas(db: Session, periodo: str):
+matplotlib.style.use('dark_background')
+
+# Las figuras se crean con Figure (sin pyplot): no dependen del backend ni del
+# hilo de Tk, así que se pueden armar en un hilo de trabajo. Solo el
+# FigureCanvasTkAgg que las muestra se crea en el hilo de la GUI.
+def _nueva_figura():
+    fig = Figure(figsize=(6, 4), dpi=100)
+    return fig, fig.subplots()
+
+# --- Función Auxiliar para Ventas (desde el resumen ventas_diarias) ---
+
+# Formato strftime de SQLite para cada periodo (la "key" del gráfico)
+FORMATOS_PERIODO = {
+    'day': '%Y-%m-%d',   # Diario (default)
+    'month': '%Y-%m',    # Año-Mes
+    'year': '%Y',        # Año
+}
+
+def _formato_periodo(periodo: str):
+    if periodo == 'mensual' or periodo == 'month':
+        return FORMATOS_PERIODO['month']
+    elif periodo == 'anual' or periodo == 'year':
+        return FORMATOS_PERIODO['year']
+    return FORMATOS_PERIODO['day']
+
+def _es_dia_completo(valor):
+    """True si el límite cae al empezar un día: None, un date, o un datetime a medianoche."""
+    return not isinstance(valor, datetime) or valor.time() == time.min
+
+def _a_dia(valor):
+    """datetime a medianoche -> date (el resumen de ventas tiene granularidad de un día)."""
+    return valor.date() if isinstance(valor, datetime) else valor
+
+def _a_fecha_hora(valor):
+    """date -> datetime a medianoche (para comparar con Pedido.fecha)."""
+    return valor if isinstance(valor, datetime) or valor is None else datetime.combine(valor, time.min)
+
+def obtener_datos_ventas(db: Session, periodo: str, desde: datetime = None, hasta: datetime = None):
     """
-    Agrupa las ventas por fecha (diaria, mensual, anual).
+    Agrupa las ventas por fecha (diaria, mensual, anual) con GROUP BY strftime(...).
+    Filtros opcionales: desde <= fecha < hasta.
+    Si los límites son días completos (date o datetime a medianoche) se lee
+    el resumen ventas_diarias (una fila por día, no una por pedido). Si alguno
+    cae a mitad de un día el resumen no alcanza: se suman los pedidos de la
+    tabla pedidos con el límite exacto (índice de pedidos.fecha).
     Retorna dos listas: etiquetas (fechas) y valores (total $).
     """
-    pedidos = db.query(Pedido).all()
-    
-    datos = {}
-    for p in pedidos:
-        if not p.fecha: continue 
-        
-        # CORRECCIÓN: Manejamos la fecha como Objeto o como String
-        # para evitar el error 'not subscriptable'.
-        fecha_obj = p.fecha
-        
-        # Si por alguna razón llega como string, lo convertimos a objeto
-        if isinstance(fecha_obj, str):
-            try:
-                # Intentamos parsear formatos comunes
-                if len(fecha_obj) > 10:
-                    fecha_obj = datetime.strptime(fecha_obj, "%Y-%m-%d %H:%M:%S")
-                else:
-                    fecha_obj = datetime.strptime(fecha_obj, "%Y-%m-%d")
-            except:
-                continue # Si falla, saltamos este pedido
-
-        # Ahora generamos la "key" (la etiqueta del gráfico) usando strftime
-        if periodo == 'mensual' or periodo == 'month':
-            key = fecha_obj.strftime('%Y-%m') # Año-Mes
-        elif periodo == 'anual' or periodo == 'year':
-            key = fecha_obj.strftime('%Y')    # Año
-        else:
-            key = fecha_obj.strftime('%Y-%m-%d') # Diario (default)
-
-        datos[key] = datos.get(key, 0) + p.total
-
-    # Ordenar por fecha
-    fechas_ordenadas = sorted(datos.keys())
-    totales = [datos[k] for k in fechas_ordenadas]
+    if _es_dia_completo(desde) and _es_dia_completo(hasta):
+        columna_fecha, columna_total = VentaDiaria.dia, VentaDiaria.total
+        desde, hasta = _a_dia(desde), _a_dia(hasta)
+    else:
+        columna_fecha, columna_total = Pedido.fecha, Pedido.total
+        desde, hasta = _a_fecha_hora(desde), _a_fecha_hora(hasta)
+
+    bucket = func.strftime(_formato_periodo(periodo), columna_fecha)
+
+    consulta = db.query(bucket, func.sum(columna_total))
+    if desde is not None:
+        consulta = consulta.filter(columna_fecha >= desde)
+    if hasta is not None:
+        consulta = consulta.filter(columna_fecha < hasta)
+
+    filas = consulta.group_by(bucket).order_by(bucket).all()
+
+    # Ordenado por fecha (lo hace la BD); descartamos fechas ilegibles (NULL)
+    fechas_ordenadas = [f for f, _ in filas if f is not None]
+    totales = [t for f, t in filas if f is not None]
     
     return fechas_ordenadas, totales
 
 # --- 1. Gráfico de Ventas (Barras) ---
 # En graficos.py
 
-def generar_grafico_ventas(db: Session, tipo: str):
+def generar_grafico_ventas(db: Session, tipo: str, desde: datetime = None, hasta: datetime = None):
     # Mapeamos los nombres del combo box a los internos
     tipo_interno = "day"
     titulo_bonito = "Diarias" # Default
@@ -70,11 +96,11 @@ def generar_grafico_ventas(db: Session, tipo: str):
         tipo_interno = "day"
         titulo_bonito = "Diarias"
 
-    x, y = obtener_datos_ventas(db, tipo_interno)
+    x, y = obtener_datos_ventas(db, tipo_interno, desde, hasta)
     
     if not x: return None 
 
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+    fig, ax = _nueva_figura()
     ax.bar(x, y, color='#1f77b4') 
     
     # Usamos el título bonito en español
@@ -82,15 +108,16 @@ def generar_grafico_ventas(db: Session, tipo: str):
     ax.set_ylabel("Total ($)")
     ax.set_xlabel("Fecha")
     
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
     
     return fig
 
 # --- 2. Gráfico de Menús (Torta/Pie) ---
 def generar_grafico_menus(db: Session):
-    resultados = db.query(Menu.nombre, func.sum(PedidoMenu.cantidad))\
-                   .join(PedidoMenu, Menu.id == PedidoMenu.menu_id)\
+    # Unidades por menú desde el resumen diario (días x menús, no líneas de pedido)
+    resultados = db.query(Menu.nombre, func.sum(VentaDiariaMenu.unidades))\
+                   .join(VentaDiariaMenu, Menu.id == VentaDiariaMenu.menu_id)\
                    .group_by(Menu.nombre).all()
 
     if not resultados: return None
@@ -98,38 +125,84 @@ def generar_grafico_menus(db: Session):
     nombres = [r[0] for r in resultados]
     cantidades = [r[1] for r in resultados]
 
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+    fig, ax = _nueva_figura()
     ax.pie(cantidades, labels=nombres, autopct='%1.1f%%', startangle=140)
     ax.set_title("Distribución de Menús Vendidos")
-    plt.tight_layout()
+    fig.tight_layout()
+    return fig
+
+# --- Función Auxiliar para Ingresos por Menú (una sola tabla) ---
+def obtener_ingresos_por_menu(db: Session):
+    """
+    Ingresos por menú con el subtotal guardado en cada línea:
+    SUM(pedido_menus.subtotal) GROUP BY menu_id, sin JOIN a menus ni pedidos.
+    Retorna una lista de tuplas (nombre_menu, ingresos), de mayor a menor.
+    """
+    ingresos = db.query(PedidoMenu.menu_id, func.sum(PedidoMenu.subtotal))\
+                 .group_by(PedidoMenu.menu_id)\
+                 .all()
+    if not ingresos:
+        return []
+
+    # Solo los nombres de los menús que aparecen (una consulta por clave primaria)
+    nombres = dict(db.query(Menu.id, Menu.nombre).filter(Menu.id.in_([m for m, _ in ingresos])).all())
+    resultado = [(nombres.get(menu_id, "Menú borrado"), total) for menu_id, total in ingresos]
+    return sorted(resultado, key=lambda fila: fila[1], reverse=True)
+
+# --- 2b. Gráfico de Ingresos por Menú (Barras Horizontales) ---
+def generar_grafico_ingresos_menus(db: Session):
+    ingresos = obtener_ingresos_por_menu(db)
+
+    if not ingresos: return None
+
+    nombres = [r[0] for r in ingresos]
+    totales = [r[1] for r in ingresos]
+
+    fig, ax = _nueva_figura()
+    ax.barh(nombres, totales, color='#ff7f0e')
+    ax.invert_yaxis()
+    ax.set_title("Ingresos por Menú")
+    ax.set_xlabel("Total ($)")
+    fig.tight_layout()
     return fig
 
+# --- Función Auxiliar para Consumo de Ingredientes (Un solo JOIN) ---
+def obtener_consumo_ingredientes(db: Session, desde: datetime = None, hasta: datetime = None):
+    """
+    Calcula cuánto se ha consumido de cada ingrediente en una sola consulta:
+    SUM(pedido_menus.cantidad * menu_ingredientes.cantidad) GROUP BY ingrediente.
+    Filtros opcionales por fecha del pedido: desde <= fecha < hasta.
+    Retorna una lista de tuplas (nombre_ingrediente, cantidad_consumida).
+    """
+    consumo = func.sum(PedidoMenu.cantidad * MenuIngrediente.cantidad)
+
+    consulta = db.query(Ingrediente.nombre, consumo)\
+                 .join(MenuIngrediente, MenuIngrediente.ingrediente_id == Ingrediente.id)\
+                 .join(PedidoMenu, PedidoMenu.menu_id == MenuIngrediente.menu_id)
+
+    if desde is not None or hasta is not None:
+        consulta = consulta.join(Pedido, Pedido.id == PedidoMenu.pedido_id)
+        if desde is not None:
+            consulta = consulta.filter(Pedido.fecha >= desde)
+        if hasta is not None:
+            consulta = consulta.filter(Pedido.fecha < hasta)
+
+    return consulta.group_by(Ingrediente.id, Ingrediente.nombre)\
+                   .order_by(Ingrediente.nombre)\
+                   .all()
+
 # --- 3. Gráfico de Ingredientes (Barras Horizontales) ---
-def generar_grafico_ingredientes(db: Session):
-    pedidos_items = db.query(PedidoMenu).all()
-    uso_ingredientes = {}
-
-    if not pedidos_items: return None
-
-    for item in pedidos_items:
-        menu = item.menu
-        cantidad_comprada = item.cantidad
-        
-        if not menu: continue
-        
-        for receta in menu.items_receta:
-            nombre_ing = receta.ingrediente.nombre
-            cantidad_usada = receta.cantidad * cantidad_comprada
-            uso_ingredientes[nombre_ing] = uso_ingredientes.get(nombre_ing, 0) + cantidad_usada
+def generar_grafico_ingredientes(db: Session, desde: datetime = None, hasta: datetime = None):
+    uso_ingredientes = obtener_consumo_ingredientes(db, desde, hasta)
 
     if not uso_ingredientes: return None
 
-    nombres = list(uso_ingredientes.keys())
-    totales = list(uso_ingredientes.values())
+    nombres = [r[0] for r in uso_ingredientes]
+    totales = [r[1] for r in uso_ingredientes]
 
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+    fig, ax = _nueva_figura()
     ax.barh(nombres, totales, color='#2ca02c') 
     ax.set_title("Uso Total de Ingredientes")
     ax.set_xlabel("Cantidad Consumida (Unidades/Kg)")
-    plt.tight_layout()
+    fig.tight_layout()
     return fig 
\ No newline at end of file
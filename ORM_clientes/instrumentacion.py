@@ -0,0 +1,236 @@
+# Archivo: instrumentacion.py
+#
+# Instrumentación de SQL por ámbito con nombre.
+#
+# Engancha before_cursor_execute / after_cursor_execute del motor y atribuye
+# cada sentencia (cantidad y tiempo) a los ámbitos abiertos con medir() en el
+# hilo que la ejecuta. Un ámbito anidado también cuenta en los de afuera.
+#
+# Detecta posibles N+1: la misma sentencia (solo cambian los parámetros, o la
+# cantidad de valores de un IN) repetida UMBRAL_N_MAS_1 veces o más dentro de
+# UNA ejecución del ámbito; típico de un lazy load dentro de un for.
+#
+#     instrumentacion.instrumentar(engine)          # una vez, al iniciar
+#     with medir("finalizar_pedido"):
+#         pcrud.crear_pedido(db, cliente_id, lineas)
+#     instrumentacion.imprimir_reporte()
+#
+# Modo prueba (benchmarks/presupuesto_consultas.py):
+#     with presupuesto_consultas("crear_pedido", maximo=15):
+#         pcrud.crear_pedido(db, cliente_id, lineas)  # PresupuestoExcedido si se pasa
+#
+# Con un AsyncEngine se instrumenta su motor sincrono: instrumentar(motor.sync_engine).
+# Las sentencias del hilo escritor de ColaPedidos cuentan en sus propios ámbitos.
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+
+UMBRAL_N_MAS_1 = 5
+
+_candado = threading.Lock()
+_local = threading.local()
+_estadisticas = {}   # nombre del ámbito -> EstadisticasAmbito
+
+_VALORES_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_sql(sql: str):
+    """Quita lo que cambia entre ejecuciones de la 'misma' consulta: espacios y el largo de los IN (?, ?, ...)."""
+    return _VALORES_IN.sub("(?...)", _ESPACIOS.sub(" ", sql).strip())
+
+
+# --- Mediciones ---
+
+class Medicion:
+    """Sentencias de UNA ejecución de un ámbito."""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.sentencias = {}   # sql normalizada -> [veces, tiempo]
+
+    def registrar(self, sql: str, duracion: float):
+        self.consultas += 1
+        self.tiempo += duracion
+        datos = self.sentencias.setdefault(sql, [0, 0.0])
+        datos[0] += 1
+        datos[1] += duracion
+
+    def repetidas(self, minimo: int = None):
+        """[(sql, veces)] de las sentencias que se repiten `minimo` veces o más (posibles N+1)."""
+        minimo = minimo or UMBRAL_N_MAS_1
+        return sorted(((sql, veces) for sql, (veces, _) in self.sentencias.items() if veces >= minimo),
+                      key=lambda fila: fila[1], reverse=True)
+
+
+class EstadisticasAmbito:
+    """Acumulado de todas las ejecuciones de un ámbito."""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.ejecuciones = 0
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.maximo_consultas = 0
+        self.sentencias = {}   # sql -> [veces, tiempo]
+        self.n_mas_1 = {}      # sql -> máximo de repeticiones en una ejecución
+
+    def agregar(self, medicion: Medicion):
+        self.ejecuciones += 1
+        self.consultas += medicion.consultas
+        self.tiempo += medicion.tiempo
+        self.maximo_consultas = max(self.maximo_consultas, medicion.consultas)
+        for sql, (veces, tiempo) in medicion.sentencias.items():
+            datos = self.sentencias.setdefault(sql, [0, 0.0])
+            datos[0] += veces
+            datos[1] += tiempo
+        for sql, veces in medicion.repetidas():
+            self.n_mas_1[sql] = max(self.n_mas_1.get(sql, 0), veces)
+
+
+def _pila():
+    if not hasattr(_local, "pila"):
+        _local.pila = []
+    return _local.pila
+
+
+# --- Eventos del motor ---
+
+def _antes_de_ejecutar(conn, cursor, sql, parametros, contexto, executemany):
+    if getattr(_local, "pila", None):
+        conn.info.setdefault("instrumentacion_inicios", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, sql, parametros, contexto, executemany):
+    pila = getattr(_local, "pila", None)
+    inicios = conn.info.get("instrumentacion_inicios")
+    if not pila or not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    sql = normalizar_sql(sql)
+    for medicion in pila:
+        medicion.registrar(sql, duracion)
+
+
+def _error_al_ejecutar(contexto):
+    # Si la sentencia falla no hay after_cursor_execute: se descarta su inicio
+    inicios = contexto.connection.info.get("instrumentacion_inicios") if contexto.connection is not None else None
+    if inicios:
+        inicios.pop()
+
+
+def instrumentar(engine=None):
+    """Engancha los eventos en el motor (por defecto el de database.py). Se puede llamar más de una vez."""
+    if engine is None:
+        from database import engine
+    if not event.contains(engine, "before_cursor_execute", _antes_de_ejecutar):
+        event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+        event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+        event.listen(engine, "handle_error", _error_al_ejecutar)
+    return engine
+
+
+def desinstrumentar(engine=None):
+    if engine is None:
+        from database import engine
+    if event.contains(engine, "before_cursor_execute", _antes_de_ejecutar):
+        event.remove(engine, "before_cursor_execute", _antes_de_ejecutar)
+        event.remove(engine, "after_cursor_execute", _despues_de_ejecutar)
+        event.remove(engine, "handle_error", _error_al_ejecutar)
+
+
+# --- Ámbitos ---
+
+@contextmanager
+def medir(nombre: str, avisar_n_mas_1: bool = True):
+    """
+    Abre un ámbito con nombre. Entrega la Medicion de esta ejecución; al salir
+    la suma a las estadísticas del ámbito y avisa (print) si hubo posibles N+1.
+    Sin instrumentar() el ámbito no registra nada (y casi no cuesta).
+    """
+    medicion = Medicion(nombre)
+    pila = _pila()
+    pila.append(medicion)
+    try:
+        yield medicion
+    finally:
+        pila.pop()
+        with _candado:
+            _estadisticas.setdefault(nombre, EstadisticasAmbito(nombre)).agregar(medicion)
+        if avisar_n_mas_1:
+            for sql, veces in medicion.repetidas():
+                print(f"Posible N+1 en '{nombre}': {veces} veces -> {sql[:200]}")
+
+
+class PresupuestoExcedido(AssertionError):
+    pass
+
+
+@contextmanager
+def presupuesto_consultas(nombre: str, maximo: int, permitir_repetidas: bool = False):
+    """
+    Como medir(), pero al salir lanza PresupuestoExcedido si el bloque hizo más
+    de `maximo` consultas o (salvo permitir_repetidas) si hubo posibles N+1.
+    Necesita el motor instrumentado.
+    """
+    with medir(nombre, avisar_n_mas_1=False) as medicion:
+        yield medicion
+
+    problemas = []
+    if medicion.consultas > maximo:
+        problemas.append(f"{medicion.consultas} consultas (máximo {maximo})")
+    if not permitir_repetidas:
+        problemas.extend(f"posible N+1, {veces} veces: {sql[:200]}" for sql, veces in medicion.repetidas())
+    if problemas:
+        detalle = "\n".join(f"    {veces:4d}x {sql[:160]}" for sql, (veces, _) in
+                            sorted(medicion.sentencias.items(), key=lambda fila: fila[1][0], reverse=True))
+        raise PresupuestoExcedido(f"'{nombre}': " + "; ".join(problemas) + f"\n{detalle}")
+
+
+# --- Reporte ---
+
+def reiniciar():
+    with _candado:
+        _estadisticas.clear()
+
+
+def reporte(top: int = 5):
+    """Una fila (dict) por ámbito, de mayor a menor tiempo total en SQL."""
+    with _candado:
+        ambitos = list(_estadisticas.values())
+
+    filas = []
+    for a in sorted(ambitos, key=lambda a: a.tiempo, reverse=True):
+        mas_lentas = sorted(a.sentencias.items(), key=lambda fila: fila[1][1], reverse=True)[:top]
+        filas.append({
+            "ambito": a.nombre,
+            "ejecuciones": a.ejecuciones,
+            "consultas": a.consultas,
+            "consultas_por_ejecucion": round(a.consultas / a.ejecuciones, 2) if a.ejecuciones else 0,
+            "maximo_consultas": a.maximo_consultas,
+            "tiempo_sql_ms": round(1000 * a.tiempo, 3),
+            "sentencias_mas_lentas": [{"sql": sql, "veces": veces, "tiempo_ms": round(1000 * tiempo, 3)}
+                                      for sql, (veces, tiempo) in mas_lentas],
+            "posibles_n_mas_1": [{"sql": sql, "max_por_ejecucion": veces} for sql, veces in a.n_mas_1.items()],
+        })
+    return filas
+
+
+def imprimir_reporte(top: int = 3):
+    filas = reporte(top)
+    if not filas:
+        print("Instrumentación SQL: no se midió ningún ámbito.")
+        return
+    print(f"{'ámbito':<32} {'ejec.':>6} {'consultas':>10} {'por ejec.':>10} {'máx.':>6} {'SQL ms':>10}")
+    for f in filas:
+        print(f"{f['ambito']:<32} {f['ejecuciones']:>6} {f['consultas']:>10} {f['consultas_por_ejecucion']:>10} "
+              f"{f['maximo_consultas']:>6} {f['tiempo_sql_ms']:>10.1f}")
+        for s in f["sentencias_mas_lentas"]:
+            print(f"      {s['veces']:6d}x {s['tiempo_ms']:9.1f} ms  {s['sql'][:100]}")
+        for s in f["posibles_n_mas_1"]:
+            print(f"      POSIBLE N+1 ({s['max_por_ejecucion']} por ejecución): {s['sql'][:100]}")
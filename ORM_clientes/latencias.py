@@ -0,0 +1,229 @@
+# Archivo: latencias.py
+#
+# Latencia de las acciones de la GUI (callbacks de botones y eventos).
+#
+#   @medir_accion("finalize_order")       -> cada llamada queda en el registro
+#   ejecutar_medido("x [hilo]", f, args)  -> lo mismo sin decorador (trabajos de ejecutor_gui)
+#   registro.resumen()                   -> p50 / p95 / p99 / máx. e histograma por acción
+#
+# Configuración por variables de entorno (todas opcionales):
+#   RESTAURANTE_METRICAS=ruta.csv     una fila por llamada (fecha, accion, ms, estado, perfil),
+#                                     con rotación por tamaño (ruta.csv.1, .2, ...) y un
+#                                     resumen ruta.resumen.json al cerrar
+#   RESTAURANTE_PERFILAR_MS=500       perfila cada acción con cProfile y guarda el .prof de
+#                                     las que tarden más de 500 ms
+#   RESTAURANTE_PERFILES_DIR=carpeta  dónde van los .prof (por defecto ./perfiles)
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# Límites superiores (ms) de los tramos del histograma; el último tramo es "más"
+TRAMOS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+CABECERA_CSV = "fecha,accion,ms,estado,perfil"
+
+# Un solo cProfile a la vez en todo el proceso (desde 3.12 un segundo perfilador
+# activo, aunque sea en otro hilo, lanza ValueError): lo toma quien llega primero
+_candado_perfil = threading.Lock()
+
+
+def percentil(valores_ordenados: list, p: float):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+class _CSVRotativo(RotatingFileHandler):
+    """RotatingFileHandler que escribe la cabecera del CSV al empezar cada archivo."""
+
+    def doRollover(self):
+        super().doRollover()
+        self.stream.write(CABECERA_CSV + self.terminator)
+
+
+class RegistroLatencias:
+    """
+    Guarda las últimas `maximo_muestras` duraciones de cada acción (para los
+    percentiles) y un histograma acumulado por tramos. Se puede usar desde
+    cualquier hilo.
+    """
+
+    def __init__(self, maximo_muestras: int = 5000):
+        self.maximo_muestras = maximo_muestras
+        self._candado = threading.Lock()
+        self._muestras = {}
+        self._histogramas = {}
+        self._errores = {}
+        self._archivo = None          # logger del CSV (None = solo en memoria)
+        self.ruta_archivo = None
+        self.umbral_perfil = None     # segundos; None = sin cProfile
+        self.carpeta_perfiles = "perfiles"
+        self.perfiles_guardados = 0
+
+    # --- Configuración ---
+
+    def configurar(self, archivo: str = None, max_bytes: int = 1_000_000, respaldos: int = 5,
+                   umbral_perfil_ms: float = None, carpeta_perfiles: str = None):
+        """Activa el archivo CSV rotativo y/o los perfiles de las acciones lentas."""
+        if archivo:
+            logger = logging.getLogger(f"latencias.{id(self)}")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            nuevo = not os.path.exists(archivo) or os.path.getsize(archivo) == 0
+            handler = _CSVRotativo(archivo, maxBytes=max_bytes, backupCount=respaldos, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            if nuevo:
+                logger.info(CABECERA_CSV)
+            self._archivo = logger
+            self.ruta_archivo = archivo
+        if umbral_perfil_ms is not None:
+            self.umbral_perfil = umbral_perfil_ms / 1000
+        if carpeta_perfiles:
+            self.carpeta_perfiles = carpeta_perfiles
+        return self
+
+    def configurar_desde_entorno(self):
+        umbral = os.environ.get("RESTAURANTE_PERFILAR_MS")
+        return self.configurar(
+            archivo=os.environ.get("RESTAURANTE_METRICAS") or None,
+            umbral_perfil_ms=float(umbral) if umbral else None,
+            carpeta_perfiles=os.environ.get("RESTAURANTE_PERFILES_DIR") or None,
+        )
+
+    # --- Registro ---
+
+    def registrar(self, accion: str, duracion: float, error: bool = False, perfil: str = ""):
+        with self._candado:
+            self._muestras.setdefault(accion, deque(maxlen=self.maximo_muestras)).append(duracion)
+            histograma = self._histogramas.setdefault(accion, [0] * (len(TRAMOS_MS) + 1))
+            ms = duracion * 1000
+            histograma[next((i for i, limite in enumerate(TRAMOS_MS) if ms <= limite), len(TRAMOS_MS))] += 1
+            if error:
+                self._errores[accion] = self._errores.get(accion, 0) + 1
+        if self._archivo:
+            self._archivo.info(f"{datetime.now().isoformat(timespec='milliseconds')},{accion},"
+                               f"{duracion * 1000:.3f},{'error' if error else 'ok'},{perfil}")
+
+    def guardar_perfil(self, accion: str, perfilador: cProfile.Profile):
+        """Guarda el .prof (se abre con pstats o snakeviz). Devuelve la ruta."""
+        os.makedirs(self.carpeta_perfiles, exist_ok=True)
+        archivo = re.sub(r"\W+", "_", accion).strip("_")   # "finalize_order [hilo]" -> finalize_order_hilo
+        ruta = os.path.join(self.carpeta_perfiles, f"{archivo}_{datetime.now():%Y%m%d_%H%M%S_%f}.prof")
+        perfilador.dump_stats(ruta)
+        self.perfiles_guardados += 1
+        return ruta
+
+    # --- Lectura ---
+
+    def resumen(self):
+        """{accion: {cantidad, errores, promedio_ms, p50_ms, p95_ms, p99_ms, max_ms, histograma}}"""
+        with self._candado:
+            muestras = {a: sorted(m) for a, m in self._muestras.items()}
+            histogramas = {a: list(h) for a, h in self._histogramas.items()}
+            errores = dict(self._errores)
+
+        etiquetas = [f"<={limite}ms" for limite in TRAMOS_MS] + [f">{TRAMOS_MS[-1]}ms"]
+        resultado = {}
+        for accion, valores in sorted(muestras.items()):
+            resultado[accion] = {
+                "cantidad": sum(histogramas[accion]),
+                "errores": errores.get(accion, 0),
+                "promedio_ms": round(1000 * sum(valores) / len(valores), 3),
+                "p50_ms": round(1000 * percentil(valores, 50), 3),
+                "p95_ms": round(1000 * percentil(valores, 95), 3),
+                "p99_ms": round(1000 * percentil(valores, 99), 3),
+                "max_ms": round(1000 * valores[-1], 3),
+                "histograma": {e: n for e, n in zip(etiquetas, histogramas[accion]) if n},
+            }
+        return resultado
+
+    def guardar_resumen(self, ruta: str = None):
+        """Escribe el resumen en JSON (por defecto junto al CSV). Devuelve la ruta o None."""
+        ruta = ruta or (os.path.splitext(self.ruta_archivo)[0] + ".resumen.json" if self.ruta_archivo else None)
+        if not ruta:
+            return None
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({"fecha": datetime.now().isoformat(timespec="seconds"), "acciones": self.resumen()},
+                      f, ensure_ascii=False, indent=2)
+        return ruta
+
+    def reiniciar(self):
+        with self._candado:
+            self._muestras.clear()
+            self._histogramas.clear()
+            self._errores.clear()
+
+
+registro = RegistroLatencias()
+
+
+def ejecutar_medido(accion: str, funcion, args: tuple = (), kwargs: dict = None,
+                    registro_destino: RegistroLatencias = None):
+    """
+    Corre funcion(*args, **kwargs), mide la llamada (también si lanza excepción)
+    y la anota en el registro como `accion`. Con umbral de perfil configurado,
+    la llamada corre bajo cProfile y el perfil se guarda solo si tardó más que
+    el umbral. Se perfila una sola llamada a la vez en todo el proceso: si ya hay
+    otra perfilándose (anidada o en otro hilo) o hay otra herramienta de perfilado
+    activa, esta corre y se mide igual, pero sin perfil.
+    """
+    destino = registro_destino or registro
+    kwargs = kwargs or {}
+    perfilador = None
+    if destino.umbral_perfil is not None and _candado_perfil.acquire(blocking=False):
+        perfilador = cProfile.Profile()
+        try:
+            perfilador.enable()
+        except ValueError:
+            # "Another profiling tool is already active" (p. ej. un depurador)
+            perfilador = None
+            _candado_perfil.release()
+
+    error = False
+    inicio = time.perf_counter()
+    try:
+        return funcion(*args, **kwargs)
+    except Exception:
+        error = True
+        raise
+    finally:
+        if perfilador:
+            perfilador.disable()
+        duracion = time.perf_counter() - inicio
+        ruta_perfil = ""
+        if perfilador:
+            _candado_perfil.release()
+            if duracion >= destino.umbral_perfil:
+                ruta_perfil = destino.guardar_perfil(accion, perfilador)
+        destino.registrar(accion, duracion, error, ruta_perfil)
+
+
+def medir_accion(nombre: str = None, registro_destino: RegistroLatencias = None):
+    """
+    Decorador: cada llamada pasa por ejecutar_medido (registro de la duración y,
+    si está configurado, perfil de las lentas).
+    """
+    def decorador(funcion):
+        accion = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            return ejecutar_medido(accion, funcion, args, kwargs, registro_destino)
+
+        return envoltura
+    return decorador
@@ -1,10 +1,13 @@
 # main.py - Código actualizado para la inicialización y carga de datos predefinidos
 
-from database import SessionLocal, engine, Base
+from database import engine, Base, unidad_de_trabajo
 import models 
+import migraciones
+import instrumentacion
+import latencias
 import crud.ingrediente_crud as icrud
 import crud.menu_crud as mcrud
-from sqlalchemy.orm import Session 
+import crud.movimientos_crud as movcrud
 import os 
 
 # Importamos la aplicación para iniciarla al final
@@ -12,15 +15,15 @@ import app
 
 
 def inicializar_bd():
-    """Crea las tablas en la BD (si no existen)"""
+    """Crea las tablas en la BD (si no existen) y aplica las migraciones pendientes"""
     Base.metadata.create_all(bind=engine)
+    # create_all no modifica tablas que ya existen: las BD antiguas se ponen al día aquí
+    migraciones.migrar(engine)
+    # Snapshot diario del stock: las consultas de stock a una fecha solo suman lo posterior
+    with unidad_de_trabajo() as db:
+        movcrud.compactar_si_corresponde(db)
     print("--- Tablas de la base de datos verificadas/creadas con éxito. ---")
 
-def get_db_session() -> Session:
-    """Proporciona una sesión de BD para la inicialización."""
-    db = SessionLocal()
-    return db
-
 # main.py (Función CORREGIDA)
 
 def cargar_datos_iniciales():
@@ -28,22 +31,32 @@ def cargar_datos_iniciales():
     Función vaciada. Los menús e ingredientes se cargan 100% 
     desde la interfaz de usuario (CSV y 'Crear Recetas').
     """
-    db = get_db_session()
-    
-    # Comprobar si ya hay menús o ingredientes
-    if mcrud.leer_todos_los_menus(db) or icrud.listar_ingredientes(db):
-        db.close()
-        print("La base de datos ya tiene datos. Saltando carga inicial.")
-        return
+    with unidad_de_trabajo() as db:
+        # Comprobar si ya hay menús o ingredientes
+        if mcrud.leer_todos_los_menus(db) or icrud.listar_ingredientes(db):
+            print("La base de datos ya tiene datos. Saltando carga inicial.")
+            return
 
-    db.close()
     print("Base de datos lista. El inventario está vacío.")
 
 # --- Ejecución Principal ---
 if __name__ == "__main__":
+    # Instrumentación SQL opcional: RESTAURANTE_MEDIR_SQL=1 (reporte por consola al cerrar)
+    medir_sql = os.environ.get("RESTAURANTE_MEDIR_SQL", "").strip().lower() in ("1", "true", "si", "yes", "on")
+    if medir_sql:
+        instrumentacion.instrumentar(engine)
+    # Latencia de las acciones de la GUI (RESTAURANTE_METRICAS, RESTAURANTE_PERFILAR_MS)
+    latencias.registro.configurar_desde_entorno()
+
     inicializar_bd()
     cargar_datos_iniciales()
     
     # Inicia la interfaz gráfica
     app_instance = app.RestauranteApp()
-    app_instance.mainloop()
\ No newline at end of file
+    app_instance.mainloop()
+
+    if medir_sql:
+        instrumentacion.imprimir_reporte()
+    ruta_resumen = latencias.registro.guardar_resumen()
+    if ruta_resumen:
+        print(f"Resumen de latencias guardado en {ruta_resumen}")
\ No newline at end of file
@@ -0,0 +1,214 @@
+# Archivo: migraciones.py
+#
+# Migraciones livianas versionadas con PRAGMA user_version.
+# create_all() solo crea tablas que no existen; los cambios sobre tablas que
+# ya existen (índices, columnas nuevas, backfills) van aquí, en orden.
+#
+# Uso (desde ORM_clientes/):
+#   python migraciones.py            -> migra restaurante.db y verifica los planes
+
+from sqlalchemy import text
+from database import engine as engine_por_defecto
+
+
+# --- Migraciones ---
+# Cada migración recibe una conexión abierta dentro de una transacción.
+# Deben ser idempotentes (IF NOT EXISTS) porque en una BD nueva create_all
+# ya dejó el esquema al día y solo falta marcar la versión.
+
+def _v1_indices_consultas_frecuentes(conn):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_pedidos_fecha ON pedidos (fecha)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_pedidos_cliente_id ON pedidos (cliente_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_pedido_menus_menu_id ON pedido_menus (menu_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_menu_ingredientes_ingrediente_id ON menu_ingredientes (ingrediente_id)"))
+
+
+def _v2_resumen_ventas_diarias(conn):
+    from models import VentaDiaria, VentaDiariaMenu
+    from crud import ventas_crud
+
+    VentaDiaria.__table__.create(conn, checkfirst=True)
+    VentaDiariaMenu.__table__.create(conn, checkfirst=True)
+    ventas_crud.reconstruir_ventas_diarias(conn)
+
+
+
+def _v3_libro_de_stock(conn):
+    from models import MovimientoStock, SnapshotStock
+    from datetime import datetime
+
+    MovimientoStock.__table__.create(conn, checkfirst=True)
+    SnapshotStock.__table__.create(conn, checkfirst=True)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_movimientos_stock_ingrediente_fecha ON movimientos_stock (ingrediente_id, fecha)"))
+    # El libro arranca con una foto del stock actual (si el inventario no está vacío)
+    existe = conn.execute(text("SELECT 1 FROM snapshots_stock LIMIT 1")).first()
+    if not existe:
+        conn.execute(
+            text("INSERT INTO snapshots_stock (ingrediente_id, fecha, stock) SELECT id, :fecha, stock FROM ingredientes"),
+            {"fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")},  # mismo formato que DateTime
+        )
+
+
+
+def _v4_precio_en_lineas_de_pedido(conn):
+    columnas = {fila[1] for fila in conn.execute(text("PRAGMA table_info(pedido_menus)"))}
+    if "precio_unitario" not in columnas:
+        conn.execute(text("ALTER TABLE pedido_menus ADD COLUMN precio_unitario FLOAT NOT NULL DEFAULT 0"))
+    if "subtotal" not in columnas:
+        conn.execute(text("ALTER TABLE pedido_menus ADD COLUMN subtotal FLOAT NOT NULL DEFAULT 0"))
+
+    # Backfill. Pedidos de una sola línea: el precio sale exacto del total.
+    # El resto: no hay forma de saber el precio histórico, se usa el actual del menú.
+    conn.execute(text(
+        "UPDATE pedido_menus SET precio_unitario = "
+        " (SELECT pedidos.total / pedido_menus.cantidad FROM pedidos WHERE pedidos.id = pedido_menus.pedido_id) "
+        "WHERE precio_unitario = 0 AND cantidad > 0 "
+        "  AND (SELECT count(*) FROM pedido_menus AS otras WHERE otras.pedido_id = pedido_menus.pedido_id) = 1"
+    ))
+    conn.execute(text(
+        "UPDATE pedido_menus SET precio_unitario = "
+        " coalesce((SELECT menus.precio FROM menus WHERE menus.id = pedido_menus.menu_id), 0) "
+        "WHERE precio_unitario = 0"
+    ))
+    conn.execute(text("UPDATE pedido_menus SET subtotal = precio_unitario * cantidad WHERE subtotal = 0"))
+
+
+def _indice_fts(conn, tabla: str, columnas: list):
+    """Índice FTS5 de contenido externo sobre tabla(columnas) + triggers que lo mantienen, y lo llena."""
+    fts = f"{tabla}_fts"
+    lista = ", ".join(columnas)
+    nuevos = ", ".join(f"new.{c}" for c in columnas)
+    viejos = ", ".join(f"old.{c}" for c in columnas)
+    # unicode61 sin tildes ("jose" encuentra "José"); prefix acelera las búsquedas de 2 y 3 letras
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({lista}, content='{tabla}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    ))
+    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def _v5_busqueda_clientes_y_menus(conn):
+    _indice_fts(conn, "clientes", ["nombre", "email"])
+    _indice_fts(conn, "menus", ["nombre", "descripcion"])
+
+
+MIGRACIONES = [
+    (1, "Índices para pedidos.fecha, pedidos.cliente_id, pedido_menus.menu_id y menu_ingredientes.ingrediente_id", _v1_indices_consultas_frecuentes),
+    (2, "Tablas ventas_diarias y ventas_diarias_menus, calculadas desde los pedidos existentes", _v2_resumen_ventas_diarias),
+    (3, "Libro movimientos_stock y snapshots_stock, con una foto inicial del stock actual", _v3_libro_de_stock),
+    (4, "Columnas precio_unitario y subtotal en pedido_menus, con backfill de las líneas existentes", _v4_precio_en_lineas_de_pedido),
+    (5, "Índices FTS5 clientes_fts (nombre, email) y menus_fts (nombre, descripcion) con sus triggers", _v5_busqueda_clientes_y_menus),
+]
+
+
+def version_actual(conn):
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def migrar(engine=None):
+    """
+    Aplica las migraciones pendientes (version > user_version) en orden y
+    marca cada una en user_version apenas termina. Si algo se corta a mitad,
+    la próxima ejecución la repite (por eso deben ser idempotentes).
+    Devuelve la lista de versiones aplicadas.
+    """
+    engine = engine or engine_por_defecto
+    aplicadas = []
+
+    with engine.connect() as conn:
+        version = version_actual(conn)
+        conn.rollback()
+
+    for numero, descripcion, funcion in MIGRACIONES:
+        if numero <= version:
+            continue
+        with engine.begin() as conn:
+            funcion(conn)
+            # PRAGMA no acepta parámetros; numero es un int de esta lista
+            conn.execute(text(f"PRAGMA user_version = {int(numero)}"))
+        print(f"Migración {numero} aplicada: {descripcion}")
+        aplicadas.append(numero)
+
+    return aplicadas
+
+
+# --- Verificación de planes de consulta ---
+# (nombre, SQL equivalente a la consulta del CRUD, parámetros, índice que debe usar)
+
+CONSULTAS_CRITICAS = [
+    ("ventas por periodo (graficos.obtener_datos_ventas, sobre el resumen diario)",
+     "SELECT strftime('%Y-%m', dia), sum(total) FROM ventas_diarias WHERE dia >= :desde GROUP BY 1",
+     {"desde": "2025-01-01"}, "sqlite_autoindex_ventas_diarias_1"),
+    ("historial paginado (pedido_crud.leer_historial_pedidos)",
+     "SELECT pedidos.id, pedidos.fecha, clientes.nombre, pedidos.total FROM pedidos "
+     "LEFT OUTER JOIN clientes ON clientes.id = pedidos.cliente_id "
+     "WHERE (pedidos.fecha, pedidos.id) < (:fecha, :id) ORDER BY pedidos.fecha DESC, pedidos.id DESC LIMIT 100",
+     {"fecha": "2025-01-01", "id": 1}, "ix_pedidos_fecha"),
+    ("pedidos de un cliente (pedido_crud.leer_pedidos_por_cliente)",
+     "SELECT * FROM pedidos WHERE cliente_id = :id",
+     {"id": 1}, "ix_pedidos_cliente_id"),
+    ("ventas de un menú (pedido_menus por menu_id)",
+     "SELECT pedido_id, cantidad FROM pedido_menus WHERE menu_id = :id",
+     {"id": 1}, "ix_pedido_menus_menu_id"),
+    ("menús que usan un ingrediente (menu_ingredientes por ingrediente_id)",
+     "SELECT menu_id, cantidad FROM menu_ingredientes WHERE ingrediente_id = :id",
+     {"id": 1}, "ix_menu_ingredientes_ingrediente_id"),
+    ("stock a una fecha (movimientos_crud.stock_al)",
+     "SELECT sum(cantidad) FROM movimientos_stock WHERE ingrediente_id = :id AND fecha > :desde AND fecha <= :hasta",
+     {"id": 1, "desde": "2025-01-01", "hasta": "2025-02-01"}, "ix_movimientos_stock_ingrediente_fecha"),
+    ("búsqueda de clientes (cliente_crud.buscar_clientes)",
+     "SELECT clientes.* FROM clientes_fts JOIN clientes ON clientes.id = clientes_fts.rowid "
+     "WHERE clientes_fts MATCH :consulta ORDER BY bm25(clientes_fts, 2.0, 1.0) LIMIT 20",
+     {"consulta": '"ana"*'}, "clientes_fts VIRTUAL TABLE INDEX"),
+]
+
+
+def plan_de_consulta(conn, sql: str, parametros: dict = None):
+    """Devuelve el detalle de EXPLAIN QUERY PLAN como lista de strings."""
+    filas = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), parametros or {}).fetchall()
+    return [fila[-1] for fila in filas]
+
+
+def verificar_planes(engine=None):
+    """
+    Ejecuta EXPLAIN QUERY PLAN sobre las consultas críticas y comprueba que
+    usan su índice. Devuelve una lista de (nombre, plan) de las que NO lo usan.
+    """
+    engine = engine or engine_por_defecto
+    fallos = []
+    with engine.connect() as conn:
+        for nombre, sql, parametros, indice in CONSULTAS_CRITICAS:
+            plan = plan_de_consulta(conn, sql, parametros)
+            if not any(indice in paso for paso in plan):
+                fallos.append((nombre, plan))
+    return fallos
+
+
+if __name__ == "__main__":
+    from database import Base
+    import models  # registra las tablas en Base.metadata
+
+    Base.metadata.create_all(bind=engine_por_defecto)
+    aplicadas = migrar()
+    if not aplicadas:
+        print("La base de datos ya está en la última versión.")
+
+    fallos = verificar_planes()
+    for nombre, plan in fallos:
+        print(f"SIN ÍNDICE: {nombre}\n    {plan}")
+    if not fallos:
+        print(f"Las {len(CONSULTAS_CRITICAS)} consultas críticas usan su índice.")
+    raise SystemExit(1 if fallos else 0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, DateTime # <--- AÑADIDO: DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, DateTime, Date, Index # <--- AÑADIDO: DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime # <--- AÑADIDO: datetime
 from database import Base 
@@ -35,7 +35,8 @@ class Cliente(Base):
 class MenuIngrediente(Base):
     __tablename__ = "menu_ingredientes"
     menu_id = Column(Integer, ForeignKey("menus.id"), primary_key=True)
-    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), primary_key=True)
+    # Indexado: la PK (menu_id, ingrediente_id) no sirve para buscar por ingrediente
+    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), primary_key=True, index=True)
     cantidad = Column(Float, nullable=False) 
 
     ingrediente = relationship("Ingrediente", back_populates="menus_donde_aparece")
@@ -60,8 +61,12 @@ class Menu(Base):
 class PedidoMenu(Base):
     __tablename__ = "pedido_menus"
     pedido_id = Column(Integer, ForeignKey("pedidos.id"), primary_key=True)
-    menu_id = Column(Integer, ForeignKey("menus.id"), primary_key=True)
+    # Indexado: la PK (pedido_id, menu_id) no sirve para buscar por menu
+    menu_id = Column(Integer, ForeignKey("menus.id"), primary_key=True, index=True)
     cantidad = Column(Integer, nullable=False) 
+    # Precio al momento de la venta: el historial no cambia si el menú cambia de precio
+    precio_unitario = Column(Float, nullable=False, default=0.0)
+    subtotal = Column(Float, nullable=False, default=0.0)
 
     menu = relationship("Menu", back_populates="pedidos_donde_aparece")
     pedido = relationship("Pedido", back_populates="items_comprados")
@@ -73,14 +78,63 @@ class Pedido(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     
     # CRÍTICO: CAMBIADO de String(100) a DateTime
-    fecha = Column(DateTime, nullable=False, default=datetime.now) 
+    # Indexado: los reportes de ventas filtran y agrupan por fecha
+    fecha = Column(DateTime, nullable=False, default=datetime.now, index=True) 
     
     total = Column(Float, nullable=False)
     
-    cliente_id = Column(Integer, ForeignKey('clientes.id'))
+    cliente_id = Column(Integer, ForeignKey('clientes.id'), index=True)
     
     cliente = relationship("Cliente", back_populates="pedidos")
     items_comprados = relationship("PedidoMenu", back_populates="pedido")
 
     def __repr__(self):
-        return f"<Pedido(id={self.id}, cliente_id={self.cliente_id}, total={self.total})>"
\ No newline at end of file
+        return f"<Pedido(id={self.id}, cliente_id={self.cliente_id}, total={self.total})>"
+
+
+# 5. Resumen de ventas por día (lo mantiene pedido_crud en la misma transacción)
+class VentaDiaria(Base):
+    __tablename__ = "ventas_diarias"
+
+    dia = Column(Date, primary_key=True)
+    pedidos = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<VentaDiaria(dia={self.dia}, pedidos={self.pedidos}, total={self.total})>"
+
+# 6. Unidades vendidas por menú y día
+class VentaDiariaMenu(Base):
+    __tablename__ = "ventas_diarias_menus"
+
+    dia = Column(Date, primary_key=True)
+    menu_id = Column(Integer, ForeignKey("menus.id"), primary_key=True, index=True)
+    unidades = Column(Integer, nullable=False, default=0)
+
+
+# 7. Libro de movimientos de stock (solo se agregan filas, nunca se modifican)
+# Ingrediente.stock sigue siendo el valor actual (cache mantenido en la misma
+# transacción); el libro explica cómo se llegó a ese valor.
+class MovimientoStock(Base):
+    __tablename__ = "movimientos_stock"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), nullable=False)
+    fecha = Column(DateTime, nullable=False, default=datetime.now)
+    tipo = Column(String(20), nullable=False)      # compra, venta, ajuste, carga_csv
+    cantidad = Column(Float, nullable=False)       # positiva entra, negativa sale
+    pedido_id = Column(Integer, nullable=True)     # solo para las ventas
+
+    # El stock a una fecha suma los movimientos de un ingrediente en un rango de fechas
+    __table_args__ = (Index("ix_movimientos_stock_ingrediente_fecha", "ingrediente_id", "fecha"),)
+
+    def __repr__(self):
+        return f"<MovimientoStock(ingrediente_id={self.ingrediente_id}, tipo='{self.tipo}', cantidad={self.cantidad})>"
+
+# 8. Foto del stock de un ingrediente en una fecha (incluye los movimientos hasta esa fecha)
+class SnapshotStock(Base):
+    __tablename__ = "snapshots_stock"
+
+    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), primary_key=True)
+    fecha = Column(DateTime, primary_key=True)
+    stock = Column(Float, nullable=False)
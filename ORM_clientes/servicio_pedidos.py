@@ -0,0 +1,268 @@
+# Archivo: servicio_pedidos.py
+#
+# Servicio HTTP local (sin GUI) para tomar pedidos desde otras cajas.
+# Solo usa la biblioteca estándar (http.server) y los módulos de crud/.
+#
+#   GET  /menus                 -> [{id, nombre, precio}]
+#   GET  /stock[?ids=1,2,3]     -> [{id, nombre, stock}]
+#   POST /pedidos               <- {"cliente_id": 1, "lineas": [{"id": 2, "cantidad": 1}]}
+#                               -> 201 {id, total} | 400 datos inválidos | 409 sin stock
+#   GET  /metricas              -> tiempos por endpoint (cantidad, promedio, p50, p99 en ms)
+#
+# Concurrencia acotada: como máximo `max_concurrentes` pedidos se atienden a la
+# vez; si no hay cupo en `espera_maxima` segundos se responde 503.
+#
+# Uso (desde ORM_clientes/):
+#   python servicio_pedidos.py --puerto 8080
+# El perfil de BD es el de --perfil, si no RESTAURANTE_DB_PERFIL, si no "prod"
+# (WAL y busy_timeout: varias cajas escriben a la vez). database.ini no cuenta
+# acá: su perfil es el de la GUI.
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, crear_motor, unidad_de_trabajo
+import models
+import migraciones
+from latencias import percentil
+from crud import cache_recetas
+from crud import cliente_crud as ccrud
+from crud import menu_crud as mcrud
+from crud import pedido_crud as pcrud
+
+
+# --- Métricas de tiempos por endpoint ---
+
+class MetricasHTTP:
+    """Guarda los últimos `maximo` tiempos (en segundos) de cada endpoint."""
+
+    def __init__(self, maximo: int = 10000):
+        self._candado = threading.Lock()
+        self._tiempos = {}
+        self._respuestas = {}
+        self.maximo = maximo
+
+    def registrar(self, endpoint: str, estado: int, duracion: float):
+        with self._candado:
+            self._tiempos.setdefault(endpoint, deque(maxlen=self.maximo)).append(duracion)
+            clave = (endpoint, estado)
+            self._respuestas[clave] = self._respuestas.get(clave, 0) + 1
+
+    def resumen(self):
+        with self._candado:
+            tiempos = {e: sorted(t) for e, t in self._tiempos.items()}
+            respuestas = dict(self._respuestas)
+
+        resultado = {}
+        for endpoint, valores in tiempos.items():
+            resultado[endpoint] = {
+                "cantidad": len(valores),
+                "promedio_ms": round(1000 * sum(valores) / len(valores), 3),
+                "p50_ms": round(1000 * percentil(valores, 50), 3),
+                "p99_ms": round(1000 * percentil(valores, 99), 3),
+                "respuestas": {str(estado): n for (e, estado), n in respuestas.items() if e == endpoint},
+            }
+        return resultado
+
+
+# --- Errores de la API ---
+
+class ErrorAPI(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# --- Endpoints ---
+# Cada uno recibe (servidor, parámetros de la URL, cuerpo JSON) y devuelve (estado, datos).
+
+def listar_menus(servidor, parametros, cuerpo):
+    with unidad_de_trabajo(servidor.fabrica) as db:
+        menus = mcrud.leer_todos_los_menus(db)
+        return 200, [{"id": m.id, "nombre": m.nombre, "precio": m.precio} for m in menus]
+
+
+def consultar_stock(servidor, parametros, cuerpo):
+    consulta_ids = parametros.get("ids")
+    with unidad_de_trabajo(servidor.fabrica) as db:
+        consulta = db.query(models.Ingrediente.id, models.Ingrediente.nombre, models.Ingrediente.stock)
+        if consulta_ids:
+            try:
+                ids = [int(i) for i in consulta_ids[0].split(",") if i]
+            except ValueError:
+                raise ErrorAPI(400, "El parámetro ids debe ser una lista de números separados por comas.")
+            consulta = consulta.filter(models.Ingrediente.id.in_(ids))
+        return 200, [{"id": i, "nombre": n, "stock": s} for i, n, s in consulta.order_by(models.Ingrediente.id).all()]
+
+
+def _es_entero(valor):
+    """int de JSON; true/false también son int en Python y no sirven como ID ni cantidad."""
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def tomar_pedido(servidor, parametros, cuerpo):
+    if not isinstance(cuerpo, dict):
+        raise ErrorAPI(400, "Se esperaba un objeto JSON.")
+    cliente_id = cuerpo.get("cliente_id")
+    lineas = cuerpo.get("lineas")
+    if not _es_entero(cliente_id) or not isinstance(lineas, list):
+        raise ErrorAPI(400, "Se esperaba {\"cliente_id\": int, \"lineas\": [{\"id\": int, \"cantidad\": int}]}.")
+    if not all(isinstance(l, dict) and _es_entero(l.get("id")) and _es_entero(l.get("cantidad")) for l in lineas):
+        raise ErrorAPI(400, "Cada línea debe ser {\"id\": int, \"cantidad\": int}.")
+
+    try:
+        with servidor.candado_escritura, unidad_de_trabajo(servidor.fabrica) as db:
+            if not ccrud.obtener_cliente_por_id(db, cliente_id):
+                raise ErrorAPI(400, "El cliente seleccionado no existe.")
+            pedido = pcrud.crear_pedido(db, cliente_id, lineas)
+            return 201, {"id": pedido.id, "total": pedido.total}
+    except pcrud.StockInsuficiente as e:
+        raise ErrorAPI(409, str(e))
+    except pcrud.PedidoInvalido as e:
+        raise ErrorAPI(400, str(e))
+
+
+def ver_metricas(servidor, parametros, cuerpo):
+    return 200, servidor.metricas.resumen()
+
+
+RUTAS = {
+    ("GET", "/menus"): listar_menus,
+    ("GET", "/stock"): consultar_stock,
+    ("POST", "/pedidos"): tomar_pedido,
+    ("GET", "/metricas"): ver_metricas,
+}
+
+# Endpoints que no usan la BD: no cuentan para el límite de concurrencia
+SIN_LIMITE = {("GET", "/metricas")}
+
+
+# --- Servidor HTTP ---
+
+class ManejadorPedidos(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # conexiones persistentes (keep-alive)
+    # cabeceras y cuerpo salen en dos escrituras: sin esto Nagle + ACK retardado suman ~40 ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+    def _atender(self, metodo: str):
+        inicio = time.perf_counter()
+        url = urlparse(self.path)
+        endpoint = f"{metodo} {url.path}"
+        ruta = RUTAS.get((metodo, url.path))
+
+        cuerpo = None
+        largo = int(self.headers.get("Content-Length") or 0)
+        datos = self.rfile.read(largo) if largo else b""
+
+        if ruta is None:
+            estado, respuesta = 404, {"error": f"No existe {endpoint}"}
+            endpoint = "desconocido"
+        else:
+            con_cupo = (metodo, url.path) in SIN_LIMITE or self.server.cupos.acquire(timeout=self.server.espera_maxima)
+            if not con_cupo:
+                estado, respuesta = 503, {"error": "Servicio ocupado, intente de nuevo."}
+            else:
+                try:
+                    if datos:
+                        cuerpo = json.loads(datos)
+                    estado, respuesta = ruta(self.server, parse_qs(url.query), cuerpo)
+                except json.JSONDecodeError:
+                    estado, respuesta = 400, {"error": "El cuerpo no es JSON válido."}
+                except ErrorAPI as e:
+                    estado, respuesta = e.estado, {"error": str(e)}
+                except Exception as e:
+                    estado, respuesta = 500, {"error": f"Error interno: {e}"}
+                finally:
+                    if (metodo, url.path) not in SIN_LIMITE:
+                        self.server.cupos.release()
+
+        self._responder(estado, respuesta)
+        self.server.metricas.registrar(endpoint, estado, time.perf_counter() - inicio)
+
+    def _responder(self, estado: int, datos):
+        contenido = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(contenido)))
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def log_message(self, formato, *args):
+        if self.server.registrar_accesos:
+            super().log_message(formato, *args)
+
+
+class ServicioPedidos(ThreadingHTTPServer):
+    """Servidor HTTP con un hilo por conexión y un límite de pedidos simultáneos."""
+    daemon_threads = True
+    request_queue_size = 128  # backlog de listen(): muchas cajas conectando a la vez
+
+    def __init__(self, direccion: tuple, fabrica=None, max_concurrentes: int = 8,
+                 espera_maxima: float = 2.0, registrar_accesos: bool = False):
+        super().__init__(direccion, ManejadorPedidos)
+        self.fabrica = fabrica
+        self.cupos = threading.BoundedSemaphore(max_concurrentes)
+        # SQLite admite un solo escritor: los pedidos de este proceso esperan su
+        # turno aquí (FIFO del candado) en vez de reintentar contra el busy_timeout
+        self.candado_escritura = threading.Lock()
+        self.espera_maxima = espera_maxima
+        self.metricas = MetricasHTTP()
+        self.registrar_accesos = registrar_accesos
+
+
+PERFIL_SERVICIO = "prod"
+
+
+def crear_servicio(host: str = "127.0.0.1", puerto: int = 8080, perfil: str = None, url: str = None, **opciones):
+    """
+    Crea el motor (y aplica las migraciones) y devuelve el servidor listo para serve_forever().
+    Sin `perfil` usa RESTAURANTE_DB_PERFIL o, si no está, PERFIL_SERVICIO.
+    """
+    perfil = perfil or os.environ.get("RESTAURANTE_DB_PERFIL", PERFIL_SERVICIO)
+    # El cache de recetas es del proceso y solo lo invalida menu_crud de este mismo
+    # proceso: un precio o receta cambiado desde la GUI no llegaría nunca. El
+    # servicio lee precio y receta de la BD en cada pedido (una consulta).
+    cache_recetas.habilitado = False
+    engine = crear_motor(perfil=perfil, url=url)
+    Base.metadata.create_all(bind=engine)
+    migraciones.migrar(engine)
+    fabrica = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    return ServicioPedidos((host, puerto), fabrica=fabrica, **opciones)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de pedidos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--perfil", default=None, help="perfil de BD (dev/prod); por defecto RESTAURANTE_DB_PERFIL o prod")
+    parser.add_argument("--url", default=None, help="url de la BD; por defecto restaurante.db")
+    parser.add_argument("--max-concurrentes", type=int, default=8)
+    parser.add_argument("--espera-maxima", type=float, default=2.0, help="segundos esperando cupo antes de responder 503")
+    parser.add_argument("--accesos", action="store_true", help="mostrar cada request en la consola")
+    args = parser.parse_args()
+
+    servicio = crear_servicio(args.host, args.puerto, args.perfil, args.url,
+                              max_concurrentes=args.max_concurrentes,
+                              espera_maxima=args.espera_maxima,
+                              registrar_accesos=args.accesos)
+    print(f"Servicio de pedidos en http://{args.host}:{args.puerto} (Ctrl+C para detener)")
+    try:
+        servicio.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servicio.server_close()
@@ -0,0 +1,99 @@
+# Archivo: tabla_gui.py
+#
+# Refresco incremental de un ttk.Treeview.
+#
+# En vez de borrar todas las filas y volver a insertarlas, la tabla guarda
+# id -> valores de lo que está pintado y en cada refresco aplica solo la
+# diferencia: borra las que ya no están (en una sola llamada), actualiza las
+# que cambiaron, inserta las nuevas y mueve las que cambiaron de lugar.
+# La selección, el foco y la fila de arriba del scroll se mantienen.
+#
+#     self.tabla_clientes = TablaSincronizada(self.tree_clientes)
+#     self.tabla_clientes.sincronizar([(c.id, c.nombre, c.email) for c in clientes])
+#
+# Cada fila es la tupla de valores de las columnas; la clave (por defecto el
+# primer valor, la columna ID) se usa como iid del Treeview.
+
+
+class TablaSincronizada:
+    """Enlaza un Treeview (sin jerarquía) con una lista de filas identificadas por clave."""
+
+    def __init__(self, tree, clave=None):
+        self.tree = tree
+        self.clave = clave or (lambda fila: fila[0])
+        self._valores = {}   # iid -> tupla de valores pintada
+        self.ultimo_cambio = {"insertadas": 0, "actualizadas": 0, "borradas": 0, "movidas": 0}
+
+    def __len__(self):
+        return len(self._valores)
+
+    def __contains__(self, clave):
+        return str(clave) in self._valores
+
+    def valores(self, clave):
+        """Valores pintados de una fila (o None si no está)."""
+        return self._valores.get(str(clave))
+
+    def sincronizar(self, filas):
+        """Deja el Treeview igual a `filas` (en ese orden) tocando solo las filas que cambiaron."""
+        tree = self.tree
+        nuevas = {}
+        for fila in filas:
+            nuevas[str(self.clave(fila))] = tuple(fila)
+        orden = list(nuevas)
+        anteriores = self._valores
+
+        # Fila de arriba del área visible, para dejar el scroll donde estaba
+        hijos = tree.get_children()
+        arriba = None
+        if hijos:
+            indice = min(len(hijos) - 1, int(round(tree.yview()[0] * len(hijos))))
+            arriba = hijos[indice]
+
+        # 1. Borrar de una vez las que ya no están
+        borradas = [iid for iid in anteriores if iid not in nuevas]
+        if borradas:
+            tree.delete(*borradas)
+
+        # 2. Actualizar las que cambiaron de valores
+        actualizadas = 0
+        for iid, valores in nuevas.items():
+            previos = anteriores.get(iid)
+            if previos is not None and previos != valores:
+                tree.item(iid, values=valores)
+                actualizadas += 1
+
+        # 3. Insertar las nuevas y mover las que quedaron fuera de lugar
+        #    (recorrido único sobre el orden actual: lo que ya está en su lugar no se toca)
+        insertadas = movidas = 0
+        actual = tree.get_children() if borradas else hijos
+        if list(actual) != orden:
+            j = 0
+            colocadas = set()
+            for i, iid in enumerate(orden):
+                while j < len(actual) and actual[j] in colocadas:
+                    j += 1
+                if j < len(actual) and actual[j] == iid:
+                    j += 1
+                elif iid in anteriores:
+                    tree.move(iid, "", i)
+                    movidas += 1
+                else:
+                    tree.insert("", i, iid=iid, values=nuevas[iid])
+                    insertadas += 1
+                colocadas.add(iid)
+
+        self._valores = nuevas
+        self.ultimo_cambio = {"insertadas": insertadas, "actualizadas": actualizadas,
+                              "borradas": len(borradas), "movidas": movidas}
+
+        # 4. Scroll: la misma fila arriba (si sigue existiendo). La selección y el foco
+        #    de las filas que siguen los conserva el propio Treeview.
+        if arriba is not None and arriba in nuevas and (borradas or insertadas or movidas):
+            tree.yview_moveto(orden.index(arriba) / len(orden))
+        return self.ultimo_cambio
+
+    def vaciar(self):
+        if self._valores:
+            self.tree.delete(*self._valores)
+        self._valores = {}